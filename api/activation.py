@@ -0,0 +1,78 @@
+"""
+Message × marker activation matrix of one conversation.
+
+Stored sparse by column: every active marker keeps the sorted message
+indices where it fired, so "how often did X fire in messages lo..hi" is two
+bisects (an implicit cumulative sum) and windowed checks never loop over
+messages. Used by CLU evaluation for window checks and for finding the
+message at which a CLU first became satisfied.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import Iterable
+
+
+class ActivationMatrix:
+    """Which markers fired in which message, indexed both ways."""
+
+    def __init__(self, n_messages: int, *per_message_layers: Iterable[Iterable]):
+        """per_message_layers: one or more lists (per message) of detections."""
+        self.n_messages = n_messages
+        self.columns: dict[str, list[int]] = {}
+        rows: set[int] = set()
+        for layer in per_message_layers:
+            for msg_idx, dets in enumerate(layer):
+                for d in dets:
+                    col = self.columns.setdefault(d.marker_id, [])
+                    if not col or col[-1] != msg_idx:
+                        col.append(msg_idx)
+                    rows.add(msg_idx)
+        # A marker belongs to one layer, so each column was filled in message order
+        self.active_rows: list[int] = sorted(rows)  # Messages with any activation
+
+    def add_message(self, *layers: Iterable) -> None:
+        """Append one message (its detections per layer) as the next row."""
+        msg_idx = self.n_messages
+        self.n_messages += 1
+        fired = False
+        for dets in layers:
+            for d in dets:
+                col = self.columns.setdefault(d.marker_id, [])
+                if not col or col[-1] != msg_idx:
+                    col.append(msg_idx)
+                fired = True
+        if fired:
+            self.active_rows.append(msg_idx)
+
+    def __contains__(self, marker_id: str) -> bool:
+        return marker_id in self.columns
+
+    def first(self, marker_id: str) -> int | None:
+        col = self.columns.get(marker_id)
+        return col[0] if col else None
+
+    def last(self, marker_id: str) -> int | None:
+        col = self.columns.get(marker_id)
+        return col[-1] if col else None
+
+    def count(self, marker_id: str, lo: int, hi: int) -> int:
+        """Number of messages in lo..hi (inclusive) where marker_id fired."""
+        col = self.columns.get(marker_id)
+        if not col:
+            return 0
+        return bisect_right(col, hi) - bisect_left(col, lo)
+
+    def fired_in(self, marker_id: str, lo: int, hi: int) -> bool:
+        """True if marker_id fired in any message lo..hi (inclusive)."""
+        col = self.columns.get(marker_id)
+        if not col:
+            return False
+        i = bisect_left(col, lo)
+        return i < len(col) and col[i] <= hi
+
+    def any_fired_in(self, lo: int, hi: int) -> bool:
+        """True if any marker fired in messages lo..hi (inclusive)."""
+        i = bisect_left(self.active_rows, lo)
+        return i < len(self.active_rows) and self.active_rows[i] <= hi
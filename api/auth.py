@@ -5,7 +5,7 @@ import time
 from collections import defaultdict
 from pathlib import Path
 
-from fastapi import HTTPException, Security
+from fastapi import HTTPException, Security, WebSocket
 from fastapi.security import APIKeyHeader
 
 from .config import settings
@@ -46,6 +46,16 @@ def _check_rate_limit(api_key: str):
 
 async def verify_api_key(api_key: str = Security(api_key_header)) -> str:
     """Verify API key and enforce rate limits."""
+    return check_api_key(api_key)
+
+
+def verify_websocket_api_key(websocket: WebSocket) -> str:
+    """verify_api_key for WebSockets: X-API-Key header or ?api_key= (browsers cannot set headers)."""
+    return check_api_key(websocket.headers.get("X-API-Key") or websocket.query_params.get("api_key"))
+
+
+def check_api_key(api_key: str | None) -> str:
+    """Validate a key and count it against the rate limit; raises HTTPException."""
     if not settings.require_auth:
         return "dev-mode"
 
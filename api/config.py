@@ -15,6 +15,8 @@ class Settings(BaseSettings):
         Path(__file__).resolve().parent.parent / "build" / "markers_normalized" / "marker_registry.json"
     )
     personas_dir: str = str(Path(__file__).resolve().parent.parent / "personas")
+    # Prefer marker_registry.snapshot (tools/build_snapshot.py) next to the registry when it is current
+    registry_snapshot: bool = True
 
     # Auth — production default: enabled. Override with LEANDEEP_REQUIRE_AUTH=false for dev.
     api_keys_file: str = str(Path(__file__).resolve().parent / "api_keys.json")
@@ -31,6 +33,25 @@ class Settings(BaseSettings):
     default_threshold: float = 0.5
     max_text_length: int = 100_000
     max_conversation_messages: int = 2000
+    ato_prefilter: bool = True           # Skip ATO patterns whose required literals are absent
+    ato_scan_mode: str = "loop"          # "loop" (finditer per pattern) | "sharded" (combined regexes)
+    ato_shard_size: int = 64             # Patterns per combined regex in sharded mode
+    analysis_cache_entries: int = 20_000  # Per-message results cached by text (0 disables)
+    analysis_cache_max_text: int = 2000   # Longer messages bypass the cache
+    analysis_cache_max_chars: int = 4_000_000  # Summed text length of cached messages (0: entries only)
+    conversation_cache_entries: int = 32  # Conversations whose scans are reused across endpoints
+    conversation_cache_max_chars: int = 8_000_000  # Summed text length of cached conversations (0: entries only)
+    subset_cache_entries: int = 16       # Compiled sub-plans of marker/family selections
+    language_partition: bool = True      # Guess each message's language; skip other-language-only markers
+    engine_pool: str = "thread"          # "thread" | "process": where engine calls run, off the event loop
+    engine_workers: int = 4              # Concurrent engine calls (0 runs them on the event loop)
+    engine_queue_depth: int = 64         # Calls waiting for a worker; beyond this requests get 503
+    workers: int = 1                     # Worker processes forked by api.prefork (sharing one registry)
+
+    # Incremental conversation sessions (/v1/sessions), kept in memory
+    session_max: int = 1000              # Live sessions; least recently used evicted beyond this
+    session_ttl_seconds: int = 3600      # Sessions idle longer than this are dropped
+    session_max_messages: int = 200_000  # Messages held across all sessions (memory cap)
 
     model_config = {"env_prefix": "LEANDEEP_"}
 
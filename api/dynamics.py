@@ -22,70 +22,186 @@ def compute_ued_metrics(vad_sequence: list[dict]) -> dict | None:
         recovery_rate: Avg negative arousal delta after arousal peak (calming ability)
         density: Proportion of emotionally charged utterances (|valence|>0.2 or arousal>0.3)
     """
-    if len(vad_sequence) < 3:
-        return None
-
-    n = len(vad_sequence)
-    vals = [v["valence"] for v in vad_sequence]
-    aros = [v["arousal"] for v in vad_sequence]
-    doms = [v["dominance"] for v in vad_sequence]
-
-    # Home base: mean
-    home_base = {
-        "valence": round(sum(vals) / n, 3),
-        "arousal": round(sum(aros) / n, 3),
-        "dominance": round(sum(doms) / n, 3),
-    }
-
-    # Variability: std deviation
-    def std(xs):
-        mean = sum(xs) / len(xs)
-        variance = sum((x - mean) ** 2 for x in xs) / len(xs)
-        return math.sqrt(variance)
-
-    variability = {
-        "valence": round(std(vals), 3),
-        "arousal": round(std(aros), 3),
-    }
-
-    # Instability: mean absolute successive difference
-    val_diffs = [abs(vals[i + 1] - vals[i]) for i in range(n - 1)]
-    aro_diffs = [abs(aros[i + 1] - aros[i]) for i in range(n - 1)]
-    instability = {
-        "valence": round(sum(val_diffs) / len(val_diffs), 3),
-        "arousal": round(sum(aro_diffs) / len(aro_diffs), 3),
-    }
-
-    # Rise rate: avg positive arousal delta after negative valence messages
-    rise_deltas = []
-    for i in range(n - 1):
-        if vals[i] < -0.1:  # Negative valence message
-            delta_a = aros[i + 1] - aros[i]
-            if delta_a > 0:  # Arousal rising
-                rise_deltas.append(delta_a)
-    rise_rate = round(sum(rise_deltas) / max(len(rise_deltas), 1), 3)
-
-    # Recovery rate: avg negative arousal delta after arousal peak
-    recovery_deltas = []
-    for i in range(1, n - 1):
-        if aros[i] > aros[i - 1] and aros[i] > 0.4:  # Local peak above threshold
-            delta_a = aros[i + 1] - aros[i]
-            if delta_a < 0:  # Arousal dropping (recovery)
-                recovery_deltas.append(abs(delta_a))
-    recovery_rate = round(sum(recovery_deltas) / max(len(recovery_deltas), 1), 3)
-
-    # Density: proportion of emotionally charged utterances
-    charged = sum(1 for v in vad_sequence if abs(v["valence"]) > 0.2 or v["arousal"] > 0.3)
-    density = round(charged / n, 3)
-
-    return {
-        "home_base": home_base,
-        "variability": variability,
-        "instability": instability,
-        "rise_rate": rise_rate,
-        "recovery_rate": recovery_rate,
-        "density": density,
-    }
+    acc = UEDAccumulator()
+    for vad in vad_sequence:
+        acc.push(vad)
+    return acc.metrics()
+
+
+class UEDAccumulator:
+    """Running UED metrics: push one VAD point per message, read metrics() any time.
+
+    Keeps the sums behind compute_ued_metrics so each new message costs O(1);
+    only the standard deviations revisit the stored valence/arousal values.
+    """
+
+    def __init__(self):
+        self.vals: list[float] = []
+        self.aros: list[float] = []
+        self.sum_v = 0
+        self.sum_a = 0
+        self.sum_d = 0
+        self.val_diff_sum = 0
+        self.aro_diff_sum = 0
+        self.rise_sum = 0
+        self.rise_n = 0
+        self.recovery_sum = 0
+        self.recovery_n = 0
+        self.charged = 0
+
+    def push(self, vad: dict) -> None:
+        v, a = vad["valence"], vad["arousal"]
+        if self.vals:
+            prev_v, prev_a = self.vals[-1], self.aros[-1]
+            # Instability: absolute successive difference
+            self.val_diff_sum += abs(v - prev_v)
+            self.aro_diff_sum += abs(a - prev_a)
+
+            # Rise rate: positive arousal delta after a negative valence message
+            if prev_v < -0.1:
+                delta_a = a - prev_a
+                if delta_a > 0:
+                    self.rise_sum += delta_a
+                    self.rise_n += 1
+
+            # Recovery rate: arousal drop after a local peak above threshold
+            if len(self.aros) >= 2 and prev_a > self.aros[-2] and prev_a > 0.4:
+                delta_a = a - prev_a
+                if delta_a < 0:
+                    self.recovery_sum += abs(delta_a)
+                    self.recovery_n += 1
+
+        self.sum_v += v
+        self.sum_a += a
+        self.sum_d += vad["dominance"]
+        if abs(v) > 0.2 or a > 0.3:
+            self.charged += 1
+        self.vals.append(v)
+        self.aros.append(a)
+
+    def metrics(self) -> dict | None:
+        """UED metrics so far (same as compute_ued_metrics); None below 3 messages."""
+        n = len(self.vals)
+        if n < 3:
+            return None
+
+        # Variability: std deviation
+        def std(xs):
+            mean = sum(xs) / len(xs)
+            variance = sum((x - mean) ** 2 for x in xs) / len(xs)
+            return math.sqrt(variance)
+
+        return {
+            "home_base": {
+                "valence": round(self.sum_v / n, 3),
+                "arousal": round(self.sum_a / n, 3),
+                "dominance": round(self.sum_d / n, 3),
+            },
+            "variability": {
+                "valence": round(std(self.vals), 3),
+                "arousal": round(std(self.aros), 3),
+            },
+            "instability": {
+                "valence": round(self.val_diff_sum / (n - 1), 3),
+                "arousal": round(self.aro_diff_sum / (n - 1), 3),
+            },
+            "rise_rate": round(self.rise_sum / max(self.rise_n, 1), 3),
+            "recovery_rate": round(self.recovery_sum / max(self.recovery_n, 1), 3),
+            "density": round(self.charged / n, 3),
+        }
+
+
+class SpeakerBaselineTracker:
+    """
+    Per-speaker baseline (Polygraph principle), one message at a time.
+
+    For each speaker, tracks a running EWMA baseline of their VAD values and
+    the delta of every message from it. The signal isn't the absolute value
+    but the DELTA from the speaker's own norm.
+
+    warm_start (from a persona profile) pre-seeds speaker EWMA baselines so
+    the first message already computes a meaningful delta.
+    """
+
+    alpha = 0.3  # EWMA smoothing — lower = more stable baseline
+
+    def __init__(self, warm_start: dict[str, dict[str, float]] | None = None):
+        self.speaker_history: dict[str, list[float]] = {}
+        self.speaker_ewma: dict[str, dict[str, float]] = {}  # running baseline
+        self.per_message_delta: list[dict | None] = []
+
+        # Pre-seed from warm_start (persona profile EWMA)
+        if warm_start:
+            for role, seed in warm_start.items():
+                self.speaker_ewma[role] = {
+                    "valence": seed.get("valence", 0),
+                    "arousal": seed.get("arousal", 0),
+                    "dominance": seed.get("dominance", 0),
+                }
+                self.speaker_history[role] = []
+
+    def push(self, role: str, vad: dict | None) -> None:
+        if not vad or (vad["valence"] == 0 and vad["arousal"] == 0 and vad["dominance"] == 0):
+            self.per_message_delta.append(None)
+            return
+
+        v, a, d = vad["valence"], vad["arousal"], vad["dominance"]
+
+        if role not in self.speaker_ewma:
+            # First message from this speaker: initialize baseline
+            self.speaker_ewma[role] = {"valence": v, "arousal": a, "dominance": d}
+            self.speaker_history[role] = [v]
+            self.per_message_delta.append({
+                "speaker": role,
+                "delta_v": 0.0, "delta_a": 0.0,
+                "baseline_v": v, "baseline_a": a,
+                "shift": None,
+            })
+            return
+
+        bl = self.speaker_ewma[role]
+        dv = round(v - bl["valence"], 3)
+        da = round(a - bl["arousal"], 3)
+
+        # Classify shift
+        shift = None
+        if dv > 0.18 and bl["valence"] < 0.0:
+            shift = "repair"  # positive shift from negative baseline
+        elif dv < -0.25 and bl["valence"] > -0.1:
+            shift = "escalation"  # negative shift from neutral/positive baseline
+        elif abs(dv) > 0.3:
+            shift = "volatility"  # large swing either direction
+
+        self.per_message_delta.append({
+            "speaker": role,
+            "delta_v": dv, "delta_a": da,
+            "baseline_v": round(bl["valence"], 3),
+            "baseline_a": round(bl["arousal"], 3),
+            "shift": shift,
+        })
+
+        # Update EWMA baseline
+        alpha = self.alpha
+        bl["valence"] = round(bl["valence"] * (1 - alpha) + v * alpha, 3)
+        bl["arousal"] = round(bl["arousal"] * (1 - alpha) + a * alpha, 3)
+        bl["dominance"] = round(bl["dominance"] * (1 - alpha) + d * alpha, 3)
+        self.speaker_history.setdefault(role, []).append(v)
+
+    def summary(self) -> dict:
+        """Per-speaker stats + per-message deltas."""
+        speakers = {}
+        for role, hist in self.speaker_history.items():
+            speakers[role] = {
+                "message_count": len(hist),
+                "baseline_final": dict(self.speaker_ewma.get(role, {})),
+                "valence_mean": round(sum(hist) / len(hist), 3) if hist else 0,
+                "valence_range": round(max(hist) - min(hist), 3) if hist else 0,
+            }
+
+        return {
+            "speakers": speakers,
+            "per_message_delta": list(self.per_message_delta),
+        }
 
 
 def compute_state_indices(detections: list, markers: dict) -> dict:
@@ -98,23 +214,36 @@ def compute_state_indices(detections: list, markers: dict) -> dict:
     Returns:
         {trust, conflict, deesc, contributing_markers} clamped to [-1, 1]
     """
-    trust = 0.0
-    conflict = 0.0
-    deesc = 0.0
-    count = 0
-
-    for d in detections:
-        mdef = markers.get(d.marker_id)
-        if mdef and mdef.effect_on_state:
-            eos = mdef.effect_on_state
-            trust += eos.get("trust", 0)
-            conflict += eos.get("conflict", 0)
-            deesc += eos.get("deesc", 0)
-            count += 1
-
-    return {
-        "trust": round(max(-1.0, min(1.0, trust)), 3),
-        "conflict": round(max(-1.0, min(1.0, conflict)), 3),
-        "deesc": round(max(-1.0, min(1.0, deesc)), 3),
-        "contributing_markers": count,
-    }
+    acc = StateIndexAccumulator(markers)
+    acc.push(detections)
+    return acc.indices()
+
+
+class StateIndexAccumulator:
+    """Running state indices: push detections as they come, read indices() any time."""
+
+    def __init__(self, markers: dict):
+        self.markers = markers
+        self.trust = 0.0
+        self.conflict = 0.0
+        self.deesc = 0.0
+        self.count = 0
+
+    def push(self, detections: list) -> None:
+        for d in detections:
+            mdef = self.markers.get(d.marker_id)
+            if mdef and mdef.effect_on_state:
+                eos = mdef.effect_on_state
+                self.trust += eos.get("trust", 0)
+                self.conflict += eos.get("conflict", 0)
+                self.deesc += eos.get("deesc", 0)
+                self.count += 1
+
+    def indices(self) -> dict:
+        """State indices so far (same as compute_state_indices)."""
+        return {
+            "trust": round(max(-1.0, min(1.0, self.trust)), 3),
+            "conflict": round(max(-1.0, min(1.0, self.conflict)), 3),
+            "deesc": round(max(-1.0, min(1.0, self.deesc)), 3),
+            "contributing_markers": self.count,
+        }
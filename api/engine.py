@@ -17,15 +17,30 @@ DRA Mode (Emotions-ATO-Regex-Lexikon):
 
 from __future__ import annotations
 
+import copy
+import hashlib
 import json
 import math
 import re
+import threading
 import time
-from dataclasses import dataclass, field
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, fields
 from pathlib import Path
+from typing import Callable
 
+from .activation import ActivationMatrix
 from .config import settings
+from .prefilter import CODE_VERSION as PREFILTER_VERSION
+from .prefilter import LiteralMatcher, PatternShards, required_literals
+from .snapshot import SnapshotError, file_sha256, read_snapshot, snapshot_path_for
+from .textcache import TextCache
+from .textprep import WORDS_RE, PreparedText, guess_language, strip_technical_noise
 
+# Deduplication: deeper layers win a shared text span
+_LAYER_PRIORITY = {"MEMA": 4, "CLU": 3, "SEM": 2, "ATO": 1, "UNKNOWN": 0}
 
 def _parse_activation_rule(rule_str: str) -> tuple[str, int]:
     """Parse activation rule string into (mode, min_hits).
@@ -70,12 +85,45 @@ def _parse_activation_rule(rule_str: str) -> tuple[str, int]:
     return ("ANY", 1)
 
 
+def _regex_flags(flags: list[str]) -> int:
+    """Translate registry flag names into re flags (always case-insensitive)."""
+    re_flags = re.IGNORECASE  # Default: case-insensitive
+    if "MULTILINE" in flags:
+        re_flags |= re.MULTILINE
+    if "DOTALL" in flags:
+        re_flags |= re.DOTALL
+    return re_flags
+
+
 @dataclass
 class CompiledPattern:
-    """Pre-compiled regex pattern for fast matching."""
+    """Regex pattern, compiled on first use of `compiled`."""
     raw: str
-    compiled: re.Pattern | None
+    re_flags: int = re.IGNORECASE
     flags_str: list[str] = field(default_factory=list)
+    literals: frozenset[str] | None = None  # Prefilter: one must occur for a match
+    literals_known: bool = False            # literals computed (at load or in the snapshot)
+    slot: int = -1                          # Index into the engine's flat ATO pattern table
+    valid: bool | None = None               # None until compiled or known from the snapshot
+    _compiled: re.Pattern | None = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def compiled(self) -> re.Pattern | None:
+        """The compiled regex, or None if the pattern is invalid."""
+        if self._compiled is None and self.valid is not False:
+            try:
+                self._compiled = re.compile(self.raw, self.re_flags) if self.raw else None
+            except (re.error, TypeError):
+                self._compiled = None
+            self.valid = self._compiled is not None
+        return self._compiled
+
+    @property
+    def is_valid(self) -> bool:
+        """Whether the pattern compiles (compiles it unless already known)."""
+        if self.valid is None:
+            self.compiled
+        return bool(self.valid)
 
 
 @dataclass
@@ -103,6 +151,71 @@ class MarkerDef:
     semiotic: dict | None = None            # {peirce, signifikat, cultural_frame, framing_type, ...}
     absence_sets: dict | None = None        # MEMA: sets of markers that must be absent
     gating_conflict: dict | None = None     # MEMA: requirement for active conflict
+    idx: int = -1                           # Interned id: registry position, bit in ActiveMarkers.mask
+
+
+class ActiveMarkers:
+    """Active marker ids of one scope as a set plus an int bitset over MarkerDef.idx.
+
+    Composition checks intersect precomputed masks with `mask`; ids not in
+    the registry (hand-built detections) are kept in `foreign`.
+    """
+
+    __slots__ = ("ids", "mask", "foreign")
+
+    def __init__(self, ids: set[str], bits: dict[str, int]):
+        self.ids = ids
+        self.mask = 0
+        self.foreign: set[str] = set()
+        for mid in ids:
+            bit = bits.get(mid)
+            if bit is None:
+                self.foreign.add(mid)
+            else:
+                self.mask |= bit
+
+
+@dataclass
+class SemPlan:
+    """Load-time compiled activation data of one SEM marker (see detect_sem)."""
+    mdef: MarkerDef
+    refs: tuple[str, ...] = ()   # composed ATO ids in composed_of order (dict refs flattened)
+    n_composed: int = 0          # len(composed_of) when it is a non-empty list, else 0
+    mode: str = "ANY"            # parsed activation rule
+    min_hits: int = 1
+    is_emotion: bool = False     # receives DRA guard modifiers
+    refs_mask: int = 0           # bitset of refs; exact hit test when refs_exact
+    refs_exact: bool = False     # refs are distinct registry ids
+    ceiling: float = 1.0         # highest confidence detect_sem can give it (threshold pruning)
+
+
+@dataclass
+class CluPlan:
+    """Load-time composition data of one CLU marker (see detect_clu)."""
+    mdef: MarkerDef
+    kind: str | None = None        # "list" (composed_of list) | "require" (structured dict) | None
+    refs: tuple[str, ...] = ()     # positive refs in composed_of order
+    neg_refs: tuple[str, ...] = () # negative_evidence.any_of (blocks the CLU)
+    composed_total: int = 1        # denominator of the hit ratio
+    window_size: int = 10          # window.messages
+    ceiling: float = 0.0           # highest confidence detect_clu can give it (threshold pruning)
+
+
+@dataclass
+class MemaPlan:
+    """Load-time keyword and absence data of one MEMA marker (see detect_mema)."""
+    mdef: MarkerDef
+    keywords: frozenset[str] = frozenset()     # detect_class keywords (from id, else description)
+    absence_mask: int | None = None            # bitset of markers whose activity breaks the absence_sets
+    absence_foreign: frozenset[str] = frozenset()  # listed absence ids not in the registry
+
+
+@dataclass
+class LanguagePartition:
+    """Markers exclusive to one language, as indices to skip per message language."""
+    ato_skip: dict[str, frozenset[int]]  # message language → indices into ato_markers
+    ato_exclusive: frozenset[int]        # every language-exclusive ATO
+    sem_skip: dict[str, frozenset[int]]  # message language → indices into the SEM plan
 
 
 @dataclass
@@ -128,6 +241,116 @@ class Detection:
     multiplier: float | None = None
     message_indices: list[int] = field(default_factory=list)
     vad: dict | None = None                 # copied from MarkerDef.vad_estimate
+    first_satisfied: int | None = None      # CLU: first message at which the rule held on the prefix
+
+
+@dataclass
+class AnalysisContext:
+    """Regulator state of analyses (LD 5.1 Quantum Collapse & EWMA precision).
+
+    The compiled registry on MarkerEngine is read-only while analysing;
+    this is the state analyses change. MarkerEngine.regulator is shared by
+    all requests (a caller can keep its own, e.g. per tenant): every
+    analysis runs on a fork() of it, and MarkerEngine.analysis_context
+    replays the fork's updates onto it atomically when the analysis ends.
+    """
+    ewma_precision: float = 0.70               # Target precision
+    confirmed_count: int = 0
+    retracted_count: int = 0
+    dynamic_threshold_modifier: float = 1.0    # Multiplier for thresholds
+    provisional_buffer: list[dict] = field(default_factory=list)  # Active hypotheses
+    # Forks only: emitted CLUs since the fork (confirmed?), and the buffer length at the fork
+    updates: list[bool] | None = field(default=None, repr=False)
+    forked_buffer: int = field(default=0, repr=False)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def fork(self) -> AnalysisContext:
+        with self.lock:
+            return AnalysisContext(
+                self.ewma_precision, self.confirmed_count, self.retracted_count,
+                self.dynamic_threshold_modifier, list(self.provisional_buffer),
+                updates=[], forked_buffer=len(self.provisional_buffer),
+            )
+
+    def track(self, confirmed: bool) -> None:
+        """Count one emitted CLU: multi-hit ones are confirmed, single-hit ones provisional."""
+        if confirmed:
+            self.confirmed_count += 1
+        else:
+            # (In a real stream, we'd wait, here we just track stats)
+            self.retracted_count += 1  # Assume retracted unless confirmed later
+        if self.updates is not None:
+            self.updates.append(confirmed)
+
+
+# (engine, context) of the analysis running in this thread / task, if any
+_active_context: ContextVar[tuple[MarkerEngine, AnalysisContext] | None] = ContextVar(
+    "analysis_context", default=None,
+)
+
+
+def _regulator_field(name: str) -> property:
+    """Engine attribute that reads and writes the current AnalysisContext."""
+    return property(
+        lambda self: getattr(self.context, name),
+        lambda self, value: setattr(self.context, name, value),
+    )
+
+
+class CluContext:
+    """Ref resolution against one conversation's ActivationMatrix.
+
+    A caller that keeps the matrix growing message by message can keep its
+    context too (detect_clu's `ctx`): ref resolutions are only redone when
+    new markers became active, and first_satisfied scans resume after the
+    last message they covered, since a prefix result never changes.
+    """
+
+    def __init__(self, engine: MarkerEngine, matrix: ActivationMatrix):
+        self.engine = engine
+        self.matrix = matrix
+        self._n_columns = -1
+        # (CLU id, threshold) → (last message scanned, first_satisfied found)
+        self.first_satisfied: dict[tuple[str, float], tuple[int, int | None]] = {}
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Pick up markers that became active since the context was built."""
+        if len(self.matrix.columns) == self._n_columns:
+            return
+        self._n_columns = len(self.matrix.columns)
+        self.active = self.engine._active(set(self.matrix.columns))
+        self._matched: dict[str, set[str]] = {}
+        self._resolved_from: dict[str, int | None] = {}
+
+    def matched(self, ref: str) -> set[str]:
+        """Active ids the ref resolves to (all active ids for refs without keywords)."""
+        if ref not in self._matched:
+            self._matched[ref] = self.engine._ref_matches(ref, self.active)
+        return self._matched[ref]
+
+    def resolved_by(self, ref: str, end: int) -> bool:
+        """True if _resolve_ref holds for the markers active in messages 0..end."""
+        if ref not in self._resolved_from:
+            if "_" in ref:
+                firsts = [self.matrix.columns[sid][0] for sid in self.matched(ref)]
+                self._resolved_from[ref] = min(firsts) if firsts else None
+            else:
+                self._resolved_from[ref] = self.matrix.first(ref)  # Exact match only
+        first = self._resolved_from[ref]
+        return first is not None and first <= end
+
+    def matched_fired_in(self, ref: str, lo: int, hi: int) -> bool:
+        """True if any marker the ref resolves to fired in messages lo..hi."""
+        if "_" not in ref:
+            return self.matrix.any_fired_in(lo, hi)
+        return any(self.matrix.fired_in(sid, lo, hi) for sid in self.matched(ref))
+
+    def matched_columns(self, ref: str) -> list[list[int]]:
+        """Message indices (sorted) of each marker the ref resolves to."""
+        if "_" not in ref:
+            return [self.matrix.active_rows]
+        return [self.matrix.columns[sid] for sid in self.matched(ref)]
 
 
 class MarkerEngine:
@@ -141,36 +364,211 @@ class MarkerEngine:
         self.mema_markers: list[MarkerDef] = []
         self.engine_config: dict = {}
         self._loaded = False
+        self._load_lock = threading.RLock()  # Serialises load(); see ensure_loaded()
+        self.load_source: str | None = None           # "snapshot" | "json"
+        self.load_timings: dict[str, float] = {}      # phase → ms of the last load()
+        self.snapshot_status: str | None = None       # why the snapshot was not used
+        self.registry_sha: str | None = None          # sha256 of the loaded registry file
+
+        # --- Per-message results cached by text (invalidated by load) ---
+        self.text_cache = TextCache(
+            settings.analysis_cache_entries, settings.analysis_cache_max_text, settings.analysis_cache_max_chars,
+        )
+        self.conversation_cache = TextCache(  # hash → PreparedTexts
+            settings.conversation_cache_entries, max_chars=settings.conversation_cache_max_chars,
+        )
+        self.subset_cache = TextCache(settings.subset_cache_entries)  # selection hash → sub-engine
+
+        # --- ATO literal prefilter (built in load) ---
+        self._literal_matcher: LiteralMatcher | None = None
+        self._ato_by_literal: dict[str, list[int]] = {}
+        self._ato_always: list[int] = []     # ATO indices with unfilterable patterns
+        self._ato_shards: PatternShards | None = None  # ato_scan_mode == "sharded"
+        self._snapshot_matcher: LiteralMatcher | None = None  # prebuilt automaton from the snapshot
+
+        # --- SEM activation plan (built in load) ---
+        self._sem_plan: list[SemPlan] = []
+        self._sem_by_ato: dict[str, list[int]] = {}  # ATO id → indices of SEMs composed of it
+        self._sem_with_patterns: list[int] = []     # SEMs with own regexes (evaluated always)
+
+        # --- Language partition (built on first use, see _language_partition) ---
+        self._lang_partition: LanguagePartition | None = None
+
+        # --- Interned marker ids (built in load) ---
+        self._marker_ids: list[str] = []        # MarkerDef.idx → id
+        self._marker_bits: dict[str, int] = {}  # id → 1 << idx
+
+        # --- CLU/MEMA composition refs (built in load) ---
+        self._ref_index: dict[str, set[str]] = {}
+        self._ref_targets: dict[str, int | None] = {}  # ref → bitset of ids it resolves to
+
+        # --- CLU composition plan (built in load) ---
+        self._clu_plan: list[CluPlan] = []
+
+        # --- MEMA keyword / absence plan (built in load) ---
+        self._mema_plan: list[MemaPlan] = []
+        self._mema_by_keyword: dict[str, list[int]] = {}      # keyword → MEMA indices
+        self._mema_by_marker: dict[str, tuple[int, ...]] = {}  # marker id → MEMAs whose keywords it contains
+        self._tag_index: dict[str, set[str]] = {}             # uppercase tag → marker ids
 
         # --- Quantum Collapse & EWMA Precision (LD 5.1) ---
-        self.ewma_precision: float = 0.70  # Target precision
         self.alpha: float = 0.2            # Smoothing factor
-        self.confirmed_count: int = 0
-        self.retracted_count: int = 0
-        self.dynamic_threshold_modifier: float = 1.0  # Multiplier for thresholds
-        self.provisional_buffer: list[dict] = []      # Active hypotheses
+        self.regulator = AnalysisContext()  # Shared by requests; see analysis_context()
+
+    # Regulator state of the running analysis (the shared regulator outside one)
+    ewma_precision = _regulator_field("ewma_precision")
+    confirmed_count = _regulator_field("confirmed_count")
+    retracted_count = _regulator_field("retracted_count")
+    dynamic_threshold_modifier = _regulator_field("dynamic_threshold_modifier")
+    provisional_buffer = _regulator_field("provisional_buffer")
+
+    @property
+    def context(self) -> AnalysisContext:
+        """AnalysisContext of the analysis running in this thread, else the shared regulator."""
+        active = _active_context.get()
+        if active is not None and active[0] is self:
+            return active[1]
+        return self.regulator
+
+    @contextmanager
+    def analysis_context(self, base: AnalysisContext | None = None, merge: bool = True):
+        """Run the block on a fork of `base` (default: the shared regulator).
+
+        The block sees a regulator no other thread changes. When it ends,
+        its CLU tracking is replayed onto `base` (see merge_context), so
+        concurrent analyses merge as if they had run one after the other.
+        merge=False leaves the fork for the caller to merge later.
+        """
+        base = base if base is not None else self.regulator
+        ctx = base.fork()
+        token = _active_context.set((self, ctx))
+        try:
+            yield ctx
+        finally:
+            _active_context.reset(token)
+        if merge:
+            self.merge_context(ctx, base)
+
+    def merge_context(self, ctx: AnalysisContext, base: AnalysisContext | None = None) -> None:
+        """Replay the CLU tracking of a fork onto `base` (default: the shared regulator) under its lock."""
+        base = base if base is not None else self.regulator
+        with base.lock:
+            token = _active_context.set((self, base))
+            try:
+                for confirmed in ctx.updates:
+                    base.track(confirmed)
+                    self._update_ewma_precision()
+                base.provisional_buffer.extend(ctx.provisional_buffer[ctx.forked_buffer:])
+            finally:
+                _active_context.reset(token)
+
+    # Kept across load(): caches (cleared instead), regulator and the load lock itself
+    _KEPT_ON_LOAD = frozenset({
+        "text_cache", "conversation_cache", "subset_cache", "alpha", "regulator", "_load_lock", "_loaded",
+    })
+
+    def load(self, registry_path: str | None = None, *, use_snapshot: bool | None = None):
+        """Load all markers, preferring the binary snapshot over the JSON registry.
+
+        The snapshot (see api/snapshot.py) is used when it was built from the
+        exact registry file being loaded; regexes are then compiled lazily on
+        first use. Per-phase timings are kept in `load_timings` (ms).
+
+        Idempotent and thread-safe: the registry is indexed on a fresh
+        engine and its state swapped in once complete, so calling load()
+        twice does not accumulate duplicate markers and analyses running
+        meanwhile never see half-built plans. Loads are serialised; lazy
+        callers go through ensure_loaded(), which loads only once.
+        """
+        with self._load_lock:
+            staged = MarkerEngine()
+            staged._build(registry_path, use_snapshot)
+            for name, value in vars(staged).items():
+                if name not in self._KEPT_ON_LOAD:
+                    setattr(self, name, value)
+            self.text_cache.clear()
+            self.conversation_cache.clear()
+            self.subset_cache.clear()
+            self._loaded = True
+
+    def ensure_loaded(self) -> None:
+        """load() unless already loaded (once, however many threads ask at the same time)."""
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    self.load()
 
-    def load(self, registry_path: str | None = None):
-        """Load and compile all markers from the registry.
+    def _build(self, registry_path: str | None, use_snapshot: bool | None) -> None:
+        """Read the registry (or its snapshot) and index it into this, still unloaded, engine."""
+        t_start = t_phase = time.perf_counter()
+        timings: dict[str, float] = {}
 
-        Idempotent: clears all state before loading so calling load()
-        twice does not accumulate duplicate markers.
-        """
-        self.markers.clear()
-        self.ato_markers.clear()
-        self.sem_markers.clear()
-        self.clu_markers.clear()
-        self.mema_markers.clear()
+        def phase(name: str):
+            nonlocal t_phase
+            now = time.perf_counter()
+            timings[name] = round((now - t_phase) * 1000, 2)
+            t_phase = now
 
         path = Path(registry_path or settings.registry_path)
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        self.registry_sha = file_sha256(path)
+        if use_snapshot is None:
+            use_snapshot = settings.registry_snapshot
+
+        payload = None
+        self._snapshot_matcher = None
+        self.snapshot_status = "disabled"
+        if use_snapshot:
+            try:
+                payload = read_snapshot(snapshot_path_for(path), path)
+                self.snapshot_status = None
+            except SnapshotError as e:
+                self.snapshot_status = str(e)
+
+        mismatch = self._load_snapshot_payload(payload) if payload is not None else None
+        if payload is not None and mismatch is None:
+            self.load_source = "snapshot"
+            phase("read_snapshot")
+            mdefs = self._markers_from_snapshot(payload)
+        else:
+            if mismatch is not None:
+                self.snapshot_status = mismatch
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.load_source = "json"
+            self.engine_config = data.get("ld5_engine", {})
+            phase("read_json")
+            mdefs = (
+                self._parse_marker(marker_id, mdata)
+                for marker_id, mdata in data.get("markers", {}).items()
+            )
 
-        self.engine_config = data.get("ld5_engine", {})
+        self._index(mdefs, phase)
 
-        for marker_id, mdata in data.get("markers", {}).items():
-            mdef = self._parse_marker(marker_id, mdata)
-            self.markers[marker_id] = mdef
+        timings["total"] = round((time.perf_counter() - t_start) * 1000, 2)
+        self.load_timings = timings
+
+    def warm(self) -> None:
+        """Do up front what the first requests would do lazily: compile every
+        regex and ATO shard, build the language partition, load the prosody
+        scorer. Used before forking workers (api/prefork.py) so these objects
+        are shared between them instead of built in each.
+        """
+        from .prosody import get_scorer
+
+        self.ensure_loaded()
+        for mdef in self.markers.values():
+            for pat in mdef.patterns:
+                pat.compiled
+        if self._ato_shards is not None:
+            for node in self._ato_shards.roots:
+                node.regex()
+        self._language_partition()
+        get_scorer()
+
+    def _index(self, mdefs, phase=lambda name: None):
+        """Register MarkerDefs (in registry order) and build all lookup tables and plans."""
+        for mdef in mdefs:
+            self.markers[mdef.id] = mdef
 
             if mdef.layer == "ATO":
                 self.ato_markers.append(mdef)
@@ -184,35 +582,564 @@ class MarkerEngine:
         # Build fuzzy reference index for CLU/MEMA composition matching.
         # Maps keyword fragments to marker IDs so "SEM_ANGER_ESCALATION"
         # resolves to "SEM_ANGER" or any SEM containing those keywords.
-        self._ref_index: dict[str, set[str]] = {}
+        self._ref_index = {}
         for mid in self.markers:
             # Index each meaningful segment: SEM_ANGER_ESCALATION → {"ANGER", "ESCALATION"}
             parts = mid.split("_")[1:]  # Drop layer prefix
             for part in parts:
                 self._ref_index.setdefault(part.upper(), set()).add(mid)
 
-        self._loaded = True
+        # Intern ids: registry position → bit in ActiveMarkers.mask
+        self._marker_ids = list(self.markers)
+        self._marker_bits = {}
+        for idx, mdef in enumerate(self.markers.values()):
+            mdef.idx = idx
+            self._marker_bits[mdef.id] = 1 << idx
+        phase("markers")
 
-    def _resolve_ref(self, ref: str, active_ids: set[str]) -> bool:
-        """Check if a composed_of reference is satisfied by active markers.
+        self._build_ref_table()
+        phase("ref_table")
+        self._build_clu_plan()
+        self._build_mema_plan()
+        phase("clu_mema_plan")
+
+        self._build_sem_plan()
+        phase("sem_plan")
+        self._build_ato_prefilter()
+        phase("ato_prefilter")
+        self._build_ato_shards()
+        phase("ato_shards")
+        self._lang_partition = None
+
+    # --- Registry snapshot (tools/build_snapshot.py) ---
 
-        Tries exact match first, then keyword-based fuzzy matching.
+    _SNAPSHOT_PATTERN_FIELDS = ("raw", "re_flags", "flags_str", "literals", "literals_known", "valid")
+
+    @staticmethod
+    def _snapshot_marker_fields() -> list[str]:
+        """MarkerDef fields stored per marker (patterns separately, idx assigned at load)."""
+        return [f.name for f in fields(MarkerDef) if f.name not in ("patterns", "idx")]
+
+    def snapshot_payload(self) -> dict:
+        """Serializable form of the loaded registry for api/snapshot.py.
+
+        Compiles every pattern once (to record validity) and computes the
+        prefilter literals of all ATO patterns, so a snapshot load needs
+        neither. The literals are tagged with the prefilter's CODE_VERSION:
+        after a change to the extraction the snapshot is no longer used.
         """
-        if ref in active_ids:
-            return True
+        marker_fields = self._snapshot_marker_fields()
+        markers = []
+        for mdef in self.markers.values():
+            patterns = []
+            for pat in mdef.patterns:
+                if pat.is_valid and not pat.literals_known and mdef.layer == "ATO":
+                    pat.literals = required_literals(pat.raw, pat.re_flags)
+                    pat.literals_known = True
+                patterns.append((
+                    pat.raw, int(pat.re_flags), list(pat.flags_str), pat.literals, pat.literals_known, pat.valid,
+                ))
+            markers.append((tuple(getattr(mdef, name) for name in marker_fields), patterns))
+        by_literal: set[str] = set()
+        for mdef in self.ato_markers:
+            for pat in mdef.patterns:
+                if pat.literals_known and pat.literals:
+                    by_literal |= pat.literals
+        return {
+            "engine_config": self.engine_config,
+            "marker_fields": marker_fields,
+            "pattern_fields": list(self._SNAPSHOT_PATTERN_FIELDS),
+            "markers": markers,
+            "prefilter_version": PREFILTER_VERSION,
+            "ato_literal_matcher": LiteralMatcher(by_literal).state(),
+        }
+
+    def _load_snapshot_payload(self, payload: dict) -> str | None:
+        """Check that a snapshot payload matches the current code; why not if it does not."""
+        if payload.get("marker_fields") != self._snapshot_marker_fields():
+            return "snapshot fields do not match MarkerDef"
+        if payload.get("pattern_fields") != list(self._SNAPSHOT_PATTERN_FIELDS):
+            return "snapshot fields do not match MarkerDef"
+        if payload.get("prefilter_version") != PREFILTER_VERSION:
+            return "snapshot literals were extracted by other prefilter code"
+        self.engine_config = payload.get("engine_config", {})
+        state = payload.get("ato_literal_matcher")
+        self._snapshot_matcher = LiteralMatcher.from_state(state) if state else None
+        return None
+
+    @staticmethod
+    def _markers_from_snapshot(payload: dict):
+        marker_fields = payload["marker_fields"]
+        for values, patterns in payload["markers"]:
+            mdef = MarkerDef(
+                patterns=[
+                    CompiledPattern(
+                        raw=raw, re_flags=re_flags, flags_str=flags_str,
+                        literals=literals, literals_known=literals_known, valid=valid,
+                    )
+                    for raw, re_flags, flags_str, literals, literals_known, valid in patterns
+                ],
+                **dict(zip(marker_fields, values)),
+            )
+            yield mdef
+
+    def _build_sem_plan(self):
+        """Pre-parse SEM activation rules and index SEMs by their composed ATOs.
+
+        A SEM only emits a detection with contributing matches, which come
+        from its composed ATOs or its own patterns. detect_sem therefore only
+        evaluates SEMs with own patterns or at least one active composed ATO.
+        """
+        self._sem_plan = []
+        self._sem_by_ato = {}
+        self._sem_with_patterns = []
+
+        for idx, mdef in enumerate(self.sem_markers):
+            plan = SemPlan(mdef=mdef)
+            composed = mdef.composed_of
+            if isinstance(composed, list) and composed:
+                refs = []
+                for c in composed:
+                    if isinstance(c, str):
+                        refs.append(c)
+                    elif isinstance(c, dict):
+                        refs.extend(str(mid) for mid in c.get("marker_ids", []))
+                plan.refs = tuple(refs)
+                plan.n_composed = len(composed)
+
+                # LD 5.0: generic activation rule parser
+                activation = mdef.activation or {}
+                if isinstance(activation, str):
+                    rule_raw = activation
+                elif isinstance(activation, dict) and "rule" in activation:
+                    rule_raw = activation["rule"]
+                elif isinstance(activation, dict) and "min_components" in activation:
+                    # Structured activation: {mode, min_components, window}
+                    rule_raw = f"ANY {activation['min_components']}"
+                else:
+                    # No activation rule → LD 5.0: SEM = 1 ATO + context
+                    rule_raw = "ANY 1"
+                plan.mode, plan.min_hits = _parse_activation_rule(str(rule_raw))
+
+                # ALL mode: every composed_of ref must be active
+                if plan.mode == "ALL":
+                    plan.min_hits = len(composed)
+
+            plan.is_emotion = any(tag in mdef.tags for tag in self._EMOTION_SEM_TAGS)
+            # Also treat SEMs composed of emotion ATOs as emotion SEMs
+            if not plan.is_emotion and isinstance(composed, list):
+                plan.is_emotion = any(
+                    isinstance(c, str) and self._is_emotion_ato(c)
+                    for c in composed
+                )
+
+            plan.refs_mask = self._mask_of(plan.refs)
+            plan.refs_exact = (
+                len(set(plan.refs)) == len(plan.refs)
+                and all(ref in self._marker_bits for ref in plan.refs)
+            )
+            plan.ceiling = self._sem_ceiling(plan)
+
+            self._sem_plan.append(plan)
+            for ref in dict.fromkeys(plan.refs):
+                self._sem_by_ato.setdefault(ref, []).append(idx)
+            if mdef.patterns:
+                self._sem_with_patterns.append(idx)
+
+    def _build_ato_prefilter(self):
+        """Index required literals of all ATO patterns for candidate selection.
+
+        A marker is a candidate for a message if any of its patterns has no
+        extractable literal, or one of its pattern literals occurs in the
+        case-folded text. Non-candidates cannot produce a match.
+        """
+        self._literal_matcher = None
+        self._ato_by_literal = {}
+        self._ato_always = []
+        if not settings.ato_prefilter:
+            return
+
+        for idx, mdef in enumerate(self.ato_markers):
+            always = False
+            for pat in mdef.patterns:
+                if not pat.is_valid:
+                    continue
+                if not pat.literals_known:
+                    pat.literals = required_literals(pat.raw, pat.re_flags)
+                    pat.literals_known = True
+                if pat.literals is None:
+                    always = True
+                    continue
+                for lit in pat.literals:
+                    by_lit = self._ato_by_literal.setdefault(lit, [])
+                    if not by_lit or by_lit[-1] != idx:
+                        by_lit.append(idx)
+            if always:
+                self._ato_always.append(idx)
+
+        matcher = self._snapshot_matcher
+        if matcher is None or matcher.literals() != self._ato_by_literal.keys():
+            matcher = LiteralMatcher(self._ato_by_literal)
+        self._literal_matcher = matcher
+
+    def _build_ato_shards(self):
+        """Number all ATO patterns and, in sharded mode, compile alternation shards."""
+        slot = 0
+        for mdef in self.ato_markers:
+            for pat in mdef.patterns:
+                pat.slot = slot
+                slot += 1
+
+        self._ato_shards = None
+        if settings.ato_scan_mode == "sharded":
+            self._ato_shards = PatternShards(
+                (pat.slot, pat.raw, pat.compiled)
+                for mdef in self.ato_markers
+                for pat in mdef.patterns
+                if pat.is_valid
+            )
+
+    _LANGUAGES = ("de", "en")
+
+    def _language_partition(self) -> LanguagePartition:
+        """Language-exclusive ATOs/SEMs, classified on first use.
+
+        Classifying reads every positive example (~10 ms), so like regex
+        compilation it is kept out of load().
+        """
+        if self._lang_partition is None:
+            ato_skip = self._language_skips(enumerate(self.ato_markers))
+            self._lang_partition = LanguagePartition(
+                ato_skip=ato_skip,
+                ato_exclusive=frozenset().union(*ato_skip.values()),
+                sem_skip=self._language_skips((i, self._sem_plan[i].mdef) for i in self._sem_with_patterns),
+            )
+        return self._lang_partition
+
+    @classmethod
+    def _language_skips(cls, indexed) -> dict[str, frozenset[int]]:
+        """Per message language, the indices of (index, MarkerDef) pairs exclusive to another language.
+
+        The lang tag alone is not reliable — many "en" ATOs match German words
+        (ATO_TIME_REFERENCE: "immer", "heute") — so a marker counts as
+        exclusive only if all its positive examples read as its language too.
+        """
+        exclusive: dict[str, set[int]] = {lang: set() for lang in cls._LANGUAGES}
+        for idx, mdef in indexed:
+            if mdef.lang not in exclusive:
+                continue
+            examples = [x for x in (mdef.examples or {}).get("positive") or [] if isinstance(x, str)]
+            if examples and all(guess_language(WORDS_RE.findall(x)) == mdef.lang for x in examples):
+                exclusive[mdef.lang].add(idx)
+        return {
+            lang: frozenset().union(*(ids for other, ids in exclusive.items() if other != lang))
+            for lang in cls._LANGUAGES
+        }
+
+    @staticmethod
+    def _message_language(prepared: PreparedText, lang: str | None) -> str | None:
+        """Language a message is scanned as: explicit lang, else the guess (if enabled)."""
+        if lang is None and settings.language_partition:
+            return prepared.language
+        return lang
+
+    def _ato_candidates(
+        self, prepared: PreparedText, lang: str | None = None,
+    ) -> tuple[list[MarkerDef], set[str] | None]:
+        """Select ATO markers whose patterns can match the noise-stripped text.
+
+        Returns (markers in registry order, literals found). The literal set is
+        None when the prefilter is disabled and every pattern must be scanned.
+        Markers exclusive to another language than the message's are left
+        out; the language is only guessed when such a marker is a candidate.
+        """
+        partition = self._language_partition()
+        if self._literal_matcher is None:
+            skip = partition.ato_skip.get(self._message_language(prepared, lang), frozenset())
+            if not skip:
+                return self.ato_markers, None
+            return [mdef for i, mdef in enumerate(self.ato_markers) if i not in skip], None
+
+        found = self._literal_matcher.find(prepared.folded)
+        candidates = set(self._ato_always)
+        for lit in found:
+            candidates.update(self._ato_by_literal[lit])
+        if not candidates.isdisjoint(partition.ato_exclusive):
+            candidates -= partition.ato_skip.get(self._message_language(prepared, lang), frozenset())
+        return [self.ato_markers[i] for i in sorted(candidates)], found
+
+    @staticmethod
+    def _composition_refs(composed) -> list[str]:
+        """All marker refs named by a CLU/MEMA composed_of (list or structured dict)."""
+        refs: list[str] = []
+        if isinstance(composed, list):
+            for c in composed:
+                if isinstance(c, str):
+                    refs.append(c)
+                elif isinstance(c, dict):
+                    refs.extend(str(mid) for mid in c.get("marker_ids", []))
+        elif isinstance(composed, dict):
+            require = composed.get("require", composed.get("sem_pool", []))
+            neg = composed.get("negative_evidence", {})
+            for group in (require, neg.get("any_of", []) if isinstance(neg, dict) else []):
+                if isinstance(group, list):
+                    refs.extend(c for c in group if isinstance(c, str))
+        return refs
+
+    def _build_ref_table(self):
+        """Resolve every CLU/MEMA composed_of ref against the static registry.
+
+        A ref like "SEM_ANGER_ESCALATION" matches a marker id when every
+        keyword part ("ANGER", "ESCALATION") is a substring of the id. Parts
+        never contain "_", so they can only match inside one id segment:
+        candidates come from the segment index (_ref_index plus layer
+        prefixes), one str.find scan per part over all segment keys.
+        Runtime resolution is then a set intersection with the active ids.
+        """
+        ids_containing = self._substring_finder()
+        self._ref_targets = {}
+        for mdef in (*self.clu_markers, *self.mema_markers):
+            for ref in self._composition_refs(mdef.composed_of):
+                if ref not in self._ref_targets:
+                    targets = self._compute_ref_targets(ref, ids_containing)
+                    self._ref_targets[ref] = None if targets is None else self._mask_of(targets)
+
+    def _substring_finder(self):
+        """Return f(word) → registry ids whose uppercase id contains word ("_"-free).
+
+        Built from the segment index (_ref_index plus layer prefixes) with one
+        str.find scan over all joined segment keys per lookup.
+        """
+        segments: dict[str, set[str]] = {key: set(mids) for key, mids in self._ref_index.items()}
+        for mid in self.markers:
+            segments.setdefault(mid.split("_")[0].upper(), set()).add(mid)
+        keys = list(segments)
+        blob = "\n".join(keys)
+        starts = []
+        pos = 0
+        for key in keys:
+            starts.append(pos)
+            pos += len(key) + 1
+
+        def ids_containing(word: str) -> set[str]:
+            ids: set[str] = set()
+            i = blob.find(word)
+            while i != -1:
+                k = bisect_right(starts, i) - 1
+                ids |= segments[keys[k]]
+                i = blob.find(word, starts[k + 1]) if k + 1 < len(keys) else -1
+            return ids
+
+        return ids_containing
+
+    def _sem_ceiling(self, plan: SemPlan) -> float:
+        """Upper bound of the confidence detect_sem can reach for a SEM.
+
+        Follows detect_sem's paths with every composed ATO active: the
+        composition rule (or Quantum Collapse below min_hits) scaled by
+        compositionality, own-pattern hits, and the largest DRA boost for
+        emotion SEMs. SEMs whose ceiling is below the threshold are skipped.
+        """
+        mdef = plan.mdef
+        ceiling = 0.0
+        if plan.n_composed:
+            if plan.refs_exact:
+                max_hits = len(plan.refs)
+            else:
+                max_hits = sum(1 for ref in plan.refs if ref in self._marker_bits)
+            hit_ratio = max_hits / plan.n_composed
+            if max_hits >= plan.min_hits:
+                if plan.min_hits >= 2 or plan.mode == "ALL":
+                    ceiling = 0.7 + (hit_ratio * 0.3)
+                else:
+                    ceiling = 0.6 + (hit_ratio * 0.4)
+            elif max_hits and plan.mode == "ANY" and mdef.semiotic:
+                ceiling = 0.5 + (hit_ratio * 0.3)  # Collapse only
+            ceiling *= self._COMPOSITIONALITY_FACTOR.get(mdef.compositionality, 1.0)
+        if mdef.patterns:
+            base = (mdef.scoring or {}).get("base", 1.0)
+            # min(1.0, 0.5 + n * 0.1 * base) over n >= 1 own-pattern matches
+            ceiling = max(ceiling, 1.0 if base > 0 else 0.5 + 0.1 * base)
+        if plan.is_emotion:
+            ceiling = min(1.0, ceiling + self._DRA_MAX_BOOST)
+        return ceiling
+
+    def _build_clu_plan(self):
+        """Pre-extract CLU refs, negative evidence, hit-ratio denominator, window and ceiling."""
+        self._clu_plan = []
+        for mdef in self.clu_markers:
+            plan = CluPlan(mdef=mdef, window_size=(mdef.window or {}).get("messages", 10))
+            composed = mdef.composed_of
+            if isinstance(composed, list):
+                plan.composed_total = len(composed)
+                if composed:
+                    plan.kind = "list"
+                    plan.refs = tuple(c for c in composed if isinstance(c, str))
+            elif isinstance(composed, dict):
+                # Structured activation: require + k_of_n + negative_evidence
+                require_refs = composed.get("require", composed.get("sem_pool", []))
+                neg_evidence = composed.get("negative_evidence", {})
+                neg_refs = neg_evidence.get("any_of", []) if isinstance(neg_evidence, dict) else []
+                plan.kind = "require"
+                plan.composed_total = len(require_refs) if isinstance(require_refs, list) else 1
+                if isinstance(require_refs, list):
+                    plan.refs = tuple(c for c in require_refs if isinstance(c, str))
+                if isinstance(neg_refs, list):
+                    plan.neg_refs = tuple(c for c in neg_refs if isinstance(c, str))
+            # Confidence grows with the distinct refs hit in the window (at most all of them)
+            max_hits = len(set(plan.refs))
+            if max_hits:
+                plan.ceiling = max(self._clu_confidence(plan, hits) for hits in {1, max_hits})
+            self._clu_plan.append(plan)
+
+    def _build_mema_plan(self):
+        """Precompute MEMA detect_class keywords, absence sets and their indexes.
+
+        detect_mema then counts keyword-related active markers by walking the
+        active ids through _mema_by_marker instead of testing every keyword
+        of every MEMA against every active id.
+        """
+        self._tag_index = {}
+        for mid, mdef in self.markers.items():
+            for tag in mdef.tags:
+                self._tag_index.setdefault(tag.upper(), set()).add(mid)
+
+        ids_containing = self._substring_finder()
+        self._mema_plan = []
+        self._mema_by_keyword = {}
+        by_marker: dict[str, list[int]] = {}
+        for idx, mdef in enumerate(self.mema_markers):
+            plan = MemaPlan(mdef=mdef)
+            if mdef.detect_class:
+                plan.keywords = self._mema_keywords(mdef)
+                for kw in plan.keywords:
+                    self._mema_by_keyword.setdefault(kw, []).append(idx)
+                    if "_" in kw:  # Description words may span id segments
+                        containing = {mid for mid in self.markers if kw in mid.upper()}
+                    else:
+                        containing = ids_containing(kw)
+                    for mid in containing:
+                        marker_memas = by_marker.setdefault(mid, [])
+                        if not marker_memas or marker_memas[-1] != idx:
+                            marker_memas.append(idx)
+
+            absence_sets = mdef.absence_sets or mdef.frame.get("absence_sets")
+            if absence_sets:
+                breaking: set[str] = set()
+                for sdef in absence_sets.values():
+                    breaking.update(sdef.get("ids", []))
+                    for tag in sdef.get("tags", []):
+                        breaking |= self._tag_index.get(tag.upper(), set())
+                plan.absence_mask = self._mask_of(breaking)
+                plan.absence_foreign = frozenset(breaking - self._marker_bits.keys())
+            self._mema_plan.append(plan)
+        self._mema_by_marker = {mid: tuple(memas) for mid, memas in by_marker.items()}
+
+    # Active CLU families/tags MEMA absence gating and absence_meta look at
+    _CONFLICT_INDICATORS = frozenset({"CONFLICT", "GRIEF", "UNCERTAINTY", "ESCALATION", "ACCUSATION", "BLAME"})
+    _NEGATIVE_FAMILIES = frozenset({"CONFLICT", "GRIEF", "UNCERTAINTY", "ESCALATION"})
+    _POSITIVE_FAMILIES = frozenset({"SUPPORT", "COMMITMENT", "REPAIR"})
+
+    _STRUCTURAL_KW = frozenset({
+        "MARKER", "TEXT", "AUDIO", "PROSODY", "PATTERN",
+        "ALERT", "TREND", "PROFILE", "META", "CLUSTER", "ABSENCE", "IN",
+    })
 
-        # Fuzzy: extract keywords from ref and check if any active marker
-        # contains all those keywords
-        parts = ref.split("_")[1:]  # Drop layer prefix
+    @classmethod
+    def _mema_keywords(cls, mdef: MarkerDef) -> frozenset[str]:
+        """MEMA keywords for detect_class matching (exclude structural noise)."""
+        mema_keywords = set(
+            kw.upper() for kw in mdef.id.replace("MEMA_", "").split("_")
+            if len(kw) >= 3 and kw.upper() not in cls._STRUCTURAL_KW
+        )
+        if not mema_keywords:
+            # Fallback to description keywords if ID is too generic
+            desc_words = re.findall(r"\w+", mdef.description.upper())
+            mema_keywords = {w for w in desc_words if len(w) > 4 and w not in cls._STRUCTURAL_KW}
+        return frozenset(mema_keywords)
+
+    @staticmethod
+    def _compute_ref_targets(ref: str, ids_containing) -> frozenset[str] | None:
+        """Registry ids matching all keyword parts of ref; None if ref has no parts."""
+        parts = [p.upper() for p in ref.split("_")[1:]]  # Drop layer prefix
         if not parts:
-            return False
+            return None
+        # Most selective (longest) part from the index, the rest by direct check
+        parts.sort(key=len, reverse=True)
+        ids = ids_containing(parts[0])
+        for part in parts[1:]:
+            ids = {mid for mid in ids if part in mid.upper()}
+        return frozenset(ids)
+
+    def _ref_target_mask(self, ref: str) -> int | None:
+        """Bitset of registry ids ref resolves to; None if ref has no keyword parts."""
+        if ref not in self._ref_targets:
+            targets = self._compute_ref_targets(
+                ref, lambda part: {mid for mid in self.markers if part in mid.upper()}
+            )
+            self._ref_targets[ref] = None if targets is None else self._mask_of(targets)
+        return self._ref_targets[ref]
 
-        for active_id in active_ids:
-            active_upper = active_id.upper()
-            if all(p.upper() in active_upper for p in parts):
-                return True
+    @staticmethod
+    def _foreign_matches(ref: str, foreign: set[str]) -> set[str]:
+        """Non-registry active ids matching ref by the plain substring rule."""
+        parts = [p.upper() for p in ref.split("_")[1:]]
+        return {sid for sid in foreign if sid == ref or all(p in sid.upper() for p in parts)}
 
-        return False
+    def _ref_matches(self, ref: str, active: ActiveMarkers | set[str]) -> set[str]:
+        """Active ids a composed_of ref resolves to (exact id or all keyword parts).
+
+        A ref without keyword parts matches every active id.
+        """
+        if not isinstance(active, ActiveMarkers):
+            active = self._active(active)
+        targets = self._ref_target_mask(ref)
+        if targets is None:
+            return set(active.ids)
+
+        matched = set(self._ids_of(targets & active.mask))
+        if ref in active.ids:
+            matched.add(ref)
+        if active.foreign:
+            matched |= self._foreign_matches(ref, active.foreign)
+        return matched
+
+    def _resolve_ref(self, ref: str, active: ActiveMarkers | set[str]) -> bool:
+        """Check if a composed_of reference is satisfied by active markers.
+
+        Tries exact match first, then keyword-based fuzzy matching via the
+        precomputed ref table.
+        """
+        if not isinstance(active, ActiveMarkers):
+            active = self._active(active)
+        if ref in active.ids:
+            return True
+        if "_" not in ref:
+            return False  # No keywords to match fuzzily
+        if self._ref_target_mask(ref) & active.mask:
+            return True
+        return bool(active.foreign) and bool(self._foreign_matches(ref, active.foreign))
+
+    def _active(self, ids: set[str]) -> ActiveMarkers:
+        return ActiveMarkers(ids, self._marker_bits)
+
+    def _mask_of(self, ids) -> int:
+        """Bitset of the registry ids among ids (others are ignored)."""
+        bits = self._marker_bits
+        mask = 0
+        for mid in ids:
+            mask |= bits.get(mid, 0)
+        return mask
+
+    def _ids_of(self, mask: int) -> list[str]:
+        """Marker ids of the set bits of mask, in registry order."""
+        ids = self._marker_ids
+        out = []
+        while mask:
+            low = mask & -mask
+            out.append(ids[low.bit_length() - 1])
+            mask ^= low
+        return out
 
     # -----------------------------------------------------------------------
     # DRA Guard IDs and emotion marker prefixes
@@ -223,6 +1150,14 @@ class MarkerEngine:
     _INTENSITY_LOW_ID = "ATO_EMO_INTENSIFIER_LOW"
     _PUNCT_INTENSITY_ID = "ATO_EMO_PUNCT_INTENSITY"
     _EMO_LEX_PREFIX = "ATO_EMO_LEX_"
+    _DRA_MAX_BOOST = 0.15 + 0.1  # intensity_high + punct_intensity
+    # Discount of composed SEM confidence: ATOs need relational context /
+    # meaning only through the full constellation (deterministic: none)
+    _COMPOSITIONALITY_FACTOR = {"contextual": 0.70, "emergent": 0.50}
+    _EMOTION_SEM_TAGS = (
+        "emotion", "shame", "anger", "sadness", "fear", "joy", "disgust", "love",
+        "envy", "pride", "hope", "loneliness", "grief", "intuition",
+    )
 
     def _is_emotion_ato(self, marker_id: str) -> bool:
         """Check if an ATO is an emotion lexicon marker."""
@@ -365,7 +1300,7 @@ class MarkerEngine:
         return gated, suppressed, surfaced
 
     def _parse_marker(self, marker_id: str, data: dict) -> MarkerDef:
-        """Parse a marker from registry data, compiling regex patterns."""
+        """Parse a marker from registry data (regexes compile on first use)."""
         patterns = []
         for p in data.get("patterns", []):
             ptype = p.get("type", "regex") if isinstance(p, dict) else "regex"
@@ -373,8 +1308,7 @@ class MarkerEngine:
                 continue  # Skip emoji, audio, etc.
             raw = str(p.get("value", "")) if isinstance(p, dict) else str(p)
             flags = p.get("flags", []) if isinstance(p, dict) else []
-            compiled = self._compile_pattern(raw, flags)
-            patterns.append(CompiledPattern(raw=raw, compiled=compiled, flags_str=flags))
+            patterns.append(CompiledPattern(raw=raw, re_flags=_regex_flags(flags), flags_str=flags))
 
         return MarkerDef(
             id=marker_id,
@@ -401,49 +1335,14 @@ class MarkerEngine:
             gating_conflict=data.get("gating_conflict"),
         )
 
-    def _compile_pattern(self, raw: str, flags: list[str]) -> re.Pattern | None:
-        """Compile a regex pattern, returning None if invalid."""
-        if not raw or not isinstance(raw, str):
-            return None
-        try:
-            re_flags = re.IGNORECASE  # Default: case-insensitive
-            if "MULTILINE" in flags:
-                re_flags |= re.MULTILINE
-            if "DOTALL" in flags:
-                re_flags |= re.DOTALL
-            return re.compile(raw, re_flags)
-        except (re.error, TypeError):
-            return None
-
     # -----------------------------------------------------------------------
     # Text Preprocessing
     # -----------------------------------------------------------------------
 
-    _URL_RE = re.compile(
-        r'https?://[^\s<>\"\')]+|www\.[^\s<>\"\')]+', re.IGNORECASE
-    )
-    _EMAIL_RE = re.compile(
-        r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', re.IGNORECASE
-    )
-    # Aggressive Phone Regex: +49..., 0170..., with spaces/dashes
-    _PHONE_RE = re.compile(
-        r'(?:phone|Phone|Tel|Tel\.)\s*[:\s]*\+?[\d\s\-\(\)]{7,25}|\+[\d\s\-\(\)]{7,25}',
-        re.IGNORECASE
-    )
-    # WhatsApp / Chat metadata: [Date, Time] Name:, <Anhang: ...>, etc.
-    _META_RE = re.compile(
-        r'\[\d{2}\.\d{2}\.\d{2}, \d{2}:\d{2}(?::\d{2})?\]|<\w+: [^>]+>|\d{2}\.\d{2}\.\d{2}, \d{2}:\d{2} - ', 
-        re.IGNORECASE
-    )
-
-    @classmethod
-    def _strip_technical_noise(cls, text: str) -> str:
+    @staticmethod
+    def _strip_technical_noise(text: str) -> str:
         """Replace URLs, emails, phone numbers and chat metadata with whitespace."""
-        text = cls._URL_RE.sub(lambda m: ' ' * len(m.group()), text)
-        text = cls._EMAIL_RE.sub(lambda m: ' ' * len(m.group()), text)
-        text = cls._PHONE_RE.sub(lambda m: ' ' * len(m.group()), text)
-        text = cls._META_RE.sub(lambda m: ' ' * len(m.group()), text)
-        return text
+        return strip_technical_noise(text)
 
     @classmethod
     def _is_noise_match(cls, text: str) -> bool:
@@ -469,83 +1368,194 @@ class MarkerEngine:
     # ATO Detection (Level 1): Pure regex matching
     # -----------------------------------------------------------------------
 
-    def detect_ato(
-        self, text: str, threshold: float = 0.5, *, include_context_only: bool = True
-    ) -> list[Detection]:
-        """Detect atomic markers via regex pattern matching.
+    def _derived(self, prepared: PreparedText, kind: str, text: str, compute, per_registry: bool = True):
+        """`compute()` for one message text, kept on the PreparedText and in the text cache."""
+        key = (kind, self.registry_sha if per_registry else None, text)
+        derived = prepared.derived
+        if key not in derived:
+            derived[key] = self.text_cache.get_or_compute(key, compute, text)
+        return derived[key]
 
-        Args:
-            include_context_only: If False, markers tagged 'context_only' are
-                suppressed from the returned list (but should still be passed
-                to SEM via a separate call with include_context_only=True).
+    def _ato_scan(self, prepared: PreparedText, lang: str | None = None, evidence: str = "all") -> tuple:
+        """Threshold-free ATO scan: (mdef, matches, unrounded confidence) per hit.
+
+        Depends on the noise-stripped text only (the guessed language is a
+        function of the text), so it is cached per text, explicit lang and
+        evidence mode.
         """
-        # Strip technical noise before matching to avoid FPs
-        text = self._strip_technical_noise(text)
-        detections = []
+        kind = "ato" if lang is None else f"ato:{lang}"
+        if evidence != "all":
+            kind = f"{kind}/{evidence}"
+        return self._derived(prepared, kind, prepared.text, lambda: self._scan_ato(prepared, lang, evidence))
+
+    def _scan_ato(self, prepared: PreparedText, lang: str | None = None, evidence: str = "all") -> tuple:
+        # Match against the noise-stripped text to avoid FPs
+        text = prepared.text
+        hits = []
+        # "first" / "none": stop at a pattern's first (non-noise) match —
+        # coverage only counts distinct patterns; "none" keeps no Match at all
+        early_exit = evidence != "all"
+        keep = evidence != "none"
+
+        scan, found = self._ato_candidates(prepared, lang)
+        hit_slots = None
+        if self._ato_shards is not None:
+            # Sharded mode: a few combined searches decide which patterns match
+            candidate_slots = None
+            if found is not None:
+                candidate_slots = {
+                    pat.slot for mdef in scan for pat in mdef.patterns
+                    if pat.is_valid
+                    and (pat.literals is None or not found.isdisjoint(pat.literals))
+                }
+            hit_slots = self._ato_shards.matching(text, candidate_slots)
 
-        for mdef in self.ato_markers:
+        for mdef in scan:
             matches = []
+            matched_patterns = set()
+            first_start = None
             for pat in mdef.patterns:
                 if pat.compiled is None:
                     continue
+                if hit_slots is not None:
+                    if pat.slot not in hit_slots:
+                        continue
+                elif found is not None and pat.literals is not None and found.isdisjoint(pat.literals):
+                    continue  # Required literal absent — cannot match
                 for m in pat.compiled.finditer(text):
                     matched = m.group()
                     # Skip noise: purely numeric, phone numbers, or extremely short
                     if self._is_noise_match(matched):
                         continue
-                    matches.append(Match(
-                        marker_id=mdef.id,
-                        pattern=pat.raw,
-                        start=m.start(),
-                        end=m.end(),
-                        matched_text=matched,
-                    ))
-
-            if matches:
+                    if first_start is None:
+                        first_start = m.start()
+                    matched_patterns.add(pat.raw)
+                    if keep:
+                        matches.append(Match(
+                            marker_id=mdef.id,
+                            pattern=pat.raw,
+                            start=m.start(),
+                            end=m.end(),
+                            matched_text=matched,
+                        ))
+                    if early_exit:
+                        break
+
+            if matched_patterns:
                 # Confidence calculation
-                distinct_matched = len({m.pattern for m in matches})
-                total_pats = max(len([p for p in mdef.patterns if p.compiled]), 1)
+                distinct_matched = len(matched_patterns)
+                total_pats = max(sum(1 for p in mdef.patterns if p.is_valid), 1)
                 pattern_coverage = distinct_matched / total_pats
                 confidence = min(1.0, 0.6 + pattern_coverage * 0.4)
 
                 # LD 5.1: Context Penalties (e.g. Questions)
                 # If match is in a question, lower confidence for emotions
-                if "?" in text and "emotion" in mdef.tags:
+                if prepared.question_marks and "emotion" in mdef.tags:
                     # Very simple check: if sentence ends in ?, it's likely a doubt/query
                     # Find sentence containing the first match
-                    start_idx = matches[0].start
-                    end_of_sent = text.find(".", start_idx)
-                    q_mark = text.find("?", start_idx)
-                    if q_mark != -1 and (end_of_sent == -1 or q_mark < end_of_sent):
+                    if prepared.in_question(first_start):
                         confidence *= 0.6 # Significant penalty for doubt/questioning
 
-                if confidence >= threshold:
-                    # Skip context_only markers from standalone output —
-                    # they are noise on their own but valuable as SEM inputs
-                    if not include_context_only and "context_only" in mdef.tags:
-                        continue
-                    det = Detection(
-                        marker_id=mdef.id,
-                        layer="ATO",
-                        confidence=round(confidence, 3),
-                        description=mdef.description,
-                        matches=matches,
-                    )
-                    det.vad = mdef.vad_estimate
-                    detections.append(det)
+                hits.append((mdef, tuple(matches), confidence))
+
+        return tuple(hits)
+
+    def detect_ato(
+        self,
+        text: str | PreparedText,
+        threshold: float = 0.5,
+        *,
+        include_context_only: bool = True,
+        lang: str | None = None,
+        evidence: str = "all",
+    ) -> list[Detection]:
+        """Detect atomic markers via regex pattern matching.
+
+        Args:
+            text: Raw message or its PreparedText (shared with later stages).
+            include_context_only: If False, markers tagged 'context_only' are
+                suppressed from the returned list (but should still be passed
+                to SEM via a separate call with include_context_only=True).
+            lang: Message language ("de" / "en"); markers exclusive to the
+                other language are skipped. None guesses it per message,
+                "bilingual" runs every marker.
+            evidence: "all" keeps every match, "first" the first match of
+                each matching pattern, "none" no matches (presence-only
+                scan). Confidences are the same in every mode.
+        """
+        prepared = PreparedText.of(text)
+        detections = []
+        for mdef, matches, confidence in self._ato_scan(prepared, lang, evidence):
+            if confidence >= threshold:
+                # Skip context_only markers from standalone output —
+                # they are noise on their own but valuable as SEM inputs
+                if not include_context_only and "context_only" in mdef.tags:
+                    continue
+                det = Detection(
+                    marker_id=mdef.id,
+                    layer="ATO",
+                    confidence=round(confidence, 3),
+                    description=mdef.description,
+                    matches=list(matches),
+                )
+                det.vad = mdef.vad_estimate
+                detections.append(det)
 
         return detections
 
+    def score_prosody(self, text: str | PreparedText):
+        """ProsodyScorer.score of one message, cached per raw text (EmotionResult or None)."""
+        from .prosody import get_scorer
+
+        prepared = PreparedText.of(text)
+        return self._derived(
+            prepared, "prosody", prepared.raw, lambda: get_scorer().score(prepared), per_registry=False,
+        )
+
     # -----------------------------------------------------------------------
     # SEM Activation (Level 2): Compositional + contextual reference
     # -----------------------------------------------------------------------
 
+    def _sem_pattern_hits(self, prepared: PreparedText, lang: str | None = None) -> dict[int, tuple[Match, ...]]:
+        """Own-pattern matches of every SEM with patterns, by SEM index (cached per text)."""
+        kind = "sem" if lang is None else f"sem:{lang}"
+        return self._derived(prepared, kind, prepared.text, lambda: self._scan_sem_patterns(prepared, lang))
+
+    def _scan_sem_patterns(self, prepared: PreparedText, lang: str | None = None) -> dict[int, tuple[Match, ...]]:
+        text = prepared.text
+        skip = self._language_partition().sem_skip.get(self._message_language(prepared, lang), frozenset())
+        hits = {}
+        for idx in self._sem_with_patterns:
+            if idx in skip:
+                continue
+            mdef = self._sem_plan[idx].mdef
+            matches = []
+            for pat in mdef.patterns:
+                if pat.compiled is None:
+                    continue
+                for m in pat.compiled.finditer(text):
+                    matched = m.group()
+                    if len(matched.strip()) < 3:
+                        continue
+                    matches.append(Match(
+                        marker_id=mdef.id,
+                        pattern=pat.raw,
+                        start=m.start(),
+                        end=m.end(),
+                        matched_text=matched,
+                    ))
+            if matches:
+                hits[idx] = tuple(matches)
+        return hits
+
     def detect_sem(
         self,
-        text: str,
+        text: str | PreparedText,
         ato_detections: list[Detection],
         threshold: float = 0.5,
         system_state: dict | None = None,
+        lang: str | None = None,
+        evidence: str = "all",
     ) -> list[Detection]:
         """
         Detect semantic markers via composition rules + DRA guards.
@@ -562,9 +1572,14 @@ class MarkerEngine:
           - Reported speech without self-report → confidence -0.2
           - High intensifier → confidence +0.15
           - Low intensifier → confidence -0.1
+
+        With evidence="none" the ATOs carry no matches (see detect_ato):
+        their presence counts as evidence, and detections carry no matches.
         """
-        # Strip technical noise before SEM's own pattern matching
-        text = self._strip_technical_noise(text)
+        # SEM's own pattern matching runs on the noise-stripped text
+        prepared = PreparedText.of(text)
+        text = prepared.text
+        pattern_hits = self._sem_pattern_hits(prepared, lang)
         active_atos = {d.marker_id for d in ato_detections}
 
         # Pre-compute DRA guard modifiers for this text
@@ -575,42 +1590,31 @@ class MarkerEngine:
 
         detections = []
 
-        for mdef in self.sem_markers:
+        active_mask = self._mask_of(active_atos)
+
+        # Only SEMs that can produce contributing matches are evaluated
+        candidates = set(self._sem_with_patterns)
+        for ato_id in active_atos:
+            candidates.update(self._sem_by_ato.get(ato_id, ()))
+
+        for idx in sorted(candidates):
+            plan = self._sem_plan[idx]
+            if plan.ceiling < threshold:
+                continue  # Cannot reach the threshold; never an input to CLU/MEMA either
+            mdef = plan.mdef
             confidence = 0.0
             contributing_matches = []
+            hits = ()
             rule_blocked = False  # True when activation rule explicitly rejects
 
             # Check composition: both string refs and dict-format refs
-            composed = mdef.composed_of
-            if isinstance(composed, list) and composed:
-                hits = []
-                for c in composed:
-                    if isinstance(c, str):
-                        if c in active_atos:
-                            hits.append(c)
-                    elif isinstance(c, dict):
-                        for mid in c.get("marker_ids", []):
-                            if str(mid) in active_atos:
-                                hits.append(str(mid))
-                hit_ratio = len(hits) / max(len(composed), 1)
-
-                # LD 5.0: generic activation rule parser
-                activation = mdef.activation or {}
-                if isinstance(activation, str):
-                    rule_raw = activation
-                elif isinstance(activation, dict) and "rule" in activation:
-                    rule_raw = activation["rule"]
-                elif isinstance(activation, dict) and "min_components" in activation:
-                    # Structured activation: {mode, min_components, window}
-                    rule_raw = f"ANY {activation['min_components']}"
+            if plan.n_composed:
+                if plan.refs_exact:
+                    hits = self._ids_of(plan.refs_mask & active_mask)
                 else:
-                    # No activation rule → LD 5.0: SEM = 1 ATO + context
-                    rule_raw = "ANY 1"
-                mode, min_hits = _parse_activation_rule(str(rule_raw))
-
-                # ALL mode: every composed_of ref must be active
-                if mode == "ALL":
-                    min_hits = len(composed)
+                    hits = [ref for ref in plan.refs if ref in active_atos]
+                hit_ratio = len(hits) / plan.n_composed
+                mode, min_hits = plan.mode, plan.min_hits
 
                 # --- Quantum Collapse Logic (LD 5.1) ---
                 # Path B: Single ATO references active system context
@@ -648,10 +1652,8 @@ class MarkerEngine:
                     # contextual    = ATOs need relational context (discounted)
                     # emergent      = meaning only through full constellation (strong discount)
                     comp = mdef.compositionality
-                    if comp == "contextual":
-                        confidence *= 0.70
-                    elif comp == "emergent":
-                        confidence *= 0.50
+                    if comp in self._COMPOSITIONALITY_FACTOR:
+                        confidence *= self._COMPOSITIONALITY_FACTOR[comp]
                     # deterministic / None = no discount
                 else:
                     confidence = 0.0
@@ -663,21 +1665,7 @@ class MarkerEngine:
                         contributing_matches.extend(ato_det.matches)
 
             # Also check SEM's own patterns (direct regex — independent of composition)
-            own_pattern_matches: list[Match] = []
-            for pat in mdef.patterns:
-                if pat.compiled is None:
-                    continue
-                for m in pat.compiled.finditer(text):
-                    matched = m.group()
-                    if len(matched.strip()) < 3:
-                        continue
-                    own_pattern_matches.append(Match(
-                        marker_id=mdef.id,
-                        pattern=pat.raw,
-                        start=m.start(),
-                        end=m.end(),
-                        matched_text=matched,
-                    ))
+            own_pattern_matches = pattern_hits.get(idx, ())
             contributing_matches.extend(own_pattern_matches)
 
             # Direct pattern match can activate SEM even if composition rule_blocked
@@ -691,30 +1679,17 @@ class MarkerEngine:
             # ─── DRA Guard Application ───
             # Apply guards to SEMs that involve emotion ATOs
             if confidence > 0 and has_emotion_atos:
-                is_emotion_sem = any(
-                    tag in mdef.tags
-                    for tag in ("emotion", "shame", "anger", "sadness", "fear",
-                                "joy", "disgust", "love", "envy", "pride", "hope",
-                                "loneliness", "grief", "intuition")
-                )
-                # Also treat SEMs composed of emotion ATOs as emotion SEMs
-                if not is_emotion_sem and isinstance(composed, list):
-                    is_emotion_sem = any(
-                        isinstance(c, str) and self._is_emotion_ato(c)
-                        for c in composed
-                    )
-
-                if is_emotion_sem and dra_modifiers:
+                if plan.is_emotion and dra_modifiers:
                     mod_sum = sum(dra_modifiers.values())
                     confidence = max(0.0, min(1.0, confidence + mod_sum))
 
-            if confidence >= threshold and contributing_matches:
+            if confidence >= threshold and (contributing_matches or (hits and evidence == "none")):
                 det = Detection(
                     marker_id=mdef.id,
                     layer="SEM",
                     confidence=round(confidence, 3),
                     description=mdef.description,
-                    matches=contributing_matches,
+                    matches=contributing_matches if evidence != "none" else [],
                 )
                 det.vad = mdef.vad_estimate
                 detections.append(det)
@@ -730,6 +1705,8 @@ class MarkerEngine:
         sem_detections_per_message: list[list[Detection]],
         threshold: float = 0.5,
         ato_detections_per_message: list[list[Detection]] | None = None,
+        matrix: ActivationMatrix | None = None,
+        ctx: CluContext | None = None,
     ) -> list[Detection]:
         """
         Detect cluster markers over a conversation window.
@@ -737,129 +1714,55 @@ class MarkerEngine:
         CLU requires multiple SEMs across messages. Uses family multipliers
         and the hypothesis lifecycle (provisional → confirmed → decayed).
         Also accepts ATO detections for CLUs that reference ATOs directly.
+        A caller that keeps the conversation's ActivationMatrix can pass it,
+        or a CluContext over it that it keeps between calls.
         """
-        # Flatten all active markers (SEMs + optionally ATOs) with message indices
-        all_sems: dict[str, list[int]] = {}
-        for msg_idx, dets in enumerate(sem_detections_per_message):
-            for d in dets:
-                all_sems.setdefault(d.marker_id, []).append(msg_idx)
-
-        if ato_detections_per_message:
-            for msg_idx, dets in enumerate(ato_detections_per_message):
-                for d in dets:
-                    all_sems.setdefault(d.marker_id, []).append(msg_idx)
-
-        active_sem_ids = set(all_sems.keys())
+        if ctx is not None:
+            matrix = ctx.matrix
+            ctx.refresh()
+        else:
+            # Message × marker activations (SEMs + optionally ATOs)
+            if matrix is None:
+                matrix = ActivationMatrix(
+                    len(sem_detections_per_message),
+                    sem_detections_per_message,
+                    ato_detections_per_message or [],
+                )
+            ctx = CluContext(self, matrix)
+        last_msg = matrix.n_messages - 1
         detections = []
 
-        for mdef in self.clu_markers:
-            hits = []
-            msg_indices = set()
-
-            composed = mdef.composed_of
-            if isinstance(composed, list) and composed:
-                for c in composed:
-                    if not isinstance(c, str):
-                        continue
-                    if self._resolve_ref(c, active_sem_ids):
-                        hits.append(c)
-                        # Find which active SEM matched this ref
-                        for sid in active_sem_ids:
-                            if c == sid or all(p.upper() in sid.upper() for p in c.split("_")[1:]):
-                                msg_indices.update(all_sems.get(sid, []))
-            elif isinstance(composed, dict):
-                # Structured activation: require + k_of_n + negative_evidence
-                require_refs = composed.get("require", composed.get("sem_pool", []))
-                neg_evidence = composed.get("negative_evidence", {})
-                neg_refs = neg_evidence.get("any_of", []) if isinstance(neg_evidence, dict) else []
-
-                # Collect require hits (ANY match counts — not ALL required)
-                require_hits = []
-                if isinstance(require_refs, list):
-                    for c in require_refs:
-                        if not isinstance(c, str):
-                            continue
-                        if self._resolve_ref(c, active_sem_ids):
-                            require_hits.append(c)
-
-                # Negative evidence: if any match, block this CLU
-                neg_ok = True
-                if isinstance(neg_refs, list):
-                    for c in neg_refs:
-                        if isinstance(c, str) and self._resolve_ref(c, active_sem_ids):
-                            neg_ok = False
-                            break
-
-                if require_hits and neg_ok:
-                    hits = require_hits
-                    # Collect message indices for all matched refs
-                    for h in hits:
-                        for sid in active_sem_ids:
-                            if h == sid or all(p.upper() in sid.upper() for p in h.split("_")[1:]):
-                                msg_indices.update(all_sems.get(sid, []))
-
-            if not hits:
+        for plan in self._clu_plan:
+            mdef = plan.mdef
+            # Apply dynamic threshold modifier (LD 5.1 Regulator)
+            effective_threshold = threshold * self.dynamic_threshold_modifier
+            if plan.ceiling < effective_threshold:
+                continue  # Cannot reach the threshold
+            evaluated = self._evaluate_clu(plan, ctx, last_msg)
+            if evaluated is None:
                 continue
-
-            # Check window constraint
-            window_size = (mdef.window or {}).get("messages", 10)
-            total_messages = len(sem_detections_per_message)
-            window_start = max(0, total_messages - window_size)
-            hits_in_window = [
-                h for h in hits
-                if any(idx >= window_start for idx in all_sems.get(h, []))
-            ]
-
-            if not hits_in_window:
-                # Also check: did any of the resolved SEM matches appear in window?
-                resolved_in_window = [
-                    h for h in hits
-                    if any(
-                        any(idx >= window_start for idx in all_sems.get(sid, []))
-                        for sid in active_sem_ids
-                        if h == sid or all(p.upper() in sid.upper() for p in h.split("_")[1:])
-                    )
-                ]
-                if not resolved_in_window:
-                    continue
-                hits_in_window = resolved_in_window
-
-            distinct_hits = len(set(hits_in_window))
-
-            # Calculate confidence: 1 hit = low, 2+ = higher
-            if isinstance(composed, list):
-                composed_total = len(composed)
-            elif isinstance(composed, dict):
-                req = composed.get("require", composed.get("sem_pool", []))
-                composed_total = len(req) if isinstance(req, list) else 1
-            else:
-                composed_total = 1
-            hit_ratio = distinct_hits / max(composed_total, 1)
-
-            if distinct_hits >= 2:
-                base_conf = 0.5 + (hit_ratio * 0.5)
-            elif distinct_hits == 1:
-                base_conf = 0.35 + (hit_ratio * 0.25)  # Lower confidence for single hit
-            else:
+            hits, distinct_hits = evaluated
+            confidence = self._clu_confidence(plan, distinct_hits)
+            if confidence is None:
                 continue
 
             multiplier = mdef.multiplier
-            # Apply dynamic threshold modifier (LD 5.1 Regulator)
-            effective_threshold = threshold * self.dynamic_threshold_modifier
-            confidence = min(1.0, base_conf * min(multiplier, 1.5))  # Cap effective boost
 
             if confidence >= effective_threshold:
+                first_satisfied = self._clu_first_satisfied(plan, ctx, effective_threshold)
+
                 # --- Regulator Tracking (LD 5.1) ---
-                if distinct_hits == 1:
-                    # Single-hit CLU is 'provisional' (High sensitivity, low precision)
-                    self.retracted_count += 1 # Assume retracted unless confirmed later
-                    # (In a real stream, we'd wait, here we just track stats)
-                else:
-                    # Multi-hit CLU is 'confirmed'
-                    self.confirmed_count += 1
-                
+                # Single-hit CLU is 'provisional' (High sensitivity, low precision),
+                # multi-hit CLU is 'confirmed'
+                self.context.track(confirmed=distinct_hits != 1)
                 self._update_ewma_precision()
 
+                # Messages of every active marker a hit resolved to
+                msg_indices: set[int] = set()
+                for h in hits:
+                    for sid in ctx.matched(h):
+                        msg_indices.update(matrix.columns[sid])
+
                 detections.append(Detection(
                     marker_id=mdef.id,
                     layer="CLU",
@@ -869,10 +1772,103 @@ class MarkerEngine:
                     family=mdef.family,
                     multiplier=multiplier,
                     message_indices=sorted(msg_indices),
+                    first_satisfied=first_satisfied,
                 ))
 
         return detections
 
+    def _evaluate_clu(self, plan: CluPlan, ctx: CluContext, end: int) -> tuple[list[str], int] | None:
+        """Evaluate a CLU on messages 0..end (the window trails `end`).
+
+        Returns (hits, distinct hits in window) or None if the CLU does not
+        hold. end = last message gives the whole-conversation result.
+        """
+        if plan.kind == "list":
+            hits = [c for c in plan.refs if ctx.resolved_by(c, end)]
+        elif plan.kind == "require":
+            # Collect require hits (ANY match counts — not ALL required)
+            require_hits = [c for c in plan.refs if ctx.resolved_by(c, end)]
+            # Negative evidence: if any match, block this CLU
+            neg_ok = not any(ctx.resolved_by(c, end) for c in plan.neg_refs)
+            hits = require_hits if require_hits and neg_ok else []
+        else:
+            hits = []
+        if not hits:
+            return None
+
+        # Check window constraint
+        window_start = max(0, end + 1 - plan.window_size)
+        matrix = ctx.matrix
+        hits_in_window = [h for h in hits if matrix.fired_in(h, window_start, end)]
+
+        if not hits_in_window:
+            # Also check: did any of the resolved SEM matches appear in window?
+            resolved_in_window = [h for h in hits if ctx.matched_fired_in(h, window_start, end)]
+            if not resolved_in_window:
+                return None
+            hits_in_window = resolved_in_window
+
+        return hits, len(set(hits_in_window))
+
+    @staticmethod
+    def _clu_confidence(plan: CluPlan, distinct_hits: int) -> float | None:
+        """CLU confidence from distinct hits in window; None if there are none."""
+        # Calculate confidence: 1 hit = low, 2+ = higher
+        hit_ratio = distinct_hits / max(plan.composed_total, 1)
+
+        if distinct_hits >= 2:
+            base_conf = 0.5 + (hit_ratio * 0.5)
+        elif distinct_hits == 1:
+            base_conf = 0.35 + (hit_ratio * 0.25)  # Lower confidence for single hit
+        else:
+            return None
+        return min(1.0, base_conf * min(plan.mdef.multiplier, 1.5))  # Cap effective boost
+
+    def _clu_events(self, plan: CluPlan, ctx: CluContext, after: int = -1) -> list[int]:
+        """Messages (after `after`) at which a CLU's prefix evaluation can change.
+
+        That is every activation of a marker its refs resolve to, and the
+        message at which such an activation leaves the trailing window.
+        """
+        events: set[int] = set()
+        last_msg = ctx.matrix.n_messages - 1
+        window = plan.window_size
+        for ref in (*plan.refs, *plan.neg_refs):
+            for rows in ctx.matched_columns(ref):
+                for idx in rows[bisect_right(rows, after - window):]:
+                    if idx > after:
+                        events.add(idx)
+                    if idx + window <= last_msg:
+                        events.add(idx + window)
+        if last_msg > after:
+            events.add(last_msg)
+        return sorted(events)
+
+    def _clu_held_at(self, plan: CluPlan, ctx: CluContext, end: int, threshold: float) -> float | None:
+        """CLU confidence on messages 0..end, or None if it does not reach threshold."""
+        evaluated = self._evaluate_clu(plan, ctx, end)
+        if evaluated is None:
+            return None
+        confidence = self._clu_confidence(plan, evaluated[1])
+        if confidence is None or confidence < threshold:
+            return None
+        return confidence
+
+    def _clu_first_satisfied(self, plan: CluPlan, ctx: CluContext, threshold: float) -> int | None:
+        """First message m at which the CLU holds (≥ threshold) on messages 0..m.
+
+        Resumes the context's previous scan for the same CLU and threshold.
+        """
+        key = (plan.mdef.id, threshold)
+        scanned, found = ctx.first_satisfied.get(key, (-1, None))
+        if found is None:
+            for end in self._clu_events(plan, ctx, after=scanned):
+                if self._clu_held_at(plan, ctx, end, threshold) is not None:
+                    found = end
+                    break
+            ctx.first_satisfied[key] = (ctx.matrix.n_messages - 1, found)
+        return found
+
     # -----------------------------------------------------------------------
     # MEMA Diagnosis (Level 4): Meta-level organism diagnosis
     # -----------------------------------------------------------------------
@@ -893,10 +1889,26 @@ class MarkerEngine:
           Option B (detect_class): Algorithmic inference from active marker
                    patterns (trend, absence, composite, cycle, etc.)
         """
+        return self._detect_mema_active(
+            clu_detections,
+            {d.marker_id for d in sem_detections},
+            {d.marker_id for d in (ato_detections or [])},
+            sum(1 for d in sem_detections if d.confidence > 0.6),
+            threshold,
+        )
+
+    def _detect_mema_active(
+        self,
+        clu_detections: list[Detection],
+        active_sems: set[str],
+        active_atos: set[str],
+        strong_sem_count: int,
+        threshold: float,
+    ) -> list[Detection]:
+        """detect_mema on active id sets; strong_sem_count = SEM detections with confidence > 0.6."""
         active_clus = {d.marker_id for d in clu_detections}
-        active_sems = {d.marker_id for d in sem_detections}
-        active_atos = {d.marker_id for d in (ato_detections or [])}
         all_active = active_clus | active_sems | active_atos
+        active = self._active(all_active)
 
         # Collect CLU families and tags for detect_class/gating inference
         clu_info = set()
@@ -909,9 +1921,30 @@ class MarkerEngine:
                 for t in active_m.tags:
                     clu_info.add(t.upper())
 
+        # Keyword-related active markers per MEMA: (all active, CLUs, SEMs)
+        related_all: dict[int, int] = {}
+        related_clus: dict[int, int] = {}
+        related_sems: dict[int, int] = {}
+        for mid in all_active:
+            if mid in active.foreign:
+                upper = mid.upper()
+                memas = [
+                    i for i, plan in enumerate(self._mema_plan)
+                    if any(kw in upper for kw in plan.keywords)
+                ]
+            else:
+                memas = self._mema_by_marker.get(mid, ())
+            for i in memas:
+                related_all[i] = related_all.get(i, 0) + 1
+                if mid in active_clus:
+                    related_clus[i] = related_clus.get(i, 0) + 1
+                if mid in active_sems:
+                    related_sems[i] = related_sems.get(i, 0) + 1
+
         detections = []
 
-        for mdef in self.mema_markers:
+        for idx, plan in enumerate(self._mema_plan):
+            mdef = plan.mdef
             confidence = 0.0
             found_evidence = False
 
@@ -921,12 +1954,12 @@ class MarkerEngine:
                 hits = []
                 for c in composed:
                     if isinstance(c, str):
-                        if self._resolve_ref(c, all_active):
+                        if self._resolve_ref(c, active):
                             hits.append(c)
                     elif isinstance(c, dict):
                         # Dict format: {'marker_ids': ['CLU_X'], 'weight': 0.5}
                         for mid in c.get("marker_ids", []):
-                            if self._resolve_ref(str(mid), all_active):
+                            if self._resolve_ref(str(mid), active):
                                 hits.append(str(mid))
                 if hits:
                     hit_ratio = len(hits) / max(len(composed), 1)
@@ -935,32 +1968,14 @@ class MarkerEngine:
 
             # Option C: absence_sets check (New in LD 5.1)
             # Fires if NONE of the markers/tags in the absence set triggered
-            absence_sets = mdef.absence_sets or mdef.frame.get("absence_sets")
-            if not found_evidence and absence_sets:
-                is_absent = True
-                for set_name, sdef in absence_sets.items():
-                    # Check IDs
-                    for mid in sdef.get("ids", []):
-                        if mid in all_active:
-                            is_absent = False
-                            break
-                    if not is_absent: break
-                    # Check Tags (Case-insensitive)
-                    set_tags = {t.upper() for t in sdef.get("tags", [])}
-                    if set_tags:
-                        for active_mid in all_active:
-                            active_m = self.markers.get(active_mid)
-                            if active_m and {t.upper() for t in active_m.tags} & set_tags:
-                                is_absent = False
-                                break
-                    if not is_absent: break
+            if not found_evidence and plan.absence_mask is not None:
+                is_absent = not (plan.absence_mask & active.mask) and plan.absence_foreign.isdisjoint(all_active)
 
                 if is_absent:
                     # Check gating_conflict (if any negative signals active)
                     gating = mdef.gating_conflict or {}
                     # Strong conflict detection: families or tags
-                    negative_indicators = {"CONFLICT", "GRIEF", "UNCERTAINTY", "ESCALATION", "ACCUSATION", "BLAME"}
-                    has_conflict = bool(clu_info & negative_indicators)
+                    has_conflict = bool(clu_info & self._CONFLICT_INDICATORS)
                     
                     if gating and not has_conflict:
                         # Gated by conflict: if no conflict active, absence isn't meaningful
@@ -968,9 +1983,7 @@ class MarkerEngine:
                     else:
                         # If a specific min_bias_hits or min_E_hits is required, check it
                         min_hits = gating.get("min_bias_hits", gating.get("min_E_hits", 1))
-                        active_count = sum(1 for d in sem_detections if d.confidence > 0.6)
-                        
-                        if active_count >= min_hits:
+                        if strong_sem_count >= min_hits:
                             confidence = 0.65  # Base confidence for confirmed absence
                             found_evidence = True
 
@@ -978,71 +1991,38 @@ class MarkerEngine:
             if confidence < threshold and mdef.detect_class:
                 dc = mdef.detect_class
 
-                # Extract MEMA keywords for matching (exclude structural noise)
-                _STRUCTURAL_KW = {"MARKER", "TEXT", "AUDIO", "PROSODY", "PATTERN",
-                                  "ALERT", "TREND", "PROFILE", "META", "CLUSTER", "ABSENCE", "IN"}
-                mema_keywords = set(
-                    kw.upper() for kw in mdef.id.replace("MEMA_", "").split("_")
-                    if len(kw) >= 3 and kw.upper() not in _STRUCTURAL_KW
-                )
-
-                if not mema_keywords:
-                    # Fallback to description keywords if ID is too generic
-                    desc_words = re.findall(r"\w+", mdef.description.upper())
-                    mema_keywords = {w for w in desc_words if len(w) > 4 and w not in _STRUCTURAL_KW}
+                n_related = related_all.get(idx, 0)
 
                 if dc == "absence_meta":
                     # Fire when conflict/negative signals active but expected
                     # positive/repair signals are absent
-                    negative_families = {"CONFLICT", "GRIEF", "UNCERTAINTY", "ESCALATION"}
-                    if clu_info & negative_families:
-                        positive_families = {"SUPPORT", "COMMITMENT", "REPAIR"}
-                        if not (clu_info & positive_families):
+                    if clu_info & self._NEGATIVE_FAMILIES:
+                        if not (clu_info & self._POSITIVE_FAMILIES):
                             confidence = max(confidence, 0.65)
                         else:
                             confidence = max(confidence, 0.5)
 
                 elif dc == "trend_analysis":
                     # Check if active CLUs or SEMs match MEMA keywords
-                    related = [
-                        c for c in all_active
-                        if any(kw in c.upper() for kw in mema_keywords)
-                    ]
-                    if related:
-                        confidence = max(confidence, 0.5 + min(0.4, len(related) * 0.12))
+                    if n_related:
+                        confidence = max(confidence, 0.5 + min(0.4, n_related * 0.12))
 
                 elif dc == "cycle_detection":
                     # Cycle needs escalation + recurring pattern
-                    related = [
-                        c for c in all_active
-                        if any(kw in c.upper() for kw in mema_keywords)
-                    ]
-                    if len(related) >= 2:
+                    if n_related >= 2:
                         confidence = max(confidence, 0.6)
-                    elif related:
+                    elif n_related:
                         confidence = max(confidence, 0.45)
 
                 elif dc == "pattern_detection":
                     # Pattern detection from active markers matching keywords
-                    related = [
-                        c for c in all_active
-                        if any(kw in c.upper() for kw in mema_keywords)
-                    ]
-                    if related:
-                        confidence = max(confidence, 0.5 + min(0.3, len(related) * 0.1))
+                    if n_related:
+                        confidence = max(confidence, 0.5 + min(0.3, n_related * 0.1))
 
                 elif dc in ("composite_meta", "profile_composite", "archetype_composite"):
                     # Composite: keyword overlap with any active CLU/SEM/ATO
-                    related_clus = [
-                        c for c in active_clus
-                        if any(kw in c.upper() for kw in mema_keywords)
-                    ]
-                    related_sems = [
-                        s for s in active_sems
-                        if any(kw in s.upper() for kw in mema_keywords)
-                    ]
                     # Weighted: CLU match = 1.0, SEM match = 0.5
-                    weighted = len(related_clus) * 1.0 + len(related_sems) * 0.5
+                    weighted = related_clus.get(idx, 0) * 1.0 + related_sems.get(idx, 0) * 0.5
                     if weighted >= 1.0:
                         confidence = max(confidence, 0.55 + min(0.35, weighted * 0.15))
                     elif weighted >= 0.5:
@@ -1051,11 +2031,7 @@ class MarkerEngine:
                 elif dc in ("E", "coherence_calculator", "echo_detector",
                             "evolution_pressure_analyzer", "node_crystallizer"):
                     # Specialized classes: use keyword matching as fallback
-                    related = [
-                        c for c in all_active
-                        if any(kw in c.upper() for kw in mema_keywords)
-                    ]
-                    if related:
+                    if n_related:
                         confidence = max(confidence, 0.55)
 
             if confidence >= threshold:
@@ -1071,6 +2047,145 @@ class MarkerEngine:
 
         return detections
 
+    # -----------------------------------------------------------------------
+    # CLU / MEMA activation timeline
+    # -----------------------------------------------------------------------
+
+    def activation_timeline(
+        self,
+        sem_detections_per_message: list[list[Detection]],
+        ato_detections_per_message: list[list[Detection]] | None = None,
+        threshold: float = 0.5,
+        layers: list[str] | None = None,
+        matrix: ActivationMatrix | None = None,
+    ) -> list[dict]:
+        """
+        When each CLU/MEMA was on across the conversation.
+
+        At message m a marker is on if detect_clu/detect_mema over messages
+        0..m would report it (CLU windows trail m). Prefix results only change
+        when a marker fires or leaves a window, so markers are re-evaluated
+        at those messages only, in one sweep, instead of once per prefix.
+
+        Returns intervals {marker_id, layer, start, end, peak_confidence}
+        with inclusive message bounds, ordered by start.
+        """
+        layers = layers or ["CLU", "MEMA"]
+        ato_detections_per_message = ato_detections_per_message or []
+        if matrix is None:
+            matrix = ActivationMatrix(
+                len(sem_detections_per_message),
+                sem_detections_per_message,
+                ato_detections_per_message,
+            )
+        last_msg = matrix.n_messages - 1
+        if last_msg < 0:
+            return []
+
+        ctx = CluContext(self, matrix)
+        effective_threshold = threshold * self.dynamic_threshold_modifier
+        intervals: list[dict] = []
+        # message → [(CLU Detection, switched on?)]
+        clu_changes: dict[int, list[tuple[Detection, bool]]] = {}
+
+        for plan in self._clu_plan:
+            if plan.ceiling < effective_threshold:
+                continue
+            mdef = plan.mdef
+            clu = Detection(
+                marker_id=mdef.id, layer="CLU", confidence=0.0, description=mdef.description,
+                matches=[], family=mdef.family, multiplier=mdef.multiplier,
+            )
+            current: dict | None = None
+            for end in self._clu_events(plan, ctx):
+                confidence = self._clu_held_at(plan, ctx, end, effective_threshold)
+                if confidence is not None and current is None:
+                    current = {"marker_id": mdef.id, "layer": "CLU", "start": end, "end": last_msg, "peak_confidence": 0.0}
+                    intervals.append(current)
+                    clu_changes.setdefault(end, []).append((clu, True))
+                elif confidence is None and current is not None:
+                    current["end"] = end - 1
+                    current = None
+                    clu_changes.setdefault(end, []).append((clu, False))
+                if current is not None:
+                    current["peak_confidence"] = max(current["peak_confidence"], round(confidence, 3))
+
+        if "CLU" not in layers:
+            intervals = []
+        if "MEMA" in layers:
+            intervals.extend(self._mema_timeline(
+                sem_detections_per_message, ato_detections_per_message, clu_changes, threshold, last_msg,
+            ))
+        return sorted(intervals, key=lambda i: (i["start"], i["layer"], i["marker_id"]))
+
+    def _mema_timeline(
+        self,
+        sem_detections_per_message: list[list[Detection]],
+        ato_detections_per_message: list[list[Detection]],
+        clu_changes: dict[int, list[tuple[Detection, bool]]],
+        threshold: float,
+        last_msg: int,
+    ) -> list[dict]:
+        """MEMA intervals: detect_mema re-run only where its inputs change."""
+        # Inputs of detect_mema on a prefix: active CLUs, SEM/ATO ids seen so
+        # far and the number of strong SEM detections (absence gating)
+        first_seen: dict[int, list[tuple[str, bool]]] = {0: []}  # message → [(id, is SEM)]
+        seen: set[str] = set()
+        strong_at: list[int] = []
+        for is_sem, per_message in ((True, sem_detections_per_message), (False, ato_detections_per_message)):
+            for msg_idx, dets in enumerate(per_message):
+                for d in dets:
+                    if d.marker_id not in seen:
+                        seen.add(d.marker_id)
+                        first_seen.setdefault(msg_idx, []).append((d.marker_id, is_sem))
+                    if is_sem and d.confidence > 0.6:
+                        strong_at.append(msg_idx)
+        # Absence gating compares the strong count with small min_hits only
+        max_min_hits = max(
+            (
+                (plan.mdef.gating_conflict or {}).get(
+                    "min_bias_hits", (plan.mdef.gating_conflict or {}).get("min_E_hits", 1)
+                )
+                for plan in self._mema_plan if plan.absence_mask is not None
+            ),
+            default=0,
+        )
+        strong_events = strong_at[:max(0, int(max_min_hits))]
+
+        events = sorted(set(first_seen) | set(clu_changes) | set(strong_events))
+        active_clus: dict[str, Detection] = {}
+        active_sems: set[str] = set()
+        active_atos: set[str] = set()
+        open_intervals: dict[str, dict] = {}
+        intervals: list[dict] = []
+
+        for m in events:
+            for mid, is_sem in first_seen.get(m, ()):
+                (active_sems if is_sem else active_atos).add(mid)
+            for clu, on in clu_changes.get(m, ()):
+                if on:
+                    active_clus[clu.marker_id] = clu
+                else:
+                    active_clus.pop(clu.marker_id, None)
+
+            memas = self._detect_mema_active(
+                list(active_clus.values()), active_sems, active_atos,
+                bisect_right(strong_at, m), threshold,
+            )
+            on_now = {d.marker_id: d.confidence for d in memas}
+            for mid in list(open_intervals):
+                if mid not in on_now:
+                    open_intervals.pop(mid)["end"] = m - 1
+            for mid, confidence in on_now.items():
+                current = open_intervals.get(mid)
+                if current is None:
+                    current = open_intervals[mid] = {
+                        "marker_id": mid, "layer": "MEMA", "start": m, "end": last_msg, "peak_confidence": 0.0,
+                    }
+                    intervals.append(current)
+                current["peak_confidence"] = max(current["peak_confidence"], confidence)
+        return intervals
+
     # -----------------------------------------------------------------------
     # Public API
     # -----------------------------------------------------------------------
@@ -1081,23 +2196,35 @@ class MarkerEngine:
         layers: list[str] | None = None,
         threshold: float = 0.5,
         deduplicate: bool = True,
+        markers: list[str] | None = None,
+        families: list[str] | None = None,
+        lang: str | None = None,
+        evidence: str = "all",
     ) -> dict:
         """
         Analyze a single text against the marker hierarchy.
 
-        Returns dict with 'detections' list and 'timing_ms'.
+        Returns dict with 'detections' list and 'timing_ms'. A markers /
+        families selection runs only its sub-plan (see subset()); `lang`
+        is the message language (see detect_ato), guessed when None.
+        `evidence` is the match evidence kept ("all" / "first" / "none",
+        see detect_ato); deduplication only sees the spans kept.
         """
-        if not self._loaded:
-            self.load()
+        self.ensure_loaded()
+        if markers or families:
+            sub, selected = self.subset(markers, families)
+            result = sub.analyze_text(text, layers, threshold, deduplicate=False, lang=lang, evidence=evidence)
+            return self._restrict(result, selected, deduplicate)
 
         start = time.perf_counter()
         layers = layers or ["ATO", "SEM", "CLU", "MEMA"]
         all_detections: list[Detection] = []
+        prepared = PreparedText(text)
 
         # Level 1: ATO — detect all (including context_only for SEM input)
         ato_dets = []
         if "ATO" in layers or "SEM" in layers or "CLU" in layers or "MEMA" in layers:
-            ato_dets = self.detect_ato(text, threshold)
+            ato_dets = self.detect_ato(prepared, threshold, lang=lang, evidence=evidence)
             if "ATO" in layers:
                 # Filter context_only markers from user-facing output
                 ato_for_output = [
@@ -1112,7 +2239,7 @@ class MarkerEngine:
         # Level 2: SEM
         sem_dets = []
         if "SEM" in layers or "CLU" in layers or "MEMA" in layers:
-            sem_dets = self.detect_sem(text, ato_dets, threshold)
+            sem_dets = self.detect_sem(prepared, ato_dets, threshold, lang=lang, evidence=evidence)
             if "SEM" in layers:
                 all_detections.extend(sem_dets)
 
@@ -1134,180 +2261,213 @@ class MarkerEngine:
         threshold: float = 0.5,
         warm_start: dict[str, dict[str, float]] | None = None,
         deduplicate: bool = True,
+        timeline: bool = False,
+        outputs: set[str] | None = None,
+        markers: list[str] | None = None,
+        families: list[str] | None = None,
+        lang: str | None = None,
+        evidence: str = "all",
+        context: AnalysisContext | None = None,
+        on_message: Callable[[dict], None] | None = None,
     ) -> dict:
         """
         Analyze a conversation (multiple messages) with temporal tracking.
 
         Returns detections across all layers including CLU/MEMA with
-        message-level attribution and temporal patterns.
+        message-level attribution and temporal patterns. With timeline=True
+        the result also holds CLU/MEMA on/off intervals (activation_timeline).
+        `outputs` limits the result to some of session.OUTPUTS; stages no
+        requested output depends on are skipped (see pipeline_stages).
+        A markers / families selection runs only its sub-plan (see subset()).
+        `lang` fixes the language of every message (see detect_ato); None
+        guesses it per message. `evidence` is the match evidence kept
+        ("all" / "first" / "none", see detect_ato). `context` holds the
+        regulator state CLU detection reads and updates (see
+        analysis_context); None uses the engine's shared regulator.
+        `on_message` is called with each message's ATO/SEM detections, VAD,
+        emotion and speaker delta as soon as it is analysed (see
+        ConversationSession.message_update), ahead of the final result.
+
+        One-shot form of ConversationSession: for a conversation that grows
+        message by message, keep a session and append() to it instead.
         """
-        if not self._loaded:
-            self.load()
-
-        start = time.perf_counter()
-        layers = layers or ["ATO", "SEM", "CLU", "MEMA"]
-
-        all_ato_dets: list[list[Detection]] = []
-        all_sem_dets: list[list[Detection]] = []
-        flat_ato: list[Detection] = []
-        flat_sem: list[Detection] = []
-        all_detections: list[Detection] = []
-
-        # Per-message ATO + SEM detection with VAD congruence gate
-        shadow_buffer: list[Detection] = []
-        current_state = {"trust": 0.0, "conflict": 0.0, "deesc": 0.0}
-        from .dynamics import compute_state_indices
-
-        for msg_idx, msg in enumerate(messages):
-            text = msg.get("text", "")
-            
-            # Phase 0: Pre-strip technical noise to check if anything linguistic remains (LD 5.1)
-            clean_text = self._strip_technical_noise(text).strip()
-            if not clean_text or len(clean_text) < 2:
-                # Still add empty lists to maintain indices
-                all_ato_dets.append([])
-                all_sem_dets.append([])
-                continue
-
-            # Phase 1: Detect all ATOs (superposition)
-            raw_atos = self.detect_ato(text, threshold)
-            for d in raw_atos:
-                d.message_indices = [msg_idx]
+        from .session import ConversationSession
 
-            # Phase 2: Compute raw message VAD (emotional field)
-            raw_vad = self._compute_raw_vad(raw_atos)
+        if markers or families:
+            sub, selected = self.subset(markers, families)
+            if on_message is not None:
+                emit = on_message
 
-            # Phase 3: Apply VAD congruence gate (quantum collapse)
-            gated_atos, suppressed, surfaced = self._apply_vad_gate(
-                raw_atos, raw_vad, shadow_buffer
-            )
-
-            # Update message indices for surfaced shadow ATOs
-            for d in surfaced:
-                d.message_indices = [msg_idx]
-
-            # Phase 4: Update shadow buffer for next message
-            shadow_buffer = suppressed
-
-            # Use gated ATOs + surfaced for this message
-            effective_atos = gated_atos + surfaced
-            all_ato_dets.append(effective_atos)
-            flat_ato.extend(effective_atos)
+                def on_message(update: dict) -> None:
+                    emit({**update, "detections": [d for d in update["detections"] if d.marker_id in selected]})
 
-            # Phase 5: SEM detection uses gated+surfaced ATOs (meaningful ones only)
-            # AND the current system state (Quantum Collapse)
-            sem_dets = self.detect_sem(
-                text, effective_atos, threshold, system_state=current_state
+            # On this engine's regulator: the cached sub-engine's own would reset on eviction
+            result = sub.analyze_conversation(
+                messages, layers=layers, threshold=threshold, warm_start=warm_start,
+                deduplicate=False, timeline=timeline, outputs=outputs, lang=lang, evidence=evidence,
+                context=context if context is not None else self.regulator, on_message=on_message,
             )
-            for d in sem_dets:
-                d.message_indices = [msg_idx]
-            all_sem_dets.append(sem_dets)
-            flat_sem.extend(sem_dets)
-
-            # Phase 6: Update system state for next message
-            # Only use high-confidence markers to update state during loop
-            loop_state = compute_state_indices(effective_atos + sem_dets, self.markers)
-            # Accumulate with slight decay
-            for k in ["trust", "conflict", "deesc"]:
-                current_state[k] = (current_state[k] * 0.7) + (loop_state.get(k, 0) * 0.3)
-
-        if "ATO" in layers:
-            # Filter context_only markers from user-facing output
-            ato_for_output = [
-                d for d in flat_ato
-                if "context_only" not in (self.markers.get(d.marker_id) or MarkerDef(
-                    id="", layer="", lang="", description="", frame={},
-                    patterns=[], examples={}, tags=[], rating=0
-                )).tags
-            ]
-            all_detections.extend(ato_for_output)
-        if "SEM" in layers:
-            all_detections.extend(flat_sem)
-
-        # Level 3: CLU (over conversation window)
-        clu_dets = []
-        if "CLU" in layers or "MEMA" in layers:
-            clu_dets = self.detect_clu(all_sem_dets, threshold, ato_detections_per_message=all_ato_dets)
-            if "CLU" in layers:
-                all_detections.extend(clu_dets)
-
-        # Level 4: MEMA (now receives ATOs too for richer inference)
-        if "MEMA" in layers:
-            mema_dets = self.detect_mema(clu_dets, flat_sem, flat_ato, threshold)
-            all_detections.extend(mema_dets)
+            return self._restrict(result, selected, deduplicate)
 
-        # ── Prosody-based emotion detection per message ──
-        from .prosody import get_scorer
-        scorer = get_scorer()
-        message_emotions = scorer.score_conversation(messages)
-
-        # ── VAD aggregation per message ──
-        from .dynamics import compute_ued_metrics, compute_state_indices
-
-        message_vad = []
-        for msg_idx, msg in enumerate(messages):
-            msg_dets = [d for d in flat_ato + flat_sem if msg_idx in d.message_indices]
-            vads = [d.vad for d in msg_dets if d.vad]
-            if vads:
-                avg_v = sum(v["valence"] for v in vads) / len(vads)
-                avg_a = sum(v["arousal"] for v in vads) / len(vads)
-                avg_d = sum(v["dominance"] for v in vads) / len(vads)
-                message_vad.append({
-                    "valence": round(avg_v, 3),
-                    "arousal": round(avg_a, 3),
-                    "dominance": round(avg_d, 3),
-                })
-            else:
-                message_vad.append({"valence": 0.0, "arousal": 0.0, "dominance": 0.0})
-
-        # UED metrics (need at least 3 messages)
-        ued_metrics = compute_ued_metrics(message_vad) if len(message_vad) >= 3 else None
-
-        # State indices from effect_on_state
-        state_indices = compute_state_indices(flat_ato + flat_sem, self.markers)
-
-        # ── Per-speaker baseline (Polygraph principle) ──
-        speaker_baselines = self._compute_speaker_baselines(messages, message_vad, warm_start=warm_start)
+        session = ConversationSession(
+            self, layers=layers, threshold=threshold, warm_start=warm_start,
+            deduplicate=deduplicate, timeline=timeline, outputs=outputs, lang=lang, evidence=evidence,
+            context=context,
+        )
+        result = session.extend(messages, prepared=self.prepare_conversation(messages), on_message=on_message)
+        session.close()
+        return result
+
+    def prepare_conversation(self, messages: list[dict]) -> list[PreparedText]:
+        """PreparedTexts of a conversation, shared by every analysis of the same texts.
+
+        Each PreparedText keeps the threshold-free scans computed from it
+        (raw ATO confidences, SEM pattern hits, prosody), so analyzing a
+        conversation again — e.g. /v1/analyze/interpret at 0.3 after
+        /v1/analyze/dynamics at 0.5 — only re-runs the threshold-dependent
+        steps. Keyed by a hash of the message texts.
+        """
+        texts = [m.get("text", "") for m in messages]
+        digest = hashlib.sha256(json.dumps(texts).encode()).hexdigest()
+        return list(self.conversation_cache.get_or_compute(
+            digest, lambda: tuple(PreparedText(t) for t in texts), size=sum(len(t) for t in texts),
+        ))
 
-        # Temporal patterns
-        temporal = self._extract_temporal_patterns(flat_ato + flat_sem, len(messages))
+    # -----------------------------------------------------------------------
+    # Marker subsets: run only the sub-plan a selection depends on
+    # -----------------------------------------------------------------------
 
-        # --- Topology Analysis (LD 6.0 CTG) ---
-        from .topology import compute_topology_report, shadow_log
-        topology = compute_topology_report(messages, all_detections)
-        
-        # --- Shadow Logging (Calibration) ---
-        shadow_log({
-            "n_messages": len(messages),
-            "timing_ms": round((time.perf_counter() - start) * 1000, 2),
-            "topology": {
-                "health_score": topology["health"]["score"],
-                "grade": topology["health"]["grade"],
-                "instability": topology["gates"]["instability"],
-                "summary": topology["summary"],
-                "failing_constraints": [c["id"] for c in topology["constraints"] if c["status"] == "fail"],
-                "warn_constraints": [c["id"] for c in topology["constraints"] if c["status"] == "warn"],
-            },
-            "engine": {"mode": "standard-recall", "marker_threshold": threshold},
-        })
+    def subset(
+        self, markers: list[str] | None = None, families: list[str] | None = None,
+    ) -> tuple[MarkerEngine, frozenset[str]]:
+        """Engine over the dependency closure of a selection, and the selected ids.
+
+        The selection is the given marker ids plus all markers of the given
+        families (ld5_family, case-insensitive). The sub-engine holds only
+        the closure (see dependency_closure), so a message is scanned with
+        those ATOs alone. Context signals — VAD gate, system state, strong-SEM
+        count — are computed within the closure, so confidences can differ
+        from a full run. Sub-engines are cached by selection hash and share
+        this engine's text and conversation caches; selected conversation
+        runs use this engine's regulator, not the sub-engine's.
+
+        Raises ValueError for unknown ids or a selection matching nothing.
+        """
+        selected = self.selection(markers, families)
+        digest = hashlib.sha256("\n".join(sorted(selected)).encode()).hexdigest()
+        sub = self.subset_cache.get_or_compute(digest, lambda: self._build_subset(selected, digest))
+        return sub, selected
 
-        # --- Deduplication (LD 5.1) ---
-        if deduplicate:
-            all_detections = self._deduplicate_detections(all_detections)
+    def selection(self, markers: list[str] | None = None, families: list[str] | None = None) -> frozenset[str]:
+        """The marker ids a markers / families selection stands for (see subset()).
 
-        elapsed = (time.perf_counter() - start) * 1000
-        return {
-            "detections": all_detections,
-            "temporal_patterns": temporal,
-            "message_vad": message_vad,
-            "message_emotions": message_emotions,
-            "ued_metrics": ued_metrics,
-            "state_indices": state_indices,
-            "speaker_baselines": speaker_baselines,
-            "topology": topology,
-            "timing_ms": round(elapsed, 2),
-            "shadow_mode": True
+        Only validates: cheap enough for the event loop, unlike building
+        the sub-engine. Raises ValueError for unknown ids or a selection
+        matching nothing.
+        """
+        self.ensure_loaded()
+        unknown = sorted(set(markers or ()) - self.markers.keys())
+        if unknown:
+            raise ValueError(f"Unknown marker ids: {', '.join(unknown)}")
+        wanted_families = {f.upper() for f in families or ()}
+        selected = frozenset(markers or ()) | {
+            mid for mid, mdef in self.markers.items()
+            if mdef.family and mdef.family.upper() in wanted_families
         }
+        if not selected:
+            raise ValueError(f"No markers selected (families: {', '.join(families or ()) or '-'})")
+        return selected
+
+    def _build_subset(self, selected: frozenset[str], digest: str) -> MarkerEngine:
+        closure = self.dependency_closure(selected)
+        sub = MarkerEngine()
+        sub.registry_sha = f"{self.registry_sha}+{digest}"
+        sub.engine_config = self.engine_config
+        sub.load_source = "subset"
+        sub.text_cache = self.text_cache
+        sub.conversation_cache = self.conversation_cache
+        # Own copies: indexing assigns MarkerDef.idx and pattern slots
+        mdefs = []
+        for mid, mdef in self.markers.items():
+            if mid in closure:
+                mdef = copy.copy(mdef)
+                mdef.patterns = [copy.copy(pat) for pat in mdef.patterns]
+                mdefs.append(mdef)
+        sub._index(mdefs)
+        sub._loaded = True
+        return sub
+
+    def dependency_closure(self, ids) -> frozenset[str]:
+        """The given markers plus every marker their detection reads.
+
+        Follows SEM composed ATOs (plus the DRA guard ATOs of emotion SEMs),
+        CLU/MEMA composed_of refs resolved as at runtime (keyword refs
+        included), CLU negative evidence, MEMA absence sets, the markers a
+        MEMA's detect_class keywords count, and the CLUs whose families or
+        tags gate absence MEMAs.
+        """
+        self.ensure_loaded()
+        sem_plans = {plan.mdef.id: plan for plan in self._sem_plan}
+        clu_plans = {plan.mdef.id: plan for plan in self._clu_plan}
+        mema_plans = {plan.mdef.id: (idx, plan) for idx, plan in enumerate(self._mema_plan)}
+        keyword_related: dict[int, list[str]] = {}
+        for mid, memas in self._mema_by_marker.items():
+            for idx in memas:
+                keyword_related.setdefault(idx, []).append(mid)
+        dra_ids = [
+            self._NEGATION_ID, self._INTENSITY_HIGH_ID, self._INTENSITY_LOW_ID,
+            self._PUNCT_INTENSITY_ID, *self._REPORTED_SPEECH_IDS,
+        ]
+        context_families = self._CONFLICT_INDICATORS | self._NEGATIVE_FAMILIES | self._POSITIVE_FAMILIES
+        family_clus = [
+            mdef.id for mdef in self.clu_markers
+            if {t.upper() for t in mdef.tags} & context_families
+            or (mdef.family and mdef.family.upper() in context_families)
+        ]
+
+        def ref_ids(ref: str):
+            targets = self._ref_target_mask(ref)
+            if targets is None:
+                return self.markers.keys()  # A ref without keyword parts matches anything
+            return [ref, *self._ids_of(targets)]
+
+        closure: set[str] = set()
+        stack = list(ids)
+        while stack:
+            mid = stack.pop()
+            if mid in closure or mid not in self.markers:
+                continue
+            closure.add(mid)
+            deps: list[str] = []
+            if mid in sem_plans:
+                plan = sem_plans[mid]
+                deps.extend(plan.refs)
+                if plan.is_emotion:
+                    deps.extend(dra_ids)
+            elif mid in clu_plans:
+                plan = clu_plans[mid]
+                for ref in (*plan.refs, *plan.neg_refs):
+                    deps.extend(ref_ids(ref))
+            elif mid in mema_plans:
+                idx, plan = mema_plans[mid]
+                for ref in self._composition_refs(plan.mdef.composed_of):
+                    deps.extend(ref_ids(ref))
+                deps.extend(keyword_related.get(idx, ()))
+                if plan.absence_mask is not None:
+                    deps.extend(self._ids_of(plan.absence_mask))
+                if plan.absence_mask is not None or plan.mdef.detect_class == "absence_meta":
+                    deps.extend(family_clus)
+            stack.extend(d for d in deps if d not in closure)
+        return frozenset(closure)
+
+    def _restrict(self, result: dict, selected: frozenset[str], deduplicate: bool) -> dict:
+        """Keep only the selected markers of a sub-engine result (deduplicated among them)."""
+        detections = [d for d in result["detections"] if d.marker_id in selected]
+        result["detections"] = self._deduplicate_detections(detections) if deduplicate else detections
+        for key in ("temporal_patterns", "timeline"):
+            if key in result:
+                result[key] = [item for item in result[key] if item["marker_id"] in selected]
+        return result
 
     @staticmethod
     def _compute_speaker_baselines(
@@ -1318,93 +2478,14 @@ class MarkerEngine:
         """
         Per-speaker baseline computation (Polygraph principle).
 
-        For each speaker, tracks a running EWMA baseline of their VAD values.
-        Detects significant deviations (shifts) from baseline — the signal
-        isn't the absolute value but the DELTA from their own norm.
-
-        If warm_start is provided (from persona profile), pre-seeds speaker
-        EWMA baselines so the first message already computes a meaningful delta.
-
-        Returns per-speaker stats + per-message deltas.
+        See SpeakerBaselineTracker. Returns per-speaker stats + per-message deltas.
         """
-        alpha = 0.3  # EWMA smoothing — lower = more stable baseline
-        speaker_history: dict[str, list[float]] = {}
-        speaker_ewma: dict[str, dict[str, float]] = {}  # running baseline
-        per_message_delta: list[dict | None] = []
-
-        # Pre-seed from warm_start (persona profile EWMA)
-        if warm_start:
-            for role, seed in warm_start.items():
-                speaker_ewma[role] = {
-                    "valence": seed.get("valence", 0),
-                    "arousal": seed.get("arousal", 0),
-                    "dominance": seed.get("dominance", 0),
-                }
-                speaker_history[role] = []
+        from .dynamics import SpeakerBaselineTracker
 
+        tracker = SpeakerBaselineTracker(warm_start)
         for idx, msg in enumerate(messages):
-            role = msg.get("role", "?")
-            vad = message_vad[idx] if idx < len(message_vad) else None
-
-            if not vad or (vad["valence"] == 0 and vad["arousal"] == 0 and vad["dominance"] == 0):
-                per_message_delta.append(None)
-                continue
-
-            v, a, d = vad["valence"], vad["arousal"], vad["dominance"]
-
-            if role not in speaker_ewma:
-                # First message from this speaker: initialize baseline
-                speaker_ewma[role] = {"valence": v, "arousal": a, "dominance": d}
-                speaker_history[role] = [v]
-                per_message_delta.append({
-                    "speaker": role,
-                    "delta_v": 0.0, "delta_a": 0.0,
-                    "baseline_v": v, "baseline_a": a,
-                    "shift": None,
-                })
-                continue
-
-            bl = speaker_ewma[role]
-            dv = round(v - bl["valence"], 3)
-            da = round(a - bl["arousal"], 3)
-
-            # Classify shift
-            shift = None
-            if dv > 0.18 and bl["valence"] < 0.0:
-                shift = "repair"  # positive shift from negative baseline
-            elif dv < -0.25 and bl["valence"] > -0.1:
-                shift = "escalation"  # negative shift from neutral/positive baseline
-            elif abs(dv) > 0.3:
-                shift = "volatility"  # large swing either direction
-
-            per_message_delta.append({
-                "speaker": role,
-                "delta_v": dv, "delta_a": da,
-                "baseline_v": round(bl["valence"], 3),
-                "baseline_a": round(bl["arousal"], 3),
-                "shift": shift,
-            })
-
-            # Update EWMA baseline
-            bl["valence"] = round(bl["valence"] * (1 - alpha) + v * alpha, 3)
-            bl["arousal"] = round(bl["arousal"] * (1 - alpha) + a * alpha, 3)
-            bl["dominance"] = round(bl["dominance"] * (1 - alpha) + d * alpha, 3)
-            speaker_history.setdefault(role, []).append(v)
-
-        # Summary per speaker
-        speakers = {}
-        for role, hist in speaker_history.items():
-            speakers[role] = {
-                "message_count": len(hist),
-                "baseline_final": speaker_ewma.get(role, {}),
-                "valence_mean": round(sum(hist) / len(hist), 3) if hist else 0,
-                "valence_range": round(max(hist) - min(hist), 3) if hist else 0,
-            }
-
-        return {
-            "speakers": speakers,
-            "per_message_delta": per_message_delta,
-        }
+            tracker.push(msg.get("role", "?"), message_vad[idx] if idx < len(message_vad) else None)
+        return tracker.summary()
 
     def _extract_temporal_patterns(
         self, detections: list[Detection], total_messages: int
@@ -1414,39 +2495,44 @@ class MarkerEngine:
         for d in detections:
             for idx in d.message_indices:
                 marker_timeline.setdefault(d.marker_id, []).append(idx)
+        return self._temporal_patterns(marker_timeline, total_messages)
 
-        patterns = []
-        for marker_id, indices in marker_timeline.items():
-            if len(indices) < 2:
-                continue
-
-            indices = sorted(set(indices))
-            first = indices[0]
-            last = indices[-1]
-            freq = len(indices)
-
-            # Simple trend detection
-            midpoint = total_messages // 2
-            early = sum(1 for i in indices if i < midpoint)
-            late = sum(1 for i in indices if i >= midpoint)
-
-            if late > early * 1.5:
-                trend = "increasing"
-            elif early > late * 1.5:
-                trend = "decreasing"
-            else:
-                trend = "stable"
+    @classmethod
+    def _temporal_patterns(cls, marker_timeline: dict[str, list[int]], total_messages: int) -> list[dict]:
+        """Recurring-marker patterns from marker id → message indices (one per detection)."""
+        patterns = [
+            cls._recurring_pattern(marker_id, sorted(set(indices)), total_messages)
+            for marker_id, indices in marker_timeline.items()
+            if len(indices) >= 2
+        ]
+        return sorted(patterns, key=lambda p: -p["frequency"])
 
-            patterns.append({
-                "pattern_type": "recurring",
-                "marker_id": marker_id,
-                "first_seen": first,
-                "last_seen": last,
-                "frequency": freq,
-                "trend": trend,
-            })
+    @staticmethod
+    def _recurring_pattern(marker_id: str, indices: list[int], total_messages: int) -> dict:
+        """Temporal pattern of one marker from its distinct message indices, ascending."""
+        first = indices[0]
+        last = indices[-1]
+        freq = len(indices)
+
+        # Simple trend detection
+        early = bisect_left(indices, total_messages // 2)  # Messages before the midpoint
+        late = freq - early
+
+        if late > early * 1.5:
+            trend = "increasing"
+        elif early > late * 1.5:
+            trend = "decreasing"
+        else:
+            trend = "stable"
 
-        return sorted(patterns, key=lambda p: -p["frequency"])
+        return {
+            "pattern_type": "recurring",
+            "marker_id": marker_id,
+            "first_seen": first,
+            "last_seen": last,
+            "frequency": freq,
+            "trend": trend,
+        }
 
     def _update_ewma_precision(self):
         """Adjust dynamic threshold modifier based on prediction accuracy (LD 5.1)."""
@@ -1495,21 +2581,10 @@ class MarkerEngine:
             return detections
 
         # 2. For each span, pick the best candidate
-        layer_prio = {"MEMA": 4, "CLU": 3, "SEM": 2, "ATO": 1, "UNKNOWN": 0}
         winner_matches_by_det_id: dict[str, list[Match]] = {}
 
         for span, candidates in span_map.items():
-            def sort_key(c):
-                det, match = c
-                mdef = self.markers.get(det.marker_id)
-                rating = mdef.rating if mdef else 3
-                return (
-                    layer_prio.get(det.layer, 0),
-                    -rating,  # Lower rating (1) is better
-                    det.confidence
-                )
-            
-            candidates.sort(key=sort_key, reverse=True)
+            candidates.sort(key=lambda c: self._span_rank(c[0]), reverse=True)
             winner_det, winner_match = candidates[0]
             
             # Record this match for the winning detection
@@ -1535,13 +2610,27 @@ class MarkerEngine:
                 added_ids.add(det.marker_id)
 
         # Sort for consistent output
-        final_detections.sort(key=lambda d: (layer_prio.get(d.layer, 0), d.confidence), reverse=True)
+        final_detections.sort(key=self._deduplicated_order, reverse=True)
         return final_detections
 
+    @staticmethod
+    def _deduplicated_order(det: Detection) -> tuple:
+        """Sort key of deduplicated detections (descending: deeper layers, then confidence)."""
+        return (_LAYER_PRIORITY.get(det.layer, 0), det.confidence)
+
+    def _span_rank(self, det: Detection) -> tuple:
+        """Rank of a detection's claim on a text span in deduplication (higher wins)."""
+        mdef = self.markers.get(det.marker_id)
+        rating = mdef.rating if mdef else 3
+        return (
+            _LAYER_PRIORITY.get(det.layer, 0),
+            -rating,  # Lower rating (1) is better
+            det.confidence
+        )
+
     def get_marker(self, marker_id: str) -> MarkerDef | None:
         """Get a single marker definition."""
-        if not self._loaded:
-            self.load()
+        self.ensure_loaded()
         return self.markers.get(marker_id)
 
     def search_markers(
@@ -1554,8 +2643,7 @@ class MarkerEngine:
         offset: int = 0,
     ) -> tuple[list[MarkerDef], int]:
         """Search/filter markers with pagination."""
-        if not self._loaded:
-            self.load()
+        self.ensure_loaded()
 
         results = list(self.markers.values())
 
@@ -5,7 +5,13 @@ Exposes the LeanDeep 5.0 marker detection engine as a REST API.
 
 Endpoints:
   POST /v1/analyze              — Single text analysis
+  POST /v1/analyze/batch        — Many texts, results streamed as NDJSON
   POST /v1/analyze/conversation — Multi-message conversation analysis
+  POST /v1/analyze/dynamics/stream — Dynamics, streamed message by message as NDJSON
+  POST /v1/analyze/full         — Markers, dynamics and interpretation in one pass
+  POST /v1/sessions             — Open an incremental conversation session
+  POST /v1/sessions/{id}/messages — Append messages, get the updated analysis
+  WS   /v1/stream/conversation  — Live per-message annotation
   GET  /v1/markers              — List/filter markers
   GET  /v1/markers/{id}         — Get marker details
   GET  /v1/engine/config        — LD5 engine configuration
@@ -14,23 +20,36 @@ Endpoints:
 
 from __future__ import annotations
 
+import asyncio
 import io
+import json
+import threading
 import time
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import Depends, FastAPI, File, HTTPException, Query, UploadFile
+from fastapi import (
+    Depends, FastAPI, File, HTTPException, Query, Request, UploadFile, WebSocket, WebSocketDisconnect, status,
+)
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
 
-from .auth import load_api_keys, verify_api_key
+from .auth import load_api_keys, verify_api_key, verify_websocket_api_key
 from .config import settings
 from .engine import engine
 from .models import (
     AnalyzeMeta,
     AnalyzeRequest,
     AnalyzeResponse,
+    AnalysisSection,
+    BatchAnalyzeRequest,
+    BatchItem,
+    BatchItemResult,
+    BatchOptions,
     ConversationMarker,
     ConversationRequest,
     ConversationResponse,
@@ -40,41 +59,64 @@ from .models import (
     EngineConfig,
     Episode,
     FramingHypothesis,
+    FullAnalysisRequest,
+    FullAnalysisResponse,
     HealthResponse,
     InterpretFindings,
     InterpretResponse,
+    Interpretation,
+    Language,
     Layer,
     MarkerDetail,
     MarkerListResponse,
+    Message,
     PatternMatch,
     PersonaCreateResponse,
     PersonaSessionSummary,
     PredictionReservoir,
     PredictionResponse,
     SemioticEntry,
+    SessionAppendRequest,
+    SessionCreateRequest,
+    SessionCreateResponse,
     SpeakerBaselines,
     SpeakerDelta,
     SpeakerSummary,
     StateIndices,
+    StreamConversationUpdate,
+    StreamDynamicsResult,
+    StreamMessageUpdate,
     TemporalPattern,
     UEDMetrics,
     VADPoint,
 )
 from .interpret import aggregate_framings, build_semiotic_map, dominant_framing, synthesize_narrative
 from .personas import PersonaStore
+from .session import ConversationSession, SessionStore
+from .runtime import gc_pauses, process_stats
+from .workers import EnginePool, PoolBusy, call_engine
 
 _start_time = time.time()
+_startup_ms: dict[str, float] = {}
 
 
 persona_store = PersonaStore()
+session_store = SessionStore()
+engine_pool = EnginePool(settings.engine_workers, settings.engine_queue_depth, settings.engine_pool)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load engine and auth on startup."""
-    engine.load()
+    """Load engine and auth on startup (api.prefork workers inherit a loaded engine)."""
+    gc_pauses.install()
+    engine.ensure_loaded()
+    t0 = time.perf_counter()
     load_api_keys()
+    _startup_ms.update({f"engine_{k}": v for k, v in engine.load_timings.items()})
+    _startup_ms["api_keys"] = round((time.perf_counter() - t0) * 1000, 2)
+    _startup_ms["app_ready"] = round((time.time() - _start_time) * 1000, 2)
     yield
+    engine_pool.shutdown()
 
 
 app = FastAPI(
@@ -116,9 +158,24 @@ async def analyze_text(
     For single-text analysis, only ATO and SEM layers are meaningful.
     CLU/MEMA require conversation context (use /v1/analyze/conversation).
     """
-    layers = [l.value for l in req.layers]
-    result = engine.analyze_text(req.text, layers=layers, threshold=req.threshold)
+    options = _text_options(req)
+    result = await _run_engine("analyze_text", req.text, **options)
+    return AnalyzeResponse(**_text_response_fields(result, options["layers"], len(req.text)))
+
+
+def _text_options(req: AnalyzeRequest | BatchOptions) -> dict:
+    """engine.analyze_text kwargs of a request's options."""
+    return {
+        "layers": [l.value for l in req.layers],
+        "threshold": req.threshold,
+        "lang": _language(req.language),
+        "evidence": req.evidence.value,
+        **_selection(req),
+    }
 
+
+def _text_response_fields(result: dict, layers: list[str], text_length: int) -> dict:
+    """markers and meta of an AnalyzeResponse from an analyze_text result."""
     markers = [
         DetectedMarker(
             id=d.marker_id,
@@ -139,16 +196,184 @@ async def analyze_text(
         for d in result["detections"]
     ]
 
-    return AnalyzeResponse(
-        markers=sorted(markers, key=lambda m: -m.confidence),
-        meta=AnalyzeMeta(
+    return {
+        "markers": sorted(markers, key=lambda m: -m.confidence),
+        "meta": AnalyzeMeta(
             processing_ms=result["timing_ms"],
-            text_length=len(req.text),
+            queue_ms=result.get("queue_ms"),
+            run_ms=result.get("run_ms"),
+            text_length=text_length,
             markers_detected=len(markers),
             layers_scanned=layers,
             shadow_mode=result.get("shadow_mode", False),
         ),
-    )
+    }
+
+
+# ---------------------------------------------------------------------------
+# POST /v1/analyze/batch — Many standalone texts, results streamed as NDJSON
+# ---------------------------------------------------------------------------
+
+NDJSON = "application/x-ndjson"
+_BATCH_MAX_LINE = 1_000_000  # bytes of one uploaded NDJSON line
+
+
+@app.post("/v1/analyze/batch")
+async def analyze_batch(request: Request, api_key: str = Depends(verify_api_key)):
+    """
+    Analyze many standalone texts (e-mails, posts, ...) in one call.
+
+    Body: {"items": [{"id", "text"}, ...]} with the /v1/analyze options
+    (BatchAnalyzeRequest, up to 1000 items), or an NDJSON upload
+    (Content-Type: application/x-ndjson) of any length: one {"id", "text"}
+    object per line, options as query parameters (threshold, layers,
+    language, evidence, markers, families; lists comma-separated).
+
+    Texts are fanned out across the engine pool and the results streamed
+    back as NDJSON lines in completion order: {"id", "markers", "meta"} as
+    from /v1/analyze, or {"id", "error"}. Ids default to the position in
+    the batch. At most one text per engine worker is in flight and an
+    upload is read only as results go out, so memory does not grow with
+    the batch.
+    """
+    try:
+        if request.headers.get("content-type", "").startswith(NDJSON):
+            params = request.query_params
+            options = BatchOptions.model_validate({
+                key: params[key].split(",") if key in ("layers", "markers", "families") else params[key]
+                for key in BatchOptions.model_fields if key in params
+            })
+            return _UploadStreamingResponse(
+                _batch_results(_ndjson_items(request.stream()), _text_options(options)), media_type=NDJSON,
+            )
+        req = BatchAnalyzeRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    return StreamingResponse(_batch_results(_listed_items(req.items), _text_options(req)), media_type=NDJSON)
+
+
+class _UploadStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body reads the request stream while it is sent.
+
+    Starlette's listens on receive() for a disconnect meanwhile (ASGI
+    http spec < 2.4), which would take the upload's body chunks; a
+    disconnect shows up as a failing send instead.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+
+async def _listed_items(items: list[BatchItem]):
+    for i, item in enumerate(items):
+        yield (i if item.id is None else item.id), item.text, None
+
+
+async def _ndjson_items(chunks):
+    """(id, text, error) per line of an NDJSON upload, read as the chunks arrive."""
+    index = 0
+    buffer = b""
+    skipping = False  # Dropping the rest of an over-long line
+    async for chunk in chunks:
+        lines = (buffer + chunk).split(b"\n")
+        buffer = lines.pop()
+        if skipping and lines:
+            lines[0], skipping = b"", False
+        for line in lines:
+            if line.strip():
+                yield _ndjson_item(line, index)
+                index += 1
+        if skipping:
+            buffer = b""
+        elif len(buffer) > _BATCH_MAX_LINE:
+            yield index, None, f"Line longer than {_BATCH_MAX_LINE} bytes"
+            index += 1
+            buffer, skipping = b"", True
+    if buffer.strip() and not skipping:
+        yield _ndjson_item(buffer, index)
+
+
+def _ndjson_item(line: bytes, index: int) -> tuple:
+    try:
+        item = BatchItem.model_validate_json(line)
+    except ValidationError as e:
+        return index, None, f"Invalid line: {e.errors()[0]['msg']}"
+    return (index if item.id is None else item.id), item.text, None
+
+
+async def _batch_results(items, options: dict):
+    """NDJSON lines of BatchItemResults, in completion order."""
+    limit = max(1, engine_pool.workers)
+    pending: set[asyncio.Task] = set()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < limit:
+                try:
+                    item = await anext(items)
+                except StopAsyncIteration:
+                    exhausted = True
+                else:
+                    pending.add(asyncio.ensure_future(_batch_item(*item, options)))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                unset = {key for key in ("markers", "meta", "error") if getattr(result, key) is None}
+                yield result.model_dump_json(exclude=unset) + "\n"
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _batch_item(item_id, text: str | None, error: str | None, options: dict) -> BatchItemResult:
+    if error is not None:
+        return BatchItemResult(id=item_id, error=error)
+    try:
+        result, timing = await engine_pool.run(call_engine, "analyze_text", text, **options)
+    except PoolBusy as e:
+        return BatchItemResult(id=item_id, error=str(e))
+    result["queue_ms"], result["run_ms"] = timing.queue_ms, timing.run_ms
+    return BatchItemResult(id=item_id, **_text_response_fields(result, options["layers"], len(text)))
+
+
+async def _offload(fn, *args, local: bool = False, **kwargs):
+    """(fn(...), PoolTiming) from the engine pool (see api/workers.py); 503 while it is full."""
+    try:
+        return await engine_pool.run(fn, *args, local=local, **kwargs)
+    except PoolBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+async def _run_engine(method: str, *args, **kwargs) -> dict:
+    """engine.<method>(...) off the event loop; the result gains queue_ms and run_ms."""
+    result, timing = await _offload(call_engine, method, *args, **kwargs)
+    result["queue_ms"], result["run_ms"] = timing.queue_ms, timing.run_ms
+    return result
+
+
+def _language(language: Language | None) -> str | None:
+    """Engine lang of a request language; None lets the engine guess per message."""
+    return language.value if language else None
+
+
+def _selection(req: AnalyzeRequest | BatchOptions | ConversationRequest) -> dict:
+    """markers/families kwargs for the engine; 422 for an unknown or empty selection.
+
+    Only validates: the sub-engine is built (or taken from its cache) by
+    the engine call itself, on the pool rather than the event loop.
+    """
+    if not (req.markers or req.families):
+        return {}
+    try:
+        engine.selection(req.markers, req.families)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"markers": req.markers, "families": req.families}
 
 
 # ---------------------------------------------------------------------------
@@ -165,32 +390,22 @@ async def analyze_conversation(
 
     Supports all 4 layers including CLU (cluster patterns over messages)
     and MEMA (meta-level organism diagnosis). Returns temporal patterns
-    showing how markers evolve across the conversation.
+    showing how markers evolve across the conversation. With timeline=true,
+    also returns when each CLU/MEMA switched on and off.
     """
     messages = [{"role": m.role, "text": m.text} for m in req.messages]
     layers = [l.value for l in req.layers]
-    result = engine.analyze_conversation(messages, layers=layers, threshold=req.threshold)
+    result = await _run_engine(
+        "analyze_conversation", messages, layers=layers, threshold=req.threshold, timeline=req.timeline,
+        outputs={"detections", "temporal_patterns", "topology"}, lang=_language(req.language),
+        evidence=req.evidence.value, **_selection(req),
+    )
+    return _conversation_response(result, layers, sum(len(m.text) for m in req.messages))
 
-    markers = [
-        ConversationMarker(
-            id=d.marker_id,
-            layer=Layer(d.layer),
-            confidence=d.confidence,
-            description=d.description,
-            message_indices=d.message_indices,
-            family=d.family,
-            multiplier=d.multiplier,
-            matches=[
-                PatternMatch(
-                    pattern=m.pattern,
-                    span=(m.start, m.end),
-                    matched_text=m.matched_text,
-                )
-                for m in d.matches
-            ],
-        )
-        for d in result["detections"]
-    ]
+
+def _conversation_response(result: dict, layers: list[str], text_length: int) -> ConversationResponse:
+    """ConversationResponse from an analyze_conversation / session result."""
+    markers = [_conversation_marker(d) for d in result["detections"]]
 
     temporal = [
         TemporalPattern(**tp)
@@ -200,10 +415,13 @@ async def analyze_conversation(
     return ConversationResponse(
         markers=sorted(markers, key=lambda m: (-m.confidence, m.id)),
         temporal_patterns=temporal,
+        timeline=result.get("timeline", []),
         topology=result.get("topology"),
         meta=AnalyzeMeta(
             processing_ms=result["timing_ms"],
-            text_length=sum(len(m.text) for m in req.messages),
+            queue_ms=result.get("queue_ms"),
+            run_ms=result.get("run_ms"),
+            text_length=text_length,
             markers_detected=len(markers),
             layers_scanned=layers,
             shadow_mode=result.get("shadow_mode", False),
@@ -211,6 +429,227 @@ async def analyze_conversation(
     )
 
 
+def _conversation_marker(d) -> ConversationMarker:
+    return ConversationMarker(
+        id=d.marker_id,
+        layer=Layer(d.layer),
+        confidence=d.confidence,
+        description=d.description,
+        message_indices=d.message_indices,
+        family=d.family,
+        multiplier=d.multiplier,
+        matches=[
+            PatternMatch(
+                pattern=m.pattern,
+                span=(m.start, m.end),
+                matched_text=m.matched_text,
+            )
+            for m in d.matches
+        ],
+        first_satisfied=d.first_satisfied,
+    )
+
+
+# ---------------------------------------------------------------------------
+# POST /v1/sessions — Incremental conversation sessions
+# ---------------------------------------------------------------------------
+
+@app.post("/v1/sessions", response_model=SessionCreateResponse)
+async def create_session(
+    req: SessionCreateRequest,
+    api_key: str = Depends(verify_api_key),
+):
+    """
+    Open a conversation session. Messages appended to it are analysed one
+    at a time instead of re-sending the whole conversation; sessions live
+    in memory and expire when idle.
+    """
+    session = ConversationSession(
+        engine, layers=[l.value for l in req.layers], threshold=req.threshold, timeline=req.timeline,
+        lang=_language(req.language),
+    )
+    session_id, created_at = session_store.create(session)
+    return SessionCreateResponse(session_id=session_id, created_at=created_at)
+
+
+@app.post("/v1/sessions/{session_id}/messages", response_model=ConversationResponse)
+async def append_session_messages(
+    session_id: str,
+    req: SessionAppendRequest,
+    api_key: str = Depends(verify_api_key),
+):
+    """
+    Append messages to a session. Only the new messages are run through
+    detection; the response covers the whole conversation so far, the same
+    as /v1/analyze/conversation would for all messages.
+    """
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if len(session) + len(req.messages) > settings.max_conversation_messages:
+        raise HTTPException(status_code=422, detail="Session message limit reached")
+
+    result, timing = await _offload(
+        _locked, session, session.extend, [{"role": m.role, "text": m.text} for m in req.messages], local=True,
+    )
+    result["queue_ms"], result["run_ms"] = timing.queue_ms, timing.run_ms
+    session_store.touch(session_id)
+    text_length = sum(len(m.get("text", "")) for m in session.messages)
+    return _conversation_response(result, session.layers, text_length)
+
+
+def _locked(session: ConversationSession, fn, *args):
+    """fn(*args) holding the session's lock: concurrent requests may append to one session."""
+    with session.lock:
+        return fn(*args)
+
+
+@app.delete("/v1/sessions/{session_id}")
+async def delete_session(session_id: str, api_key: str = Depends(verify_api_key)):
+    """Close a session and drop its state."""
+
+    if not session_store.delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"status": "deleted", "session_id": session_id}
+
+
+# ---------------------------------------------------------------------------
+# WS /v1/stream/conversation — Live per-message annotation
+# ---------------------------------------------------------------------------
+
+# Stream frame for a message the engine pool had no room for
+_STREAM_BUSY = {"type": "error", "detail": "busy", "retry_after": 1}
+
+
+@app.websocket("/v1/stream/conversation")
+async def stream_conversation(websocket: WebSocket):
+    """
+    Live per-message annotation on an incremental session.
+
+    Query parameters: session_id (resume a session from /v1/sessions or an
+    earlier stream), or threshold, layers (comma-separated) and language
+    for a new one; api_key if the X-API-Key header cannot be set.
+
+    After {"type": "session", ...}, send one {"role", "text"} object per
+    message. Each is answered right away with a "message" update (its
+    ATO/SEM markers, VAD point, prosody emotion, speaker delta). A
+    "conversation" update (CLU/MEMA markers, topology) follows whenever the
+    active CLU/MEMA confidences or the topology's health, gates, constraint
+    statuses or counts changed. While the engine pool is full, a message is
+    answered with {"type": "error", "detail": "busy", "retry_after": 1}
+    and not added (send it again); after its "message" update, the same
+    error means only the conversation update was skipped (it follows with
+    the next message).
+    """
+    try:
+        verify_websocket_api_key(websocket)
+    except HTTPException as exc:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(exc.detail))
+        return
+
+    params = websocket.query_params
+    session_id = params.get("session_id")
+    if session_id:
+        session = session_store.get(session_id)
+        if session is None:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Session not found")
+            return
+    else:
+        try:
+            threshold = float(params.get("threshold", settings.default_threshold))
+            layers = [Layer(l.strip().upper()).value for l in params.get("layers", "ATO,SEM,CLU,MEMA").split(",") if l.strip()]
+            lang = _language(Language(params["language"]) if params.get("language") else None)
+        except ValueError:
+            threshold, layers = -1.0, []
+        if not 0.0 <= threshold <= 1.0 or not layers:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid threshold, layers or language")
+            return
+        session = ConversationSession(engine, layers=layers, threshold=threshold, lang=lang)
+        session_id, _ = session_store.create(session)
+
+    await websocket.accept()
+    await websocket.send_json({"type": "session", "session_id": session_id, "messages": len(session)})
+
+    last_state = None
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                msg = Message(**json.loads(raw))
+            except (ValueError, TypeError):
+                await websocket.send_json({"type": "error", "detail": 'Expected {"role": str, "text": str}'})
+                continue
+            if len(session) >= settings.max_conversation_messages:
+                await websocket.send_json({"type": "error", "detail": "Session message limit reached"})
+                continue
+
+            t0 = time.perf_counter()
+            try:
+                update, _ = await engine_pool.run(
+                    _stream_add, session, {"role": msg.role, "text": msg.text}, local=True,
+                )
+            except PoolBusy:
+                await websocket.send_json(_STREAM_BUSY)
+                continue
+            await websocket.send_json(
+                _stream_message(update, _conversation_marker, time.perf_counter() - t0).model_dump(mode="json")
+            )
+            session_store.touch(session_id)
+
+            t0 = time.perf_counter()
+            try:
+                overview, _ = await engine_pool.run(_locked, session, session.overview, local=True)
+            except PoolBusy:
+                await websocket.send_json(_STREAM_BUSY)  # The message stays added
+                continue
+            markers = sorted(
+                (_conversation_marker(d) for d in overview["detections"]),
+                key=lambda m: (-m.confidence, m.id),
+            )
+            topology = overview["topology"]
+            state = _conversation_state(markers, topology)
+            if state != last_state:
+                last_state = state
+                await websocket.send_json(StreamConversationUpdate(
+                    messages=len(session),
+                    markers=markers,
+                    topology=topology,
+                    processing_ms=round((time.perf_counter() - t0) * 1000, 2),
+                ).model_dump(mode="json"))
+    except WebSocketDisconnect:
+        pass
+
+
+def _conversation_state(markers: list[ConversationMarker], topology: dict) -> tuple:
+    """What a conversation update reports, less what moves with every message (counts, evidence)."""
+    summary = {k: v for k, v in topology["summary"].items() if k != "total_messages"}
+    constraints = [(c["id"], c["status"]) for c in topology["constraints"]]
+    return [(m.id, m.confidence) for m in markers], topology["health"], topology["gates"], constraints, summary
+
+
+def _stream_add(session: ConversationSession, message: dict) -> dict:
+    """Add one streamed message and return its message_update (on a pool worker)."""
+    with session.lock:
+        return session.message_update(session.add(message))
+
+
+def _stream_message(update: dict, marker, seconds: float) -> StreamMessageUpdate:
+    """StreamMessageUpdate of a session message_update; `marker` builds its ConversationMarkers."""
+    emotion = update["emotion"]
+    return StreamMessageUpdate(
+        index=update["index"],
+        role=update["role"],
+        markers=[marker(d) for d in update["detections"]],
+        vad=VADPoint(**update["vad"]) if update["vad"] is not None else None,
+        emotion=EmotionScore(
+            scores=emotion.scores, dominant=emotion.dominant, dominant_score=emotion.dominant_score,
+            prosody=getattr(emotion, 'prosody', None),
+        ) if emotion is not None else None,
+        speaker_delta=SpeakerDelta(**update["speaker_delta"]) if update["speaker_delta"] else None,
+        processing_ms=round(seconds * 1000, 2),
+    )
+
+
 # ---------------------------------------------------------------------------
 # POST /v1/analyze/dynamics — Emotion dynamics analysis
 # ---------------------------------------------------------------------------
@@ -230,51 +669,163 @@ async def analyze_dynamics(
     and accumulates session data into the profile.
     """
     messages = [{"role": m.role, "text": m.text} for m in req.messages]
-    layers = [l.value for l in req.layers]
 
     # Persona warm-start
-    persona = None
-    warm_start = None
-    if req.persona_token:
-        try:
-            persona = persona_store.get(req.persona_token)
-        except ValueError:
-            raise HTTPException(status_code=404, detail="Invalid persona token")
-        if persona is None:
-            raise HTTPException(status_code=404, detail="Persona not found")
-        warm_start = persona_store.extract_warm_start(persona)
+    persona, warm_start = _persona_warm_start(req.persona_token)
 
-    result = engine.analyze_conversation(
-        messages, layers=layers, threshold=req.threshold, warm_start=warm_start
-    )
+    result = await _run_engine("analyze_conversation", messages, **_dynamics_options(req, warm_start))
+    return DynamicsResponse(**_dynamics_response_fields(req, result, persona, messages))
 
-    markers = [
-        ConversationMarker(
-            id=d.marker_id,
-            layer=Layer(d.layer),
-            confidence=d.confidence,
-            description=d.description,
-            message_indices=d.message_indices,
-            family=d.family,
-            multiplier=d.multiplier,
-            matches=[
-                PatternMatch(
-                    pattern=m.pattern,
-                    span=(m.start, m.end),
-                    matched_text=m.matched_text,
-                )
-                for m in d.matches
-            ],
-            frame=getattr(engine.markers.get(d.marker_id), 'frame', None) or None,
-        )
-        for d in result["detections"]
-    ]
+
+def _dynamics_options(req: ConversationRequest, warm_start: dict | None) -> dict:
+    """engine.analyze_conversation kwargs of a dynamics request."""
+    return {
+        "layers": [l.value for l in req.layers],
+        "threshold": req.threshold,
+        "warm_start": warm_start,
+        "timeline": req.timeline,
+        "lang": _language(req.language),
+        "evidence": req.evidence.value,
+        **_selection(req),
+    }
+
+
+def _dynamics_response_fields(
+    req: ConversationRequest, result: dict, persona: dict | None, messages: list[dict],
+) -> dict:
+    """DynamicsResponse fields of an analyze_conversation result (accumulates it into the persona)."""
+    layers = [l.value for l in req.layers]
+    markers = [_dynamics_marker(d) for d in result["detections"]]
 
     temporal = [
         TemporalPattern(**tp)
         for tp in result.get("temporal_patterns", [])
     ]
 
+    # Persona accumulation (Pro tier)
+    persona_session_summary = _persona_session(persona, messages, result) if persona else None
+
+    return dict(
+        markers=sorted(markers, key=lambda m: (-m.confidence, m.id)),
+        temporal_patterns=temporal,
+        timeline=result.get("timeline", []),
+        topology=result.get("topology"),
+        persona_session=persona_session_summary,
+        meta=AnalyzeMeta(
+            processing_ms=result["timing_ms"],
+            queue_ms=result.get("queue_ms"),
+            run_ms=result.get("run_ms"),
+            text_length=sum(len(m.text) for m in req.messages),
+            markers_detected=len(markers),
+            layers_scanned=layers,
+            shadow_mode=result.get("shadow_mode", False),
+        ),
+        **_dynamics_fields(result),
+    )
+
+
+@app.post("/v1/analyze/dynamics/stream")
+async def analyze_dynamics_stream(
+    req: ConversationRequest,
+    api_key: str = Depends(verify_api_key),
+):
+    """
+    /v1/analyze/dynamics with progressive results, streamed as NDJSON.
+
+    One {"type": "message", ...} line per message (as on
+    /v1/stream/conversation: its ATO/SEM markers, VAD point, prosody
+    emotion, speaker delta) as soon as that message is analysed, then one
+    {"type": "dynamics", ...} line holding the full /v1/analyze/dynamics
+    response: CLU/MEMA markers, UED, speaker baselines, topology. A
+    {"type": "error", "detail"} line ends the stream if the engine is busy.
+    """
+    messages = [{"role": m.role, "text": m.text} for m in req.messages]
+    persona, warm_start = _persona_warm_start(req.persona_token)
+    options = _dynamics_options(req, warm_start)
+    return StreamingResponse(_dynamics_frames(req, messages, options, persona), media_type=NDJSON)
+
+
+async def _dynamics_frames(req: ConversationRequest, messages: list[dict], options: dict, persona: dict | None):
+    """NDJSON frames of a streamed dynamics analysis (the engine runs on one pool worker)."""
+    loop = asyncio.get_running_loop()
+    frames: asyncio.Queue[str | None] = asyncio.Queue()
+    closed = threading.Event()
+    last = time.perf_counter()
+
+    def on_message(update: dict) -> None:  # On the worker
+        nonlocal last
+        if closed.is_set():
+            raise _StreamClosed()
+        now = time.perf_counter()
+        frame = _stream_message(update, _dynamics_marker, now - last).model_dump_json()
+        last = now
+        loop.call_soon_threadsafe(frames.put_nowait, frame + "\n")
+
+    job = asyncio.ensure_future(engine_pool.run(
+        call_engine, "analyze_conversation", messages, on_message=on_message, local=True, **options,
+    ))
+    job.add_done_callback(_end_of_frames(frames))
+    try:
+        while (frame := await frames.get()) is not None:
+            yield frame
+        try:
+            result, timing = job.result()
+        except PoolBusy as e:
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+            return
+        result["queue_ms"], result["run_ms"] = timing.queue_ms, timing.run_ms
+        yield StreamDynamicsResult(**_dynamics_response_fields(req, result, persona, messages)).model_dump_json() + "\n"
+    finally:
+        closed.set()  # Client gone: the worker stops at the next message
+
+
+def _end_of_frames(frames: asyncio.Queue):
+    """Done callback of a streamed analysis: ends the frames (and marks a late error as seen)."""
+    def done(job: asyncio.Future) -> None:
+        if not job.cancelled():
+            job.exception()
+        frames.put_nowait(None)
+    return done
+
+
+class _StreamClosed(Exception):
+    """Raised on the worker to abandon an analysis nobody is reading anymore."""
+
+
+def _persona_warm_start(token: str | None) -> tuple[dict | None, dict | None]:
+    """(persona, warm_start) for an optional persona token; 404 if it is unknown."""
+    if not token:
+        return None, None
+    try:
+        persona = persona_store.get(token)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Invalid persona token")
+    if persona is None:
+        raise HTTPException(status_code=404, detail="Persona not found")
+    return persona, persona_store.extract_warm_start(persona)
+
+
+def _persona_session(persona: dict, messages: list[dict], result: dict) -> PersonaSessionSummary:
+    """Accumulate an analyzed conversation into the persona profile."""
+    summary = persona_store.accumulate_session(persona, messages, result)
+    return PersonaSessionSummary(
+        session_number=summary["session_number"],
+        warm_start_applied=summary["warm_start_applied"],
+        new_episodes=[Episode(**ep) for ep in summary["new_episodes"]],
+        state_snapshot=summary["state_snapshot"],
+        prediction_available=summary["prediction_available"],
+    )
+
+
+def _dynamics_marker(d) -> ConversationMarker:
+    """ConversationMarker with the marker's frame (dynamics-style responses)."""
+    marker = _conversation_marker(d)
+    marker.frame = getattr(engine.markers.get(d.marker_id), 'frame', None) or None
+    return marker
+
+
+def _dynamics_fields(result: dict) -> dict:
+    """message_vad, message_emotions, ued_metrics, state_indices and speaker_baselines models."""
     message_vad = [
         VADPoint(**mv) for mv in result.get("message_vad", [])
     ]
@@ -330,42 +881,23 @@ async def analyze_dynamics(
                 deltas.append(SpeakerDelta(**d))
         speaker_baselines = SpeakerBaselines(speakers=speakers, per_message_delta=deltas)
 
-    # Persona accumulation (Pro tier)
-    persona_session_summary = None
-    if persona:
-        summary = persona_store.accumulate_session(persona, messages, result)
-        persona_session_summary = PersonaSessionSummary(
-            session_number=summary["session_number"],
-            warm_start_applied=summary["warm_start_applied"],
-            new_episodes=[Episode(**ep) for ep in summary["new_episodes"]],
-            state_snapshot=summary["state_snapshot"],
-            prediction_available=summary["prediction_available"],
-        )
-
-    return DynamicsResponse(
-        markers=sorted(markers, key=lambda m: (-m.confidence, m.id)),
-        message_vad=message_vad,
-        message_emotions=message_emotions,
-        ued_metrics=ued_metrics,
-        state_indices=state_indices,
-        speaker_baselines=speaker_baselines,
-        temporal_patterns=temporal,
-        topology=result.get("topology"),
-        persona_session=persona_session_summary,
-        meta=AnalyzeMeta(
-            processing_ms=result["timing_ms"],
-            text_length=sum(len(m.text) for m in req.messages),
-            markers_detected=len(markers),
-            layers_scanned=layers,
-            shadow_mode=result.get("shadow_mode", False),
-        ),
-    )
+    return {
+        "message_vad": message_vad,
+        "message_emotions": message_emotions,
+        "ued_metrics": ued_metrics,
+        "state_indices": state_indices,
+        "speaker_baselines": speaker_baselines,
+    }
 
 
 # ---------------------------------------------------------------------------
 # POST /v1/analyze/interpret — Semiotic interpretation
 # ---------------------------------------------------------------------------
 
+# Interpretation runs at this threshold at most, to catch subtle signals
+INTERPRET_THRESHOLD = 0.3
+
+
 @app.post("/v1/analyze/interpret", response_model=InterpretResponse)
 async def analyze_interpret(
     req: ConversationRequest,
@@ -385,30 +917,143 @@ async def analyze_interpret(
     layers = [l.value for l in req.layers]
 
     # Use lower threshold for interpretation to catch subtle signals
-    interpret_threshold = min(req.threshold, 0.3)
-    result = engine.analyze_conversation(messages, layers=layers, threshold=interpret_threshold)
+    interpret_threshold = min(req.threshold, INTERPRET_THRESHOLD)
+    result = await _run_engine(
+        "analyze_conversation", messages, layers=layers, threshold=interpret_threshold, outputs={"detections"},
+        lang=_language(req.language), evidence=req.evidence.value, **_selection(req),
+    )
 
     detections = result["detections"]
+    return InterpretResponse(
+        meta=AnalyzeMeta(
+            processing_ms=result["timing_ms"],
+            queue_ms=result.get("queue_ms"),
+            run_ms=result.get("run_ms"),
+            text_length=sum(len(m.text) for m in req.messages),
+            markers_detected=len(detections),
+            layers_scanned=layers,
+            shadow_mode=result.get("shadow_mode", False),
+        ),
+        **_interpretation(detections, len(messages)).model_dump(),
+    )
+
+
+def _interpretation(detections: list, num_messages: int) -> Interpretation:
+    """Semiotic map, framings and narrative synthesis over a conversation's detections."""
     sem_map = build_semiotic_map(detections, engine)
     framings = aggregate_framings(detections, sem_map)
     dom = dominant_framing(framings)
 
     # Narrative synthesis
-    findings_raw = synthesize_narrative(framings, sem_map, num_messages=len(messages))
+    findings_raw = synthesize_narrative(framings, sem_map, num_messages=num_messages)
     findings = InterpretFindings(**findings_raw)
 
-    return InterpretResponse(
+    return Interpretation(
         framings=[FramingHypothesis(**f) for f in framings],
         semiotic_map={k: SemioticEntry(**v) for k, v in sem_map.items()},
         dominant_framing=dom,
         findings=findings,
+    )
+
+
+# ---------------------------------------------------------------------------
+# POST /v1/analyze/full — Markers, dynamics and interpretation in one call
+# ---------------------------------------------------------------------------
+
+# analyze_conversation outputs each section is built from
+_SECTION_OUTPUTS = {
+    AnalysisSection.MARKERS: {"detections", "temporal_patterns"},
+    AnalysisSection.VAD: {"message_vad", "message_emotions", "state_indices"},
+    AnalysisSection.UED: {"ued_metrics"},
+    AnalysisSection.SPEAKER_BASELINES: {"speaker_baselines"},
+    AnalysisSection.TOPOLOGY: {"topology"},
+    AnalysisSection.INTERPRET: set(),  # detections, in this pass or its own
+    AnalysisSection.PERSONA: {"detections", "message_vad", "state_indices", "speaker_baselines"},
+}
+
+
+@app.post("/v1/analyze/full", response_model=FullAnalysisResponse)
+async def analyze_full(
+    req: FullAnalysisRequest,
+    api_key: str = Depends(verify_api_key),
+):
+    """
+    Composite of /v1/analyze/conversation, /dynamics and /interpret.
+
+    Runs the pipeline once and returns only the requested sections
+    (markers, vad, ued, speaker_baselines, topology, interpret, persona);
+    meta.markers_detected counts the detections at the request threshold
+    whichever sections are returned. The interpret section uses the same
+    lower threshold (0.3) as /v1/analyze/interpret; above it, a second
+    detection pass runs on the conversation's cached scans. A
+    persona_token applies its warm-start; the persona section also
+    accumulates the conversation into it.
+    """
+    sections = set(req.sections)
+    if AnalysisSection.PERSONA in sections and not req.persona_token:
+        raise HTTPException(status_code=422, detail="The persona section requires a persona_token")
+
+    messages = [{"role": m.role, "text": m.text} for m in req.messages]
+    layers = [l.value for l in req.layers]
+    selection = _selection(req)
+    lang = _language(req.language)
+    persona, warm_start = _persona_warm_start(req.persona_token)
+
+    # Only the stages the requested sections depend on run (plus detections, for markers_detected)
+    interpret_threshold = min(req.threshold, INTERPRET_THRESHOLD)
+    outputs = set().union(*(_SECTION_OUTPUTS[s] for s in sections)) | {"detections"}
+
+    start = time.perf_counter()
+    result = await _run_engine(
+        "analyze_conversation", messages, layers=layers, threshold=req.threshold, warm_start=warm_start,
+        timeline=req.timeline and AnalysisSection.MARKERS in sections, outputs=outputs, lang=lang,
+        evidence=req.evidence.value, **selection,
+    )
+
+    response: dict = {}
+    if AnalysisSection.MARKERS in sections:
+        markers = [_dynamics_marker(d) for d in result["detections"]]
+        response["markers"] = sorted(markers, key=lambda m: (-m.confidence, m.id))
+        response["temporal_patterns"] = [TemporalPattern(**tp) for tp in result.get("temporal_patterns", [])]
+        response["timeline"] = result.get("timeline", [])
+
+    dynamics = _dynamics_fields(result)
+    if AnalysisSection.VAD in sections:
+        for key in ("message_vad", "message_emotions", "state_indices"):
+            response[key] = dynamics[key]
+    if AnalysisSection.UED in sections:
+        response["ued_metrics"] = dynamics["ued_metrics"]
+    if AnalysisSection.SPEAKER_BASELINES in sections:
+        response["speaker_baselines"] = dynamics["speaker_baselines"]
+    if AnalysisSection.TOPOLOGY in sections:
+        response["topology"] = result.get("topology")
+
+    queue_ms, run_ms = result["queue_ms"], result["run_ms"]
+    if AnalysisSection.INTERPRET in sections:
+        interpreted = result
+        if interpret_threshold != req.threshold:
+            interpreted = await _run_engine(
+                "analyze_conversation", messages, layers=layers, threshold=interpret_threshold,
+                outputs={"detections"}, lang=lang, evidence=req.evidence.value, **selection,
+            )
+            queue_ms, run_ms = queue_ms + interpreted["queue_ms"], run_ms + interpreted["run_ms"]
+        response["interpretation"] = _interpretation(interpreted["detections"], len(messages))
+
+    if AnalysisSection.PERSONA in sections:
+        response["persona_session"] = _persona_session(persona, messages, result)
+
+    return FullAnalysisResponse(
+        sections=sorted(sections, key=list(AnalysisSection).index),
         meta=AnalyzeMeta(
-            processing_ms=result["timing_ms"],
+            processing_ms=round((time.perf_counter() - start) * 1000, 2),
+            queue_ms=round(queue_ms, 2),
+            run_ms=round(run_ms, 2),
             text_length=sum(len(m.text) for m in req.messages),
-            markers_detected=len(detections),
+            markers_detected=len(result["detections"]),
             layers_scanned=layers,
             shadow_mode=result.get("shadow_mode", False),
         ),
+        **response,
     )
 
 
@@ -617,6 +1262,16 @@ async def health():
     return HealthResponse(
         markers_loaded=len(engine.markers),
         uptime_seconds=round(time.time() - _start_time, 1),
+        registry_source=engine.load_source,
+        snapshot_status=engine.snapshot_status,
+        startup_ms=_startup_ms,
+        analysis_cache={
+            "messages": engine.text_cache.stats(),
+            "conversations": engine.conversation_cache.stats(),
+            "subsets": engine.subset_cache.stats(),
+        },
+        engine_pool=engine_pool.stats(),
+        process=process_stats(),
     )
 
 
@@ -662,8 +1317,8 @@ async def upload_document(file: UploadFile = File(...)):
                 status_code=500,
                 detail="python-docx not installed. Run: pip install python-docx",
             )
-        doc = Document(io.BytesIO(content))
-        text = "\n".join(p.text for p in doc.paragraphs)
+        # Parsing a large document is CPU-bound: keep it off the event loop
+        text, _ = await _offload(_docx_text, Document, content, local=True)
     else:
         raise HTTPException(
             status_code=400,
@@ -671,3 +1326,8 @@ async def upload_document(file: UploadFile = File(...)):
         )
 
     return {"filename": name, "text": text, "length": len(text)}
+
+
+def _docx_text(document_cls, content: bytes) -> str:
+    doc = document_cls(io.BytesIO(content))
+    return "\n".join(p.text for p in doc.paragraphs)
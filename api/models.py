@@ -23,13 +23,50 @@ class Language(str, Enum):
     BILINGUAL = "bilingual"
 
 
+class Evidence(str, Enum):
+    NONE = "none"      # presence only: markers and confidences, no matches
+    FIRST = "first"    # first match of each matching pattern
+    ALL = "all"
+
+
+class AnalysisSection(str, Enum):
+    MARKERS = "markers"                      # markers, temporal_patterns, timeline
+    VAD = "vad"                              # message_vad, message_emotions, state_indices
+    UED = "ued"
+    SPEAKER_BASELINES = "speaker_baselines"
+    TOPOLOGY = "topology"
+    INTERPRET = "interpret"
+    PERSONA = "persona"                      # accumulate into the persona (needs persona_token)
+
+
 # --- Request Models ---
 
 class AnalyzeRequest(BaseModel):
     text: str = Field(..., min_length=1, max_length=100_000, description="Text to analyze")
-    language: Language = Language.DE
+    language: Language | None = Field(None, description="Message language (de/en/bilingual); guessed per message if omitted")
+    layers: list[Layer] = Field(default=[Layer.ATO, Layer.SEM], description="Layers to detect")
+    threshold: float = Field(default=0.5, ge=0.0, le=1.0, description="Confidence threshold")
+    evidence: Evidence = Field(Evidence.ALL, description="Match evidence returned: all, first per pattern, or none (faster)")
+    markers: list[str] | None = Field(None, description="Only these marker ids (runs their dependency closure)")
+    families: list[str] | None = Field(None, description="Only markers of these ld5 families")
+
+
+class BatchOptions(BaseModel):
+    language: Language | None = Field(None, description="Message language (de/en/bilingual); guessed per message if omitted")
     layers: list[Layer] = Field(default=[Layer.ATO, Layer.SEM], description="Layers to detect")
     threshold: float = Field(default=0.5, ge=0.0, le=1.0, description="Confidence threshold")
+    evidence: Evidence = Field(Evidence.ALL, description="Match evidence returned: all, first per pattern, or none (faster)")
+    markers: list[str] | None = Field(None, description="Only these marker ids (runs their dependency closure)")
+    families: list[str] | None = Field(None, description="Only markers of these ld5 families")
+
+
+class BatchItem(BaseModel):
+    id: str | int | None = Field(None, description="Client id, echoed in the result (default: position in the batch)")
+    text: str = Field(..., min_length=1, max_length=100_000)
+
+
+class BatchAnalyzeRequest(BatchOptions):
+    items: list[BatchItem] = Field(..., min_length=1, max_length=1000, description="Texts to analyze")
 
 
 class Message(BaseModel):
@@ -39,13 +76,41 @@ class Message(BaseModel):
 
 class ConversationRequest(BaseModel):
     messages: list[Message] = Field(..., min_length=1, max_length=2000)
-    language: Language = Language.DE
+    language: Language | None = Field(None, description="Message language (de/en/bilingual); guessed per message if omitted")
     layers: list[Layer] = Field(
         default=[Layer.ATO, Layer.SEM, Layer.CLU, Layer.MEMA],
         description="Layers to detect",
     )
     threshold: float = Field(default=0.5, ge=0.0, le=1.0)
+    evidence: Evidence = Field(Evidence.ALL, description="Match evidence returned: all, first per pattern, or none (faster)")
     persona_token: str | None = Field(None, description="Persona token for persistent profiling (Pro tier)")
+    timeline: bool = Field(False, description="Include CLU/MEMA on/off intervals across the conversation")
+    markers: list[str] | None = Field(None, description="Only these marker ids (runs their dependency closure)")
+    families: list[str] | None = Field(None, description="Only markers of these ld5 families")
+
+
+class FullAnalysisRequest(ConversationRequest):
+    sections: list[AnalysisSection] = Field(
+        default=[
+            AnalysisSection.MARKERS, AnalysisSection.VAD, AnalysisSection.UED,
+            AnalysisSection.SPEAKER_BASELINES, AnalysisSection.TOPOLOGY, AnalysisSection.INTERPRET,
+        ],
+        description="Response sections to include",
+    )
+
+
+class SessionCreateRequest(BaseModel):
+    language: Language | None = Field(None, description="Message language (de/en/bilingual); guessed per message if omitted")
+    layers: list[Layer] = Field(
+        default=[Layer.ATO, Layer.SEM, Layer.CLU, Layer.MEMA],
+        description="Layers to detect",
+    )
+    threshold: float = Field(default=0.5, ge=0.0, le=1.0)
+    timeline: bool = Field(False, description="Include CLU/MEMA on/off intervals across the conversation")
+
+
+class SessionAppendRequest(BaseModel):
+    messages: list[Message] = Field(..., min_length=1, max_length=2000, description="New messages, in order")
 
 
 class MarkerQuery(BaseModel):
@@ -87,6 +152,16 @@ class AnalyzeMeta(BaseModel):
     markers_detected: int
     layers_scanned: list[str]
     shadow_mode: bool = False
+    queue_ms: float | None = None   # waiting for an engine worker
+    run_ms: float | None = None     # engine call on the worker
+
+
+class BatchItemResult(BaseModel):
+    """One NDJSON line of /v1/analyze/batch: an AnalyzeResponse or an error."""
+    id: str | int
+    markers: list[DetectedMarker] | None = None
+    meta: AnalyzeMeta | None = None
+    error: str | None = None
 
 
 class ConversationMarker(BaseModel):
@@ -99,6 +174,7 @@ class ConversationMarker(BaseModel):
     multiplier: float | None = None
     matches: list[PatternMatch] = []
     frame: dict[str, Any] | None = None
+    first_satisfied: int | None = None  # CLU: message index at which it first held
 
 
 class TemporalPattern(BaseModel):
@@ -110,6 +186,14 @@ class TemporalPattern(BaseModel):
     trend: str = "stable"
 
 
+class ActivationInterval(BaseModel):
+    marker_id: str
+    layer: Layer
+    start: int                 # first message at which the marker was on
+    end: int                   # last message at which it was still on (inclusive)
+    peak_confidence: float
+
+
 class TopologyHealth(BaseModel):
     score: float
     grade: str
@@ -134,10 +218,16 @@ class TopologyReport(BaseModel):
 class ConversationResponse(BaseModel):
     markers: list[ConversationMarker]
     temporal_patterns: list[TemporalPattern] = []
+    timeline: list[ActivationInterval] = []
     topology: TopologyReport | None = None
     meta: AnalyzeMeta
 
 
+class SessionCreateResponse(BaseModel):
+    session_id: str
+    created_at: str
+
+
 class VADPoint(BaseModel):
     valence: float
     arousal: float
@@ -201,11 +291,37 @@ class DynamicsResponse(BaseModel):
     state_indices: StateIndices
     speaker_baselines: SpeakerBaselines | None = None
     temporal_patterns: list[TemporalPattern] = []
+    timeline: list[ActivationInterval] = []
     topology: TopologyReport | None = None
     persona_session: "PersonaSessionSummary | None" = None
     meta: AnalyzeMeta
 
 
+# --- Streaming (WebSocket /v1/stream/conversation, NDJSON /v1/analyze/dynamics/stream) ---
+
+class StreamMessageUpdate(BaseModel):
+    type: str = "message"
+    index: int
+    role: str
+    markers: list[ConversationMarker]           # ATO/SEM detections of this message
+    vad: VADPoint | None = None                 # None if the analysis skipped the VAD stage
+    emotion: EmotionScore | None = None
+    speaker_delta: SpeakerDelta | None = None
+    processing_ms: float
+
+
+class StreamConversationUpdate(BaseModel):
+    type: str = "conversation"
+    messages: int                               # conversation length at this update
+    markers: list[ConversationMarker]           # CLU/MEMA detections
+    topology: TopologyReport | None = None
+    processing_ms: float
+
+
+class StreamDynamicsResult(DynamicsResponse):
+    type: str = "dynamics"                      # last frame: the full /v1/analyze/dynamics response
+
+
 # --- Semiotic Interpretation Models ---
 
 class SemioticEntry(BaseModel):
@@ -241,6 +357,29 @@ class InterpretResponse(BaseModel):
     meta: AnalyzeMeta
 
 
+class Interpretation(BaseModel):
+    framings: list[FramingHypothesis]
+    semiotic_map: dict[str, SemioticEntry]
+    dominant_framing: str | None = None
+    findings: InterpretFindings | None = None
+
+
+class FullAnalysisResponse(BaseModel):
+    sections: list[AnalysisSection]
+    markers: list[ConversationMarker] | None = None
+    temporal_patterns: list[TemporalPattern] | None = None
+    timeline: list[ActivationInterval] = []
+    message_vad: list[VADPoint] | None = None
+    message_emotions: list[EmotionScore | None] | None = None
+    state_indices: StateIndices | None = None
+    ued_metrics: UEDMetrics | None = None
+    speaker_baselines: SpeakerBaselines | None = None
+    topology: TopologyReport | None = None
+    interpretation: Interpretation | None = None
+    persona_session: "PersonaSessionSummary | None" = None
+    meta: AnalyzeMeta
+
+
 class MarkerDetail(BaseModel):
     id: str
     layer: Layer
@@ -281,6 +420,12 @@ class HealthResponse(BaseModel):
     version: str = "5.1-LD5"
     markers_loaded: int
     uptime_seconds: float
+    registry_source: str | None = None               # "snapshot" | "json"
+    snapshot_status: str | None = None               # why the snapshot was not used
+    startup_ms: dict[str, float] = Field(default_factory=dict)  # startup phase → ms
+    analysis_cache: dict[str, dict[str, int]] = Field(default_factory=dict)  # cache → counters
+    engine_pool: dict[str, Any] = Field(default_factory=dict)  # worker pool size, queue, counters
+    process: dict[str, Any] = Field(default_factory=dict)      # this worker: pid, memory (kB), GC pauses
 
 
 # --- Persona Models (Pro Tier) ---
@@ -0,0 +1,372 @@
+"""
+Literal prefilter for ATO regex scanning.
+
+Most ATO patterns contain mandatory literal words ("nicht", "immer",
+"du bist"). At load time every pattern is analysed for a set of literal
+fragments of which at least one must occur in any text the pattern can
+match. A single Aho-Corasick pass over the case-folded message then tells
+detect_ato which patterns can possibly match, so only those are executed.
+
+Patterns without an extractable literal return None and keep being
+scanned on every message.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import deque
+from pathlib import Path
+
+try:  # Python 3.11+
+    from re import _constants as _sre_c
+    from re import _parser as _sre_parse
+except ImportError:  # pragma: no cover — Python < 3.11
+    import sre_constants as _sre_c  # type: ignore[no-redef]
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+
+
+# Hash of this module's source. Registry snapshots store the literals
+# extracted here and are only used by code that extracts the same ones.
+CODE_VERSION = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+# ASCII fragments shorter than this filter almost nothing and are not worth
+# indexing. Single non-ASCII chars (emoji, "…") are selective enough.
+MIN_LITERAL_LENGTH = 2
+
+# Characters that re.IGNORECASE treats as equal but str.lower() does not
+# unify (dotless i, long s, Greek symbol variants, Cyrillic small variants).
+_CASE_FIXES = str.maketrans({
+    "ı": "i", "ſ": "s", "µ": "μ", "ς": "σ", "ϐ": "β", "ϵ": "ε", "ϑ": "θ",
+    "ϰ": "κ", "ϖ": "π", "ϱ": "ρ", "ϕ": "φ", "ͅ": "ι", "ι": "ι",
+    "ΐ": "ΐ", "ΰ": "ΰ", "ẛ": "ṡ", "ﬅ": "ﬆ",
+    "ᲀ": "в", "ᲁ": "д", "ᲂ": "о", "ᲃ": "с", "ᲄ": "т", "ᲅ": "т",
+    "ᲆ": "ъ", "ᲇ": "ѣ", "ᲈ": "ꙋ",
+})
+
+
+def fold_case(text: str) -> str:
+    """Case-fold text so that IGNORECASE-equal strings compare equal."""
+    if text.isascii():
+        return text.lower()
+    # "İ".lower() is two code points; re.IGNORECASE treats it as plain "i"
+    return text.replace("İ", "i").lower().translate(_CASE_FIXES)
+
+
+# ---------------------------------------------------------------------------
+# Literal extraction
+# ---------------------------------------------------------------------------
+
+_REPEATS = {
+    op for op in (
+        getattr(_sre_c, "MAX_REPEAT", None),
+        getattr(_sre_c, "MIN_REPEAT", None),
+        getattr(_sre_c, "POSSESSIVE_REPEAT", None),
+    ) if op is not None
+}
+_ATOMIC_GROUP = getattr(_sre_c, "ATOMIC_GROUP", None)
+
+
+def _better(a: frozenset[str] | None, b: frozenset[str] | None) -> frozenset[str] | None:
+    """Pick the more selective of two necessary-literal sets."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    key_a = (min(map(len, a)), -len(a))
+    key_b = (min(map(len, b)), -len(b))
+    return a if key_a >= key_b else b
+
+
+def _class_char(items) -> str | None:
+    """Return the single folded char a character class matches, if any ([Dd] → 'd')."""
+    chars = set()
+    for op, av in items:
+        if op != _sre_c.LITERAL:
+            return None
+        chars.add(fold_case(chr(av)))
+    if len(chars) == 1:
+        ch = chars.pop()
+        return ch if len(ch) == 1 else None
+    return None
+
+
+def _necessary(seq) -> frozenset[str] | None:
+    """Literals of which at least one occurs in every match of a parsed sequence."""
+    best: frozenset[str] | None = None
+    run: list[str] = []
+
+    def flush():
+        nonlocal best
+        if run:
+            best = _better(best, frozenset({"".join(run)}))
+            run.clear()
+
+    for op, av in seq:
+        if op == _sre_c.LITERAL:
+            run.append(fold_case(chr(av)))
+            continue
+        if op == _sre_c.AT:
+            continue  # Zero-width anchors (\b, ^) keep the run contiguous
+        if op == _sre_c.IN:
+            ch = _class_char(av)
+            if ch is not None:
+                run.append(ch)
+                continue
+        flush()
+
+        if op == _sre_c.SUBPATTERN:
+            best = _better(best, _necessary(av[-1]))
+        elif _ATOMIC_GROUP is not None and op == _ATOMIC_GROUP:
+            best = _better(best, _necessary(av))
+        elif op in _REPEATS:
+            min_count, _max_count, sub = av
+            if min_count >= 1:
+                best = _better(best, _necessary(sub))
+        elif op == _sre_c.BRANCH:
+            union: set[str] = set()
+            for branch in av[1]:
+                lits = _necessary(branch)
+                if lits is None:
+                    union = set()
+                    break
+                union |= lits
+            if union:
+                best = _better(best, frozenset(union))
+        elif op == _sre_c.ASSERT:
+            # Positive lookaround content must still occur in the text
+            best = _better(best, _necessary(av[1]))
+    flush()
+    return best
+
+
+def required_literals(raw: str, flags: int = re.IGNORECASE) -> frozenset[str] | None:
+    """Extract folded literal fragments of which any match must contain one.
+
+    Returns None when no selective fragment can be proven necessary (the
+    pattern must then always be scanned).
+    """
+    try:
+        parsed = _sre_parse.parse(raw, flags)
+        lits = _necessary(list(parsed))
+    except Exception:
+        return None
+    if not lits:
+        return None
+    if any(len(lit) < MIN_LITERAL_LENGTH and lit.isascii() for lit in lits):
+        return None
+    return lits
+
+
+# ---------------------------------------------------------------------------
+# Multi-string matcher
+# ---------------------------------------------------------------------------
+
+class LiteralMatcher:
+    """Aho-Corasick automaton reporting which literals occur in a text."""
+
+    def __init__(self, literals):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[frozenset[str]] = [frozenset()]
+
+        for lit in set(literals):
+            state = 0
+            for ch in lit:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(frozenset())
+                state = nxt
+            self._out[state] = self._out[state] | {lit}
+
+        # Breadth-first failure links; outputs inherit from their fallback state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = self._out[nxt] | self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def state(self) -> tuple:
+        """Plain-data automaton (goto, fail, out) for the registry snapshot."""
+        return self._goto, self._fail, self._out
+
+    @classmethod
+    def from_state(cls, state: tuple) -> LiteralMatcher:
+        """Rebuild a matcher from state() without re-running construction."""
+        matcher = cls.__new__(cls)
+        matcher._goto, matcher._fail, matcher._out = state
+        return matcher
+
+    def literals(self) -> frozenset[str]:
+        """All indexed literals."""
+        return frozenset().union(*self._out)
+
+    def find(self, folded_text: str) -> set[str]:
+        """Return all indexed literals occurring in an already case-folded text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: set[str] = set()
+        state = 0
+        for ch in folded_text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+
+# ---------------------------------------------------------------------------
+# Combined alternation shards
+# ---------------------------------------------------------------------------
+
+_LEADING_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+
+
+def _strip_global_flags(raw: str) -> str:
+    """Drop leading inline flags like "(?i)"; they are carried by the compile flags."""
+    pos = 0
+    while (m := _LEADING_FLAGS.match(raw, pos)) is not None:
+        pos = m.end()
+    return raw[pos:]
+
+
+def _has_groupref(seq) -> bool:
+    """True if a parsed sequence uses backreferences (break when renumbered)."""
+    for op, av in seq:
+        if op in (_sre_c.GROUPREF, _sre_c.GROUPREF_EXISTS):
+            return True
+        if op == _sre_c.SUBPATTERN:
+            children = [av[-1]]
+        elif op in _REPEATS:
+            children = [av[2]]
+        elif op == _sre_c.BRANCH:
+            children = av[1]
+        elif op in (_sre_c.ASSERT, _sre_c.ASSERT_NOT):
+            children = [av[1]]
+        elif _ATOMIC_GROUP is not None and op == _ATOMIC_GROUP:
+            children = [av]
+        else:
+            continue
+        if any(_has_groupref(child) for child in children):
+            return True
+    return False
+
+
+class _ShardNode:
+    """A set of patterns screened together by one alternation regex."""
+
+    __slots__ = ("members", "slots", "flags", "_regex", "_children")
+
+    def __init__(self, members: list[tuple[int, str, re.Pattern]], flags: int):
+        self.members = members  # (slot, alternation body, original compiled pattern)
+        self.slots = frozenset(slot for slot, _, _ in members)
+        self.flags = flags
+        self._regex: re.Pattern | None | bool = False  # False = not compiled yet
+        self._children: tuple[_ShardNode, _ShardNode] | None = None
+
+    def regex(self) -> re.Pattern | None:
+        """Combined regex, compiled on first use. None if it fails to compile."""
+        if self._regex is False:
+            try:
+                self._regex = re.compile(
+                    "|".join(f"(?P<_p{slot}>{body})" for slot, body, _ in self.members),
+                    self.flags,
+                )
+            except (re.error, RecursionError, OverflowError):
+                self._regex = None
+        return self._regex
+
+    def children(self) -> tuple[_ShardNode, _ShardNode]:
+        if self._children is None:
+            mid = len(self.members) // 2
+            self._children = (
+                _ShardNode(self.members[:mid], self.flags),
+                _ShardNode(self.members[mid:], self.flags),
+            )
+        return self._children
+
+
+class PatternShards:
+    """Answer "which patterns match anywhere in this text?" with few regex calls.
+
+    Patterns are grouped by compile flags and joined into alternation regexes
+    of `shard_size` members, each wrapped in a named group (_p<slot>) so a hit
+    is attributed back to its originating pattern. A shard that does not match
+    proves none of its members match. Hit shards are bisected (sub-shards are
+    compiled lazily and cached) down to the single patterns that match.
+
+    Patterns with backreferences or named groups cannot be renumbered into a
+    combined regex; they are searched individually.
+    """
+
+    def __init__(self, entries, shard_size: int = 64):
+        """entries: iterable of (slot, raw, compiled pattern)."""
+        self._solo: list[tuple[int, re.Pattern]] = []
+        self.roots: list[_ShardNode] = []
+        by_flags: dict[int, list[tuple[int, str, re.Pattern]]] = {}
+
+        for slot, raw, compiled in entries:
+            shardable = not compiled.groupindex
+            if shardable:
+                try:
+                    shardable = not _has_groupref(list(_sre_parse.parse(raw, compiled.flags)))
+                except Exception:
+                    shardable = False
+            if not shardable:
+                self._solo.append((slot, compiled))
+                continue
+            body = _strip_global_flags(raw)
+            if compiled.flags & re.VERBOSE:
+                body += "\n"  # A trailing comment must not swallow the closing paren
+            by_flags.setdefault(compiled.flags, []).append((slot, body, compiled))
+
+        size = max(1, shard_size)
+        for flags, members in by_flags.items():
+            for i in range(0, len(members), size):
+                self.roots.append(_ShardNode(members[i:i + size], flags))
+
+    def matching(self, text: str, candidates: set[int] | None = None) -> set[int]:
+        """Return the slots of all patterns with at least one match in text.
+
+        If candidates is given, only those slots are considered (shards without
+        any candidate are not searched at all).
+        """
+        hits: set[int] = set()
+        for slot, compiled in self._solo:
+            if (candidates is None or slot in candidates) and compiled.search(text):
+                hits.add(slot)
+
+        stack = list(self.roots)
+        while stack:
+            node = stack.pop()
+            if candidates is not None and node.slots.isdisjoint(candidates):
+                continue
+            if len(node.members) == 1:
+                slot, _, compiled = node.members[0]
+                if slot not in hits and compiled.search(text):
+                    hits.add(slot)
+                continue
+            regex = node.regex()
+            if regex is not None:
+                m = regex.search(text)
+                if m is None:
+                    continue
+                if m.lastgroup:
+                    slot = int(m.lastgroup[2:])  # Leftmost hit is known to match
+                    if candidates is None or slot in candidates:
+                        hits.add(slot)
+            stack.extend(node.children())
+        return hits
@@ -0,0 +1,116 @@
+"""
+Pre-fork server: load the marker registry once and share it between workers.
+
+    python -m api.prefork --workers 4 --host 0.0.0.0 --port 8420
+
+`uvicorn --workers N` starts every worker as a fresh interpreter that loads
+and compiles the whole registry itself. Here the master loads it, compiles
+every regex (MarkerEngine.warm) and moves all objects into the permanent
+GC generation (gc.freeze) before forking: collections in the workers never
+touch those objects, so their pages stay shared copy-on-write instead of
+being copied into every worker. The workers serve one listening socket.
+The master replaces workers that die and forwards SIGTERM / SIGINT.
+
+Per-worker memory and GC pauses are reported by /v1/health under `process`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import time
+
+import uvicorn
+
+from . import runtime
+from .config import settings
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, index: int, log_level: str) -> None:
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)  # uvicorn installs its own handlers
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    runtime.worker_id = index
+    runtime.gc_pauses.reset()
+    gc.enable()
+    uvicorn.Server(uvicorn.Config(app, log_level=log_level)).run(sockets=[sock])
+
+
+def serve(host: str, port: int, workers: int, log_level: str = "info") -> None:
+    # No collections while the registry is built: freed objects would leave
+    # holes in the shared pages that the workers' allocations then dirty
+    gc.disable()
+    from .engine import engine
+    from .main import app
+
+    engine.warm()
+    runtime.gc_pauses.install()
+    gc.freeze()
+
+    sock = _bind(host, port)
+    children: dict[int, int] = {}  # pid → worker index
+    started: dict[int, float] = {}
+    stopping = False
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(app, sock, index, log_level)
+            finally:
+                os._exit(0)
+        children[pid] = index
+        started[index] = time.monotonic()
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for index in range(workers):
+        spawn(index)
+
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        if time.monotonic() - started[index] < 1.0:
+            time.sleep(1.0)  # Crashing on startup: do not spin
+        spawn(index)
+    sock.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="LeanDeep API with a pre-forked, shared marker registry")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8420)
+    parser.add_argument("--workers", type=int, default=settings.workers)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    serve(args.host, args.port, max(1, args.workers), args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,10 +18,10 @@ from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import Path
 
+from .textprep import PreparedText
 
-# ─── Feature Extraction Patterns ─────────────────────────────────────────────
 
-_SENT_SPLIT = re.compile(r'(?<=[.!?])\s+|(?<=[.!?])$')
+# ─── Feature Extraction Patterns ─────────────────────────────────────────────
 
 # Pronouns (DE + EN)
 _ICH = re.compile(r'\b(ich|mir|mich|meiner?|I|me|my|mine|myself)\b', re.I)
@@ -61,7 +61,6 @@ _INTENSIFIERS = re.compile(
     r'very|really|extremely|absolutely|totally|completely|incredibly|so)\b', re.I
 )
 
-_WORDS = re.compile(r'\b\w+\b')
 _CAPS_WORD = re.compile(r'\b[A-ZÄÖÜ]{2,}\b')
 
 
@@ -81,27 +80,27 @@ EMOTIONS = ["ANGER", "DISGUST", "FEAR", "JOY", "LOVE", "SADNESS", "SURPRISE"]
 
 # ─── Feature Extraction ──────────────────────────────────────────────────────
 
-def _split_sentences(text: str) -> list[str]:
-    normalized = re.sub(r'([!?.]){2,}', r'\1', text)
-    sentences = _SENT_SPLIT.split(normalized)
-    return [s.strip() for s in sentences if s.strip() and len(s.strip()) > 1]
+def extract_prosody(text: str | PreparedText) -> dict[str, float] | None:
+    """Extract 17 prosody features from text. Returns None if text too short.
 
-
-def extract_prosody(text: str) -> dict[str, float] | None:
-    """Extract 17 prosody features from text. Returns None if text too short."""
+    Accepts the message's PreparedText to reuse its sentence split and tokens.
+    """
+    prepared = PreparedText.of(text)
+    text = prepared.raw
     if not text or len(text.strip()) < 10:
         return None
 
-    sentences = _split_sentences(text)
+    sentences = prepared.sentences
+    words_per_sent = prepared.sentence_word_counts
     if not sentences:
         sentences = [text]
+        words_per_sent = [len(prepared.words)]
 
     n_sents = len(sentences)
-    words = _WORDS.findall(text)
+    words = prepared.words
     n_words = max(len(words), 1)
     text_len = max(len(text), 1)
 
-    words_per_sent = [len(_WORDS.findall(s)) for s in sentences]
     avg_sent_len = sum(words_per_sent) / len(words_per_sent) if words_per_sent else 0
 
     # Punctuation
@@ -262,7 +261,7 @@ class ProsodyScorer:
                     vec[feat] = capped
             self._disc_vectors[emotion] = vec
 
-    def score(self, text: str) -> EmotionResult | None:
+    def score(self, text: str | PreparedText) -> EmotionResult | None:
         """Score a text against all emotion profiles.
 
         Rule-based scoring using empirically confirmed structural signals
@@ -418,9 +417,11 @@ class ProsodyScorer:
         return max(0.0, score)
 
     def score_conversation(
-        self, messages: list[dict],
+        self, messages: list[dict], prepared: list[PreparedText] | None = None,
     ) -> list[EmotionResult | None]:
-        """Score each message in a conversation."""
+        """Score each message in a conversation (reusing PreparedTexts if given)."""
+        if prepared is not None:
+            return [self.score(p) for p in prepared]
         return [self.score(msg.get("text", "")) for msg in messages]
 
 
@@ -0,0 +1,91 @@
+"""
+Per-process statistics for /v1/health: memory and garbage-collection pauses.
+
+With several worker processes (api/prefork.py) every /v1/health response
+describes the worker that served it; `worker` tells them apart.
+"""
+
+from __future__ import annotations
+
+import gc
+import os
+import resource
+import time
+from typing import Any
+
+worker_id: int | None = None  # Set by api/prefork.py in each forked worker
+
+
+class GCPauseStats:
+    """Times every garbage collection of this process via gc.callbacks."""
+
+    def __init__(self):
+        self._installed = False
+        self._started: float | None = None
+        self.reset()
+
+    def reset(self) -> None:
+        self.collections = [0, 0, 0]  # per generation
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def install(self) -> None:
+        if not self._installed:
+            gc.callbacks.append(self._callback)
+            self._installed = True
+
+    def _callback(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            ms = (time.perf_counter() - self._started) * 1000
+            self._started = None
+            self.collections[info["generation"]] += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "collections": list(self.collections),
+            "pause_total_ms": round(self.total_ms, 2),
+            "pause_max_ms": round(self.max_ms, 2),
+            "frozen_objects": gc.get_freeze_count(),
+        }
+
+
+gc_pauses = GCPauseStats()
+
+
+def memory_stats() -> dict[str, int]:
+    """Memory of this process in kB.
+
+    On Linux: rss, pss (shared pages split between the processes sharing
+    them), shared and private. Pages a forked worker still shares with the
+    master count as shared. Elsewhere only the peak RSS is known.
+    """
+    try:
+        with open("/proc/self/smaps_rollup", encoding="ascii") as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        fields = {}
+    if "Rss" not in fields:
+        return {"max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+    return {
+        "rss": fields["Rss"],
+        "pss": fields.get("Pss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def process_stats() -> dict[str, Any]:
+    return {
+        "pid": os.getpid(),
+        "worker": worker_id,
+        "memory_kb": memory_stats(),
+        "gc": gc_pauses.stats(),
+    }
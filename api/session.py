@@ -0,0 +1,648 @@
+"""
+Incremental conversation analysis.
+
+A ConversationSession holds everything analyze_conversation builds while
+walking the messages — shadow buffer, decayed system state, per-message
+ATO/SEM results, activation matrix, speaker baselines, UED and state index
+sums, the temporal marker timeline, CTG topology checks, deduplication span
+winners and CLU ref resolutions — so append() only runs detection on the
+new message and the conversation-level result is read off that state.
+The result after each append equals analyze_conversation over all
+messages so far (analyze_conversation itself is a one-shot session) on
+the regulator as it was when the session opened. The session's CLU
+tracking moves that regulator once, when the session is closed.
+
+A session can be limited to some of its OUTPUTS; pipeline_stages() works
+out which stages those depend on and the rest are skipped.
+
+SessionStore keeps live sessions for the /v1/sessions endpoints.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Callable
+
+from .activation import ActivationMatrix
+from .config import settings
+from .dynamics import SpeakerBaselineTracker, StateIndexAccumulator, UEDAccumulator, compute_state_indices
+from .engine import CluContext
+from .textprep import PreparedText
+from .topology import TopologyTracker, compute_topology_report, shadow_log
+
+if TYPE_CHECKING:
+    from .engine import AnalysisContext, Detection, Match, MarkerEngine
+
+
+# Conversation-level outputs of ConversationSession.result()
+OUTPUTS = (
+    "detections", "temporal_patterns", "message_vad", "message_emotions",
+    "ued_metrics", "state_indices", "speaker_baselines", "topology",
+)
+
+# Stages each output depends on (detections and topology add the requested layers)
+_OUTPUT_STAGES = {
+    "detections": set(),
+    "temporal_patterns": {"ATO", "SEM"},
+    "message_vad": {"ATO", "SEM", "VAD"},
+    "message_emotions": {"PROSODY"},
+    "ued_metrics": {"ATO", "SEM", "VAD"},
+    "state_indices": {"ATO", "SEM"},
+    "speaker_baselines": {"ATO", "SEM", "VAD"},
+    "topology": {"TOPOLOGY"},
+}
+
+
+def pipeline_stages(
+    layers: list[str], outputs: set[str] | None = None, timeline: bool = False,
+) -> frozenset[str]:
+    """Stages needed for the requested outputs (all OUTPUTS when None).
+
+    Stages are the marker layers (ATO, SEM, CLU, MEMA) plus VAD (per-message
+    VAD, UED, speaker baselines), PROSODY and TOPOLOGY (with the shadow log).
+    """
+    outputs = set(OUTPUTS if outputs is None else outputs)
+    unknown = outputs - set(OUTPUTS)
+    if unknown:
+        raise ValueError(f"Unknown outputs: {sorted(unknown)}")
+    stages: set[str] = set()
+    for output in outputs:
+        stages |= _OUTPUT_STAGES[output]
+    if outputs & {"detections", "topology"}:
+        stages.update(layers)
+    if timeline:
+        stages.update(l for l in layers if l in ("CLU", "MEMA"))
+    # CLU/MEMA are built from SEMs, SEMs from ATOs
+    if "CLU" in stages or "MEMA" in stages:
+        stages.add("SEM")
+    if "SEM" in stages:
+        stages.add("ATO")
+    return frozenset(stages)
+
+
+def _shallow_copy(d: Detection) -> Detection:
+    """copy.copy for a Detection, without the copy-protocol overhead."""
+    c = object.__new__(type(d))
+    c.__dict__.update(d.__dict__)
+    return c
+
+
+class _SpanWinners:
+    """engine._deduplicate_detections kept up to date as detections arrive.
+
+    Holds the winning match of every text span and the first detection of
+    every marker, for ATO detections (which come first in the deduplicated
+    list) and SEM detections. deduplicated() then only regroups the winners.
+    """
+
+    def __init__(self, engine: MarkerEngine):
+        self.engine = engine
+        self.winners: dict[tuple[int, int], tuple[tuple, str, Match]] = {}  # span → (rank, marker id, match)
+        # Spans in the order deduplication meets them: first those of ATO detections
+        self._ato_spans: dict[tuple[int, int], None] = {}
+        self._sem_spans: dict[tuple[int, int], None] = {}  # Spans no ATO detection covers
+        self._first_ato: dict[str, Detection] = {}
+        self._first_sem: dict[str, Detection] = {}
+        self._ato_without_matches: list[Detection] = []
+        self._sem_without_matches: list[Detection] = []
+
+    def push_ato(self, detections: list[Detection]) -> None:
+        self._push(detections, self._first_ato, self._ato_without_matches, ato=True)
+
+    def push_sem(self, detections: list[Detection]) -> None:
+        self._push(detections, self._first_sem, self._sem_without_matches, ato=False)
+
+    def _push(
+        self, detections: list[Detection], first: dict[str, Detection], without_matches: list[Detection], ato: bool,
+    ) -> None:
+        winners = self.winners
+        for det in detections:
+            first.setdefault(det.marker_id, det)
+            if not det.matches:
+                without_matches.append(det)
+                continue
+            # Ranks of ATO and SEM detections never tie, so the earliest of a tie is the one kept
+            rank = self.engine._span_rank(det)
+            for match in det.matches:
+                span = (match.start, match.end)
+                current = winners.get(span)
+                if current is None or rank > current[0]:
+                    winners[span] = (rank, det.marker_id, match)
+                if ato:
+                    if span not in self._ato_spans:
+                        self._sem_spans.pop(span, None)
+                        self._ato_spans[span] = None
+                elif span not in self._ato_spans and span not in self._sem_spans:
+                    self._sem_spans[span] = None
+
+    def deduplicated(self, others: list[Detection]) -> list[Detection]:
+        """engine._deduplicate_detections of the pushed detections followed by `others`.
+
+        `others` must not carry matches (CLU/MEMA detections). Detections
+        whose matches are rewritten are copies; the session keeps its own.
+        """
+        if not self.winners:
+            return [*self._ato_without_matches, *self._sem_without_matches, *others]
+
+        winning: dict[str, list[Match]] = {}
+        for span in (*self._ato_spans, *self._sem_spans):
+            _, marker_id, match = self.winners[span]
+            winning.setdefault(marker_id, []).append(match)
+
+        # First detection of each marker, with only the matches that won their spans
+        first = {**self._first_ato, **self._first_sem}
+        for det in others:
+            first.setdefault(det.marker_id, det)
+        kept: dict[str, Detection] = {}
+        for marker_id, det in first.items():
+            if marker_id in winning:
+                kept[marker_id] = copy = _shallow_copy(det)
+                copy.matches = winning[marker_id]
+
+        final = [
+            kept[det.marker_id] if det.marker_id in kept and first[det.marker_id] is det else det
+            for det in (*self._ato_without_matches, *self._sem_without_matches, *others)
+        ]
+        final.extend(kept.values())
+        final.sort(key=self.engine._deduplicated_order, reverse=True)
+        return final
+
+
+class ConversationSession:
+    """A conversation analysed message by message on one MarkerEngine."""
+
+    def __init__(
+        self,
+        engine: MarkerEngine,
+        layers: list[str] | None = None,
+        threshold: float = 0.5,
+        warm_start: dict[str, dict[str, float]] | None = None,
+        deduplicate: bool = True,
+        timeline: bool = False,
+        outputs: set[str] | None = None,
+        lang: str | None = None,
+        evidence: str = "all",
+        context: AnalysisContext | None = None,
+    ):
+        engine.ensure_loaded()
+
+        self.engine = engine
+        self.layers = layers or ["ATO", "SEM", "CLU", "MEMA"]
+        self.threshold = threshold
+        self.deduplicate = deduplicate
+        self.timeline = timeline
+        self.lang = lang  # Message language for every message; None guesses it per message
+        self.evidence = evidence  # Match evidence kept: "all" | "first" | "none" (see detect_ato)
+        self.lock = threading.Lock()  # Held by API workers while they add messages
+        self.context = context  # Regulator merged into by close(); None = the engine's shared one
+        # Every CLU evaluation starts from the regulator as it was when the
+        # session opened, as a one-shot analysis of the same messages would
+        self._regulator = (context if context is not None else engine.regulator).fork()
+        self._tracked: AnalysisContext | None = None  # Fork of the latest evaluation, merged by close()
+        self.outputs = frozenset(OUTPUTS if outputs is None else outputs)
+        self.stages = pipeline_stages(self.layers, self.outputs, timeline)
+
+        self.messages: list[dict] = []
+        # One PreparedText per message, shared by detection, prosody and topology
+        self.prepared: list[PreparedText] = []
+        self.ato_dets: list[list[Detection]] = []
+        self.sem_dets: list[list[Detection]] = []
+        self.flat_ato: list[Detection] = []
+        self.flat_sem: list[Detection] = []
+        self.message_vad: list[dict] = []
+        self.message_emotions: list = []
+
+        # Carried from message to message (VAD gate, Quantum Collapse)
+        self.shadow_buffer: list[Detection] = []
+        self.current_state = {"trust": 0.0, "conflict": 0.0, "deesc": 0.0}
+
+        # Running conversation-level state
+        self.matrix = ActivationMatrix(0)
+        self._clu = CluContext(engine, self.matrix)
+        self._ato_for_output: list[Detection] = []
+        self._active_sems: set[str] = set()
+        self._active_atos: set[str] = set()
+        self._strong_sems = 0  # SEM detections with confidence > 0.6 (MEMA absence gating)
+        # Marker id → distinct message indices (ATOs, then SEMs), and its number of detections
+        self._ato_timeline: dict[str, list[int]] = {}
+        self._sem_timeline: dict[str, list[int]] = {}
+        self._fired: dict[str, int] = {}
+        self._state = StateIndexAccumulator(engine.markers)
+        self._ued = UEDAccumulator()
+        self._speakers = SpeakerBaselineTracker(warm_start)
+        self._topology = TopologyTracker() if "TOPOLOGY" in self.stages else None
+        self._dedup = _SpanWinners(engine) if deduplicate and "detections" in self.outputs else None
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def append(self, message: dict) -> dict:
+        """Analyze one new message; returns the result for the whole conversation."""
+        start = time.perf_counter()
+        self.add(message)
+        return self.result(start)
+
+    def extend(
+        self, messages: list[dict], prepared: list[PreparedText] | None = None,
+        on_message: Callable[[dict], None] | None = None,
+    ) -> dict:
+        """Analyze several new messages; returns the result for the whole conversation.
+
+        `prepared` may carry the messages' PreparedTexts (engine.prepare_conversation).
+        on_message, if given, gets each new message's message_update() as
+        soon as it is analysed, before the conversation-level layers run.
+        """
+        start = time.perf_counter()
+        for i, message in enumerate(messages):
+            msg_idx = self.add(message, prepared[i] if prepared is not None else None)
+            if on_message is not None:
+                on_message(self.message_update(msg_idx))
+        return self.result(start)
+
+    def add(self, message: dict, prepared: PreparedText | None = None) -> int:
+        """Per-message ATO + SEM detection with VAD congruence gate; returns the message index.
+
+        Conversation-level layers are left to result() / overview().
+        """
+        engine = self.engine
+        threshold = self.threshold
+        msg_idx = len(self.messages)
+        if prepared is None:
+            prepared = PreparedText(message.get("text", ""))
+        self.messages.append(message)
+        self.prepared.append(prepared)
+
+        stages = self.stages
+
+        # Phase 0: Pre-strip technical noise to check if anything linguistic remains (LD 5.1)
+        clean_text = prepared.text.strip()
+        if "ATO" not in stages or not clean_text or len(clean_text) < 2:
+            # Still add empty lists to maintain indices
+            effective_atos: list[Detection] = []
+            sem_dets: list[Detection] = []
+        else:
+            # Phase 1: Detect all ATOs (superposition)
+            raw_atos = engine.detect_ato(prepared, threshold, lang=self.lang, evidence=self.evidence)
+            for d in raw_atos:
+                d.message_indices = [msg_idx]
+
+            # Phase 2: Compute raw message VAD (emotional field)
+            raw_vad = engine._compute_raw_vad(raw_atos)
+
+            # Phase 3: Apply VAD congruence gate (quantum collapse)
+            gated_atos, suppressed, surfaced = engine._apply_vad_gate(
+                raw_atos, raw_vad, self.shadow_buffer
+            )
+
+            # Update message indices for surfaced shadow ATOs
+            for d in surfaced:
+                d.message_indices = [msg_idx]
+
+            # Phase 4: Update shadow buffer for next message
+            self.shadow_buffer = suppressed
+
+            # Use gated ATOs + surfaced for this message
+            effective_atos = gated_atos + surfaced
+
+            sem_dets = []
+            if "SEM" in stages:
+                # Phase 5: SEM detection uses gated+surfaced ATOs (meaningful ones only)
+                # AND the current system state (Quantum Collapse)
+                sem_dets = engine.detect_sem(
+                    prepared, effective_atos, threshold, system_state=self.current_state, lang=self.lang,
+                    evidence=self.evidence,
+                )
+                for d in sem_dets:
+                    d.message_indices = [msg_idx]
+
+                # Phase 6: Update system state for next message
+                # Only use high-confidence markers to update state during loop
+                loop_state = compute_state_indices(effective_atos + sem_dets, engine.markers)
+                # Accumulate with slight decay
+                for k in ["trust", "conflict", "deesc"]:
+                    self.current_state[k] = (self.current_state[k] * 0.7) + (loop_state.get(k, 0) * 0.3)
+
+        self.ato_dets.append(effective_atos)
+        self.sem_dets.append(sem_dets)
+        self.flat_ato.extend(effective_atos)
+        self.flat_sem.extend(sem_dets)
+        self.matrix.add_message(sem_dets, effective_atos)
+
+        ato_output = []
+        for d in effective_atos:
+            self._active_atos.add(d.marker_id)
+            self._track(self._ato_timeline, d.marker_id, msg_idx)
+            # Filter context_only markers from user-facing output
+            mdef = engine.markers.get(d.marker_id)
+            if not (mdef and "context_only" in mdef.tags):
+                ato_output.append(d)
+        self._ato_for_output.extend(ato_output)
+        for d in sem_dets:
+            self._active_sems.add(d.marker_id)
+            self._track(self._sem_timeline, d.marker_id, msg_idx)
+            if d.confidence > 0.6:
+                self._strong_sems += 1
+        self._state.push(effective_atos)
+        self._state.push(sem_dets)
+
+        # Running topology checks and deduplication, over the ATO/SEM detections in the result
+        listed_atos = ato_output if "ATO" in self.layers else []
+        listed_sems = sem_dets if "SEM" in self.layers else []
+        if self._topology is not None:
+            self._topology.add(message, {d.marker_id for d in (*listed_atos, *listed_sems)}, prepared.lower)
+        if self._dedup is not None:
+            self._dedup.push_ato(listed_atos)
+            self._dedup.push_sem(listed_sems)
+
+        # ── Prosody-based emotion detection per message ──
+        if "PROSODY" in stages:
+            self.message_emotions.append(self.engine.score_prosody(prepared))
+
+        if "VAD" in stages:
+            self._push_vad(message.get("role", "?"), effective_atos + sem_dets)
+        return msg_idx
+
+    def _track(self, timeline: dict[str, list[int]], marker_id: str, msg_idx: int) -> None:
+        """Count a detection of marker_id in message msg_idx into a marker timeline."""
+        self._fired[marker_id] = self._fired.get(marker_id, 0) + 1
+        indices = timeline.setdefault(marker_id, [])
+        if not indices or indices[-1] != msg_idx:
+            indices.append(msg_idx)
+
+    def _push_vad(self, role: str, detections: list[Detection]) -> None:
+        """Message VAD from its effective detections, fed to UED and the speaker baselines."""
+        # ── VAD aggregation per message ──
+        vads = [d.vad for d in detections if d.vad]
+        if vads:
+            avg_v = sum(v["valence"] for v in vads) / len(vads)
+            avg_a = sum(v["arousal"] for v in vads) / len(vads)
+            avg_d = sum(v["dominance"] for v in vads) / len(vads)
+            vad = {
+                "valence": round(avg_v, 3),
+                "arousal": round(avg_a, 3),
+                "dominance": round(avg_d, 3),
+            }
+        else:
+            vad = {"valence": 0.0, "arousal": 0.0, "dominance": 0.0}
+        self.message_vad.append(vad)
+        self._ued.push(vad)
+
+        # ── Per-speaker baseline (Polygraph principle) ──
+        self._speakers.push(role, vad)
+
+    def message_update(self, msg_idx: int) -> dict:
+        """What one message contributed: its ATO/SEM detections, VAD, emotion and speaker delta.
+
+        Parts whose stage the session skips (see pipeline_stages) are None.
+        """
+        detections: list[Detection] = []
+        if "ATO" in self.layers:
+            markers = self.engine.markers
+            detections.extend(
+                d for d in self.ato_dets[msg_idx]
+                if not (markers.get(d.marker_id) and "context_only" in markers[d.marker_id].tags)
+            )
+        if "SEM" in self.layers:
+            detections.extend(self.sem_dets[msg_idx])
+        return {
+            "index": msg_idx,
+            "role": self.messages[msg_idx].get("role", "?"),
+            "detections": detections,
+            "vad": self.message_vad[msg_idx] if "VAD" in self.stages else None,
+            "emotion": self.message_emotions[msg_idx] if "PROSODY" in self.stages else None,
+            "speaker_delta": self._speakers.per_message_delta[msg_idx] if "VAD" in self.stages else None,
+        }
+
+    def _temporal_patterns(self) -> list[dict]:
+        """engine._temporal_patterns of the marker timeline, ATOs before SEMs (as in the detection lists)."""
+        n_messages = len(self.messages)
+        patterns = [
+            self.engine._recurring_pattern(marker_id, indices, n_messages)
+            for timeline in (self._ato_timeline, self._sem_timeline)
+            for marker_id, indices in timeline.items()
+            if self._fired[marker_id] >= 2
+        ]
+        return sorted(patterns, key=lambda p: -p["frequency"])
+
+    def _conversation_layers(self) -> list[Detection]:
+        """CLU and MEMA detections over all messages so far (as requested in layers)."""
+        layers = self.layers
+        detections: list[Detection] = []
+
+        # Level 3: CLU (over conversation window)
+        clu_dets = []
+        if "CLU" in layers or "MEMA" in layers:
+            clu_dets = self.engine.detect_clu(self.sem_dets, self.threshold, ctx=self._clu)
+            if "CLU" in layers:
+                detections.extend(clu_dets)
+
+        # Level 4: MEMA (now receives ATOs too for richer inference)
+        if "MEMA" in layers:
+            detections.extend(self.engine._detect_mema_active(
+                clu_dets, self._active_sems, self._active_atos, self._strong_sems, self.threshold,
+            ))
+        return detections
+
+    @contextmanager
+    def _regulated(self):
+        """Run the block on a fresh fork of the session's regulator; keep it for close()."""
+        with self.engine.analysis_context(self._regulator, merge=False) as ctx:
+            yield
+        self._tracked = ctx
+
+    def close(self) -> None:
+        """Merge the regulator tracking of the latest result into the base regulator.
+
+        A session is one analysis: its CLU evaluations after each message all
+        start from the same regulator state, and only the latest one counts.
+        analyze_conversation closes its session right away, SessionStore
+        when it drops one.
+        """
+        tracked, self._tracked = self._tracked, None
+        if tracked is not None:
+            self.engine.merge_context(tracked, self.context)
+
+    def _listed_detections(self) -> list[Detection]:
+        """User-facing ATO and SEM detections so far (as requested in layers)."""
+        detections: list[Detection] = []
+        if "ATO" in self.layers:
+            detections.extend(self._ato_for_output)
+        if "SEM" in self.layers:
+            detections.extend(self.flat_sem)
+        return detections
+
+    def _topology_report(self, detections: list[Detection]) -> dict:
+        """CTG topology report with these CLU/MEMA detections on top of the ATO/SEM ones."""
+        if self._topology is not None:
+            return self._topology.report(detections)
+        return compute_topology_report(
+            self.messages, self._listed_detections() + detections, prepared=self.prepared,
+        )
+
+    def overview(self) -> dict:
+        """CLU/MEMA detections and topology so far, without the rest of result()."""
+        with self._regulated():
+            detections = self._conversation_layers()
+        return {"detections": detections, "topology": self._topology_report(detections)}
+
+    def result(self, start: float | None = None) -> dict:
+        """Conversation-level result over all messages so far (analyze_conversation format).
+
+        Outputs the session was not asked for are left out, except
+        detections, which is then empty.
+        """
+        if start is None:
+            start = time.perf_counter()
+        engine = self.engine
+        layers = self.layers
+        threshold = self.threshold
+        outputs = self.outputs
+
+        all_detections: list[Detection] = []
+        conversation_detections: list[Detection] = []
+        if "detections" in outputs or "topology" in outputs:
+            all_detections = self._listed_detections()
+
+        with self._regulated():
+            # CLU/MEMA on/off intervals (before detect_clu moves the regulator)
+            activation_intervals = []
+            if self.timeline and ("CLU" in layers or "MEMA" in layers):
+                activation_intervals = engine.activation_timeline(
+                    self.sem_dets, self.ato_dets, threshold, layers, matrix=self.matrix,
+                )
+
+            if "detections" in outputs or "topology" in outputs:
+                conversation_detections = self._conversation_layers()
+                all_detections.extend(conversation_detections)
+
+        result = {"detections": all_detections}
+
+        # State indices from effect_on_state
+        if "state_indices" in outputs:
+            result["state_indices"] = self._state.indices()
+
+        # Temporal patterns
+        if "temporal_patterns" in outputs:
+            result["temporal_patterns"] = self._temporal_patterns()
+
+        if "topology" in outputs:
+            # --- Topology Analysis (LD 6.0 CTG) ---
+            topology = self._topology_report(conversation_detections)
+            result["topology"] = topology
+
+            # --- Shadow Logging (Calibration) ---
+            shadow_log({
+                "n_messages": len(self.messages),
+                "timing_ms": round((time.perf_counter() - start) * 1000, 2),
+                "topology": {
+                    "health_score": topology["health"]["score"],
+                    "grade": topology["health"]["grade"],
+                    "instability": topology["gates"]["instability"],
+                    "summary": topology["summary"],
+                    "failing_constraints": [c["id"] for c in topology["constraints"] if c["status"] == "fail"],
+                    "warn_constraints": [c["id"] for c in topology["constraints"] if c["status"] == "warn"],
+                },
+                "engine": {"mode": "standard-recall", "marker_threshold": threshold},
+            })
+
+        if "detections" not in outputs:
+            result["detections"] = []
+        elif self.deduplicate:
+            # --- Deduplication (LD 5.1) ---
+            if not any(d.matches for d in conversation_detections):
+                result["detections"] = self._dedup.deduplicated(conversation_detections)
+            else:
+                # On copies: dedup rewrites Detection.matches and the session keeps its own
+                result["detections"] = engine._deduplicate_detections([_shallow_copy(d) for d in all_detections])
+
+        if self.timeline:
+            result["timeline"] = activation_intervals
+        if "message_vad" in outputs:
+            result["message_vad"] = list(self.message_vad)
+        if "message_emotions" in outputs:
+            result["message_emotions"] = list(self.message_emotions)
+        if "ued_metrics" in outputs:
+            result["ued_metrics"] = self._ued.metrics()
+        if "speaker_baselines" in outputs:
+            result["speaker_baselines"] = self._speakers.summary()
+
+        elapsed = (time.perf_counter() - start) * 1000
+        result["timing_ms"] = round(elapsed, 2)
+        result["shadow_mode"] = True
+        return result
+
+
+class SessionStore:
+    """Live ConversationSessions by id, least recently used evicted first.
+
+    Bounded by idle TTL, number of sessions and total messages held.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int | None = None,
+        ttl_seconds: float | None = None,
+        max_messages: int | None = None,
+    ):
+        self.max_sessions = max_sessions or settings.session_max
+        self.ttl_seconds = ttl_seconds or settings.session_ttl_seconds
+        self.max_messages = max_messages or settings.session_max_messages
+        self._sessions: OrderedDict[str, tuple[ConversationSession, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            session_id, (session, last_used) = next(iter(self._sessions.items()))
+            if last_used >= cutoff:
+                break
+            del self._sessions[session_id]
+            session.close()
+
+    def _evict(self) -> None:
+        """Drop least recently used sessions beyond the caps (never the most recent one)."""
+        total = sum(len(session) for session, _ in self._sessions.values())
+        while len(self._sessions) > 1 and (len(self._sessions) > self.max_sessions or total > self.max_messages):
+            _, (session, _) = self._sessions.popitem(last=False)
+            total -= len(session)
+            session.close()
+
+    def create(self, session: ConversationSession) -> tuple[str, str]:
+        """Store a session; returns (session_id, created_at)."""
+        self._expire()
+        session_id = uuid.uuid4().hex
+        self._sessions[session_id] = (session, time.monotonic())
+        self._evict()
+        created_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return session_id, created_at
+
+    def get(self, session_id: str) -> ConversationSession | None:
+        self._expire()
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        self._sessions[session_id] = (entry[0], time.monotonic())
+        self._sessions.move_to_end(session_id)
+        return entry[0]
+
+    def touch(self, session_id: str) -> None:
+        """Mark a session used after it grew, and re-apply the caps."""
+        entry = self._sessions.get(session_id)
+        if entry is not None:
+            self._sessions[session_id] = (entry[0], time.monotonic())
+            self._sessions.move_to_end(session_id)
+        self._evict()
+
+    def delete(self, session_id: str) -> bool:
+        entry = self._sessions.pop(session_id, None)
+        if entry is None:
+            return False
+        entry[0].close()
+        return True
@@ -0,0 +1,93 @@
+"""
+Content-addressed LRU cache for per-message analysis.
+
+Chat traffic repeats the same short messages ("ok", "ja", "gute Nacht")
+over and over. Everything the engine derives from a message's text alone —
+the raw ATO scan, SEM own-pattern hits, prosody scores — is cached here,
+keyed by content; steps that depend on a message's position in a
+conversation (VAD gate, quantum collapse, thresholds) still run every time.
+
+Cached values are shared between callers and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TextCache:
+    """Bounded LRU of values computed from a message text.
+
+    Texts longer than `max_text_length` bypass the cache (they rarely
+    repeat and would crowd out the short ones that do); `max_entries <= 0`
+    disables it entirely. Values grow with their text, so `max_chars`
+    also bounds the summed text length of the cached entries (None or
+    0: only the number of entries is bounded).
+    """
+
+    def __init__(self, max_entries: int, max_text_length: int | None = None, max_chars: int | None = None):
+        self.max_entries = max_entries
+        self.max_text_length = max_text_length
+        self.max_chars = max_chars
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()  # key → (value, size)
+        self._lock = threading.Lock()
+        self.chars = 0  # Summed size of the cached entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(
+        self, key: Hashable, compute: Callable[[], Any], text: str = "", size: int | None = None,
+    ) -> Any:
+        """Cached value for `key` (derived from `text`), computing it on a miss.
+
+        `size` counts against max_chars; len(text) by default.
+        """
+        if self.max_entries <= 0 or (self.max_text_length is not None and len(text) > self.max_text_length):
+            return compute()
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        value = compute()
+        size = len(text) if size is None else size
+        if self.max_chars and size > self.max_chars:
+            return value
+        with self._lock:
+            previous = self._entries.pop(key, None)  # Computed meanwhile by another thread
+            if previous is not None:
+                self.chars -= previous[1]
+            self._entries[key] = (value, size)
+            self.chars += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or (self.max_chars and self.chars > self.max_chars)
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.chars -= evicted
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries (e.g. after a registry reload); counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.chars = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "chars": self.chars,
+            "max_chars": self.max_chars or 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
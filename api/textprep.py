@@ -0,0 +1,189 @@
+"""
+Per-message text preparation shared by all pipeline stages.
+
+A PreparedText is built once per message and handed to ATO/SEM detection,
+prosody scoring and the topology report, so the noise stripping, sentence
+split, tokenisation and case folding happen once instead of once per stage.
+All views are computed lazily on first access.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from functools import cached_property
+
+from .prefilter import fold_case
+
+
+# ─── Technical noise (URLs, emails, phone numbers, chat metadata) ────────────
+
+URL_RE = re.compile(
+    r'https?://[^\s<>\"\')]+|www\.[^\s<>\"\')]+', re.IGNORECASE
+)
+EMAIL_RE = re.compile(
+    r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', re.IGNORECASE
+)
+# Aggressive Phone Regex: +49..., 0170..., with spaces/dashes
+PHONE_RE = re.compile(
+    r'(?:phone|Phone|Tel|Tel\.)\s*[:\s]*\+?[\d\s\-\(\)]{7,25}|\+[\d\s\-\(\)]{7,25}',
+    re.IGNORECASE
+)
+# WhatsApp / Chat metadata: [Date, Time] Name:, <Anhang: ...>, etc.
+META_RE = re.compile(
+    r'\[\d{2}\.\d{2}\.\d{2}, \d{2}:\d{2}(?::\d{2})?\]|<\w+: [^>]+>|\d{2}\.\d{2}\.\d{2}, \d{2}:\d{2} - ',
+    re.IGNORECASE
+)
+_NOISE_PASSES = (URL_RE, EMAIL_RE, PHONE_RE, META_RE)
+
+# All four passes fused into one scan. Most chat messages contain no noise at
+# all; for them this single search replaces four substitutions.
+_NOISE_ANY_RE = re.compile("|".join(f"(?:{r.pattern})" for r in _NOISE_PASSES), re.IGNORECASE)
+
+
+def _blank(m: re.Match) -> str:
+    return " " * (m.end() - m.start())
+
+
+def strip_technical_noise(text: str) -> str:
+    """Replace URLs, emails, phone numbers and chat metadata with whitespace.
+
+    Offsets are preserved (every replaced char becomes a space). The passes
+    run in a fixed order because blanking one kind of noise can change what
+    a later pass matches; they only run if the fused scan finds anything.
+    """
+    if _NOISE_ANY_RE.search(text) is None:
+        return text
+    for pattern in _NOISE_PASSES:
+        text = pattern.sub(_blank, text)
+    return text
+
+
+# ─── Sentences and tokens (shared with prosody feature extraction) ───────────
+
+SENT_SPLIT_RE = re.compile(r'(?<=[.!?])\s+|(?<=[.!?])$')
+WORDS_RE = re.compile(r'\b\w+\b')
+_PUNCT_RUN_RE = re.compile(r'([!?.]){2,}')
+
+
+def split_sentences(text: str) -> list[str]:
+    normalized = _PUNCT_RUN_RE.sub(r'\1', text)
+    sentences = SENT_SPLIT_RE.split(normalized)
+    return [s.strip() for s in sentences if s.strip() and len(s.strip()) > 1]
+
+
+# ─── Language guess (function words) ─────────────────────────────────────────
+
+# Frequent function words of one language that are not words of the other
+# ("in", "so", "was", "die", "will", "also", "am", "an" are left out on purpose)
+DE_FUNCTION_WORDS = frozenset({
+    "ich", "du", "sie", "wir", "ihr", "mich", "dich", "mir", "dir", "uns", "euch",
+    "der", "das", "den", "dem", "des", "ein", "eine", "einen", "einem", "einer",
+    "und", "oder", "aber", "nicht", "kein", "keine", "ist", "bin", "bist", "sind",
+    "hast", "habe", "haben", "wird", "werden", "kann", "kannst", "mit", "von", "zu",
+    "auf", "für", "auch", "noch", "schon", "nur", "immer", "nie", "wie",
+    "dass", "wenn", "weil", "mein", "dein", "sein", "mal", "doch", "ja", "nein",
+})
+EN_FUNCTION_WORDS = frozenset({
+    "i", "you", "he", "she", "we", "they", "me", "him", "us", "them", "my", "your",
+    "the", "a", "and", "or", "but", "not", "no", "is", "are", "were",
+    "have", "has", "do", "does", "can", "with", "of", "to", "for", "on",
+    "at", "this", "that", "it", "what", "just", "always",
+    "never", "if", "because", "be", "been", "yes",
+})
+
+
+def guess_language(words: list[str]) -> str | None:
+    """"de" or "en" from function-word counts; None when there is too little to tell.
+
+    A language needs at least two function words and twice as many as the
+    other one, so short or mixed messages stay undecided.
+    """
+    de = en = 0
+    for word in words:
+        word = word.lower()
+        if word in DE_FUNCTION_WORDS:
+            de += 1
+        elif word in EN_FUNCTION_WORDS:
+            en += 1
+    if de >= 2 and de >= 2 * en:
+        return "de"
+    if en >= 2 and en >= 2 * de:
+        return "en"
+    return None
+
+
+class PreparedText:
+    """Views of one message, computed once and shared across pipeline stages.
+
+    raw        — original message text
+    text       — technical noise blanked out (same length/offsets as raw)
+    folded     — case-folded `text` for the ATO literal prefilter
+    lower      — lowercased raw text (topology ledger)
+    sentences  — sentence split of raw text (prosody)
+    word_spans — (start, end) of every word token in raw text
+    language   — guessed language from function words (guess_language)
+    derived    — results later stages computed from this text, by cache key
+    """
+
+    def __init__(self, raw: str):
+        self.raw = raw
+        self.derived: dict = {}
+
+    @classmethod
+    def of(cls, text: str | PreparedText) -> PreparedText:
+        """Wrap a plain string; pass an existing PreparedText through."""
+        return text if isinstance(text, PreparedText) else cls(text)
+
+    @cached_property
+    def text(self) -> str:
+        return strip_technical_noise(self.raw)
+
+    @cached_property
+    def folded(self) -> str:
+        return fold_case(self.text)
+
+    @cached_property
+    def lower(self) -> str:
+        return self.raw.lower()
+
+    @cached_property
+    def sentences(self) -> list[str]:
+        return split_sentences(self.raw)
+
+    @cached_property
+    def sentence_word_counts(self) -> list[int]:
+        return [len(WORDS_RE.findall(s)) for s in self.sentences]
+
+    @cached_property
+    def word_spans(self) -> list[tuple[int, int]]:
+        return [m.span() for m in WORDS_RE.finditer(self.raw)]
+
+    @cached_property
+    def words(self) -> list[str]:
+        raw = self.raw
+        return [raw[s:e] for s, e in self.word_spans]
+
+    @cached_property
+    def language(self) -> str | None:
+        """Guessed message language ("de" / "en"), None if undecided."""
+        return guess_language(WORDS_RE.findall(self.raw))
+
+    @cached_property
+    def question_marks(self) -> list[int]:
+        """Positions of '?' in the noise-stripped text."""
+        return [i for i, ch in enumerate(self.text) if ch == "?"] if "?" in self.text else []
+
+    @cached_property
+    def _periods(self) -> list[int]:
+        return [i for i, ch in enumerate(self.text) if ch == "."]
+
+    def in_question(self, pos: int) -> bool:
+        """True if the sentence around pos ends in '?' before the next '.'."""
+        qm = self.question_marks
+        q = bisect_left(qm, pos)
+        if q == len(qm):
+            return False
+        periods = self._periods
+        p = bisect_left(periods, pos)
+        return p == len(periods) or qm[q] < periods[p]
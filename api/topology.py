@@ -133,7 +133,7 @@ def _build_marker_index(messages: list[dict], detections: Iterable[Any]) -> list
 
 def _has(msg_markers: list[set[str]], i: int, marker_set: set[str]) -> bool:
     if i < 0 or i >= len(msg_markers): return False
-    return any(mid in msg_markers[i] for mid in marker_set)
+    return not msg_markers[i].isdisjoint(marker_set)
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -159,159 +159,286 @@ def compute_topology_report(
     detections: list[Any],
     *,
     cfg: dict[str, Any] | None = None,
+    prepared: list[Any] | None = None,
 ) -> dict[str, Any]:
-    cfg = {**DEFAULT_CONFIG, **(cfg or {})}
+    """Run all CTG constraint checks. `prepared` optionally carries the engine's
+    per-message PreparedText so lowercased text is not recomputed."""
     msg_markers = _build_marker_index(messages, detections)
-    M = len(messages)
-    results: list[ConstraintResult] = []
-
-    # Attribution guard indices
-    quoted_msgs = {i for i in range(M) if _has(msg_markers, i, M_QUOTES)}
-
-    # 1. CTG_QA_01: Adjacency (Question/Demand/Repair -> Response)
-    open_pairs = []
-    unresolved = 0
-    N = int(cfg["adjacency_window"])
-    
-    for i in range(M):
-        if _is_skip_message(messages, i): continue
-        if i in quoted_msgs: continue
-        
+    tracker = TopologyTracker(cfg)
+    for i, message in enumerate(messages):
+        tracker.add(message, msg_markers[i], prepared[i].lower if prepared is not None else None)
+    return tracker.report()
+
+
+# Hooks read by the adjacency, threat, commitment and attribution checks
+_SEQUENCE_HOOKS = (
+    M_QUESTION | M_DEMAND | M_APOLOGY | M_ACK | M_AVOID | M_REFUSAL | M_COMMIT | M_THREAT | M_QUOTES
+    | {"ATO_NEGATION"}
+)
+_HOOKS = _SEQUENCE_HOOKS | M_CIRCULAR | M_CONTRADICTION | M_ABSOLUTIZER | M_GAS
+
+
+class TopologyTracker:
+    """CTG constraint state of a conversation that grows message by message.
+
+    add() takes each message with the markers attributed to it when it
+    arrives (ATO/SEM), so a check only looks at the new message and at the
+    triggers still waiting for a partner turn. report() takes the markers
+    recomputed over the whole conversation each time (CLU/MEMA) on top;
+    if those touch a hook of the sequential checks, the report is rebuilt
+    from scratch. compute_topology_report is a tracker fed all messages.
+    """
+
+    def __init__(self, cfg: dict[str, Any] | None = None):
+        self.cfg = {**DEFAULT_CONFIG, **(cfg or {})}
+        self.window = int(self.cfg["adjacency_window"])
+        self.messages: list[dict] = []
+        self.lower: list[str] = []
+        self.markers: list[set[str]] = []   # Hook markers per message
+        self.quoted: list[int] = []         # Attribution guard indices, ascending
+        self._quoted: set[int] = set()
+        # 1. Adjacency: trigger pairs; pending ones still look for a partner turn
+        self.pairs: list[dict] = []
+        self._pending_pairs: list[int] = []  # Indices into pairs
+        self.unresolved = 0
+        self.unanswered = 0                  # Pairs without a partner turn (resolved None)
+        # 2. Threats: unhandled so far, and (idx, speaker) still looking for a partner turn
+        self.threat_unhandled = 0
+        self._pending_threats: list[tuple[int, str]] = []
+        # 3. Circular reasoning
+        self.circular: list[int] = []
+        # 4. Commitment ledger, and what a contradiction in each message would break
+        self.ledger: dict[str, list[dict]] = {}
+        self.broken: list[str | None] = []   # "hard" | "soft" | None per message
+        self.contradicted: set[int] = set()  # Messages with a (non-quoted) contradiction
+        self.broken_hard = 0
+        self.broken_soft = 0
+        # 5./6. Turn counts, absolutizers, gaslighting gate
+        self.role_counts: dict[str, int] = {}
+        self.absolutized: set[int] = set()
+        self.gaslighting = False
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def add(self, message: dict, markers: Iterable[str], lower: str | None = None) -> None:
+        """Add the next message with the marker ids attributed to it.
+
+        `lower` is the message's lowercased text, if the caller has it.
+        """
+        messages = self.messages
+        i = len(messages)
+        messages.append(message)
+        hooks = _HOOKS.intersection(markers)
+        self.markers.append(hooks)
         text = _safe_text(messages, i)
-        trigger_type = None
-        if _has(msg_markers, i, M_QUESTION) or "?" in text: trigger_type = "question"
-        elif _has(msg_markers, i, M_DEMAND): trigger_type = "demand"
-        elif _has(msg_markers, i, M_APOLOGY): trigger_type = "repair"
-        
-        if not trigger_type: continue
-        
-        asker = _role(messages, i)
-        partner_turns = [j for j in range(i + 1, min(M, i + 1 + N))
-                         if _role(messages, j) != asker and not _is_skip_message(messages, j)]
-        
-        if not partner_turns:
-            open_pairs.append({"idx": i, "type": trigger_type, "by": asker, "resolved": None})
-            continue
-            
-        j0 = partner_turns[0]
-        resp_text = _safe_text(messages, j0)
-        
-        resolved = False
+        lower = lower if lower is not None else text.lower()
+        self.lower.append(lower)
+        role = _role(messages, i)
+        skip = _is_skip_message(messages, i)
+        cfg = self.cfg
+        N = self.window
+
+        quoted = not hooks.isdisjoint(M_QUOTES)
+        if quoted:
+            self.quoted.append(i)
+            self._quoted.add(i)
+
+        # 1. The new message answers pending triggers (first partner turn in their window)
+        if self._pending_pairs:
+            pending = []
+            for p in self._pending_pairs:
+                pair = self.pairs[p]
+                if role == pair["by"] or skip:
+                    if i < pair["idx"] + N:
+                        pending.append(p)  # Else the window passed without a partner turn
+                    continue
+                resolved = self._resolves(pair["type"], hooks, text)
+                self.pairs[p] = {**pair, "resolved": resolved, "response_idx": i}
+                self.unanswered -= 1
+                if not resolved:
+                    self.unresolved += 1
+            self._pending_pairs = pending
+
+        # 2. ... and pending threats (first partner turn, skip messages included)
+        if self._pending_threats:
+            pending_threats = []
+            for t, speaker in self._pending_threats:
+                if role == speaker:
+                    if i < t + N:
+                        pending_threats.append((t, speaker))
+                    else:
+                        self.threat_unhandled += 1
+                    continue
+                if hooks.isdisjoint(M_ACK | {"ATO_NEGATION"} | M_APOLOGY | M_AVOID):
+                    self.threat_unhandled += 1
+            self._pending_threats = pending_threats
+
+        # The new message as a trigger
+        if not skip and not quoted:
+            trigger_type = None
+            if not hooks.isdisjoint(M_QUESTION) or "?" in text: trigger_type = "question"
+            elif not hooks.isdisjoint(M_DEMAND): trigger_type = "demand"
+            elif not hooks.isdisjoint(M_APOLOGY): trigger_type = "repair"
+            if trigger_type:
+                self.pairs.append({"idx": i, "type": trigger_type, "by": role, "resolved": None})
+                self.unanswered += 1
+                if N > 0:
+                    self._pending_pairs.append(len(self.pairs) - 1)
+        if not hooks.isdisjoint(M_THREAT) and not quoted:
+            if N > 0:
+                self._pending_threats.append((i, role))
+            else:
+                self.threat_unhandled += 1
+
+        if not hooks.isdisjoint(M_CIRCULAR):
+            self.circular.append(i)
+
+        # 4. Ledger & contradiction
+        if not hooks.isdisjoint(M_COMMIT) and not quoted:
+            words = {w for w in lower.split() if len(w) > 3}
+            self.ledger.setdefault(role, []).append({"idx": i, "words": words})
+        broken = None
+        for entry in self.ledger.get(role, []):
+            if entry["words"] and any(w in lower for w in entry["words"]):
+                broken = "hard"
+                break
+            elif entry["idx"] < i:
+                broken = "soft"
+                break
+        self.broken.append(broken)
+        if not hooks.isdisjoint(M_CONTRADICTION) and not quoted:
+            self.contradicted.add(i)
+            if broken == "hard":
+                self.broken_hard += 1
+            elif broken == "soft":
+                self.broken_soft += 1
+
+        self.role_counts[role] = self.role_counts.get(role, 0) + 1
+        if not hooks.isdisjoint(M_ABSOLUTIZER):
+            self.absolutized.add(i)
+        if not hooks.isdisjoint(M_GAS):
+            self.gaslighting = True
+
+    def _resolves(self, trigger_type: str, hooks: set[str], resp_text: str) -> bool:
+        """Whether a partner turn with these hook markers resolves the trigger."""
         if trigger_type == "question":
-            resolved = _has(msg_markers, j0, M_ACK | M_AVOID | M_REFUSAL) or (len(resp_text) >= cfg["min_answer_chars"])
+            expected = M_ACK | M_AVOID | M_REFUSAL
         elif trigger_type == "demand":
-            resolved = _has(msg_markers, j0, M_ACK | M_AVOID | M_REFUSAL | {"ATO_NEGATION"}) or (len(resp_text) >= cfg["min_answer_chars"])
-        elif trigger_type == "repair":
-            resolved = _has(msg_markers, j0, M_ACK | M_COMMIT | M_APOLOGY) or (len(resp_text) >= cfg["min_answer_chars"])
-            
-        open_pairs.append({"idx": i, "type": trigger_type, "by": asker, "resolved": resolved, "response_idx": j0})
-        if not resolved: unresolved += 1
-
-    qa_status = "fail" if unresolved >= 1 else "warn" if any(p["resolved"] is None for p in open_pairs) else "pass"
-    results.append(ConstraintResult("CTG_QA_01", "HARD", qa_status, cfg[f"score_{qa_status}"], 
-                                   [p["idx"] for p in open_pairs], 
-                                   {"open_pairs": open_pairs}))
-
-    # 2. CTG_THREAT_01: Threat -> Response
-    threat_unhandled = 0
-    for i in range(M):
-        if _has(msg_markers, i, M_THREAT) and i not in quoted_msgs:
-            spk = _role(messages, i)
-            pt = [j for j in range(i + 1, min(M, i + 1 + N)) if _role(messages, j) != spk]
-            if not pt or not _has(msg_markers, pt[0], M_ACK | {"ATO_NEGATION"} | M_APOLOGY | M_AVOID):
-                threat_unhandled += 1
-    t_status = "fail" if threat_unhandled > 0 else "pass"
-    results.append(ConstraintResult("CTG_THREAT_01", "HARD", t_status, cfg[f"score_{t_status}"], []))
-
-    # 3. CTG_CIRC_01: Circular Reasoning
-    circ_idxs = [i for i in range(M) if _has(msg_markers, i, M_CIRCULAR)]
-    c_status = "fail" if circ_idxs else "pass"
-    results.append(ConstraintResult("CTG_CIRC_01", "HARD", c_status, cfg[f"score_{c_status}"], circ_idxs))
-
-    # 4. CTG_COMMIT_02: Ledger & Contradiction
-    broken_hard = 0
-    broken_soft = 0
-    ledger = {} 
-    for i in range(M):
-        role = _role(messages, i)
-        text = _safe_text(messages, i).lower()
-        if _has(msg_markers, i, M_COMMIT) and i not in quoted_msgs:
-            text_hash = text.strip()[:30]
-            words = {w for w in text.split() if len(w) > 3}
-            # Circular check
-            if any(entry["hash"] == text_hash for entry in ledger.get(role, [])):
-                if "CTG_CIRC_01" not in [r.id for r in results]:
-                    results.append(ConstraintResult("CTG_CIRC_01", "HARD", "warn", 0.6, [i], {}, "Circular commitment detected."))
-            ledger.setdefault(role, []).append({"idx": i, "hash": text_hash, "words": words})
-        
-        if _has(msg_markers, i, M_CONTRADICTION) and i not in quoted_msgs:
-            for entry in ledger.get(role, []):
-                if entry["words"] and any(w in text for w in entry["words"]):
-                    broken_hard += 1
+            expected = M_ACK | M_AVOID | M_REFUSAL | {"ATO_NEGATION"}
+        else:
+            expected = M_ACK | M_COMMIT | M_APOLOGY
+        return not hooks.isdisjoint(expected) or (len(resp_text) >= self.cfg["min_answer_chars"])
+
+    def report(self, detections: Iterable[Any] = ()) -> dict[str, Any]:
+        """The CTG report so far, with `detections` attributed on top of the added markers."""
+        M = len(self.messages)
+        extra: dict[int, set[str]] = {}
+        for d in detections:
+            mid = getattr(d, "marker_id", getattr(d, "id", None))
+            if not mid or mid not in _HOOKS: continue
+            for idx in getattr(d, "message_indices", []) or []:
+                if 0 <= idx < M: extra.setdefault(idx, set()).add(mid)
+        if any(not ids.isdisjoint(_SEQUENCE_HOOKS) for ids in extra.values()):
+            return self._rebuilt(extra).report()
+
+        cfg = self.cfg
+        results: list[ConstraintResult] = []
+
+        # 1. CTG_QA_01: Adjacency (Question/Demand/Repair -> Response)
+        unresolved = self.unresolved
+        qa_status = "fail" if unresolved >= 1 else "warn" if self.unanswered else "pass"
+        results.append(ConstraintResult("CTG_QA_01", "HARD", qa_status, cfg[f"score_{qa_status}"],
+                                       [p["idx"] for p in self.pairs],
+                                       {"open_pairs": [dict(p) for p in self.pairs]}))
+
+        # 2. CTG_THREAT_01: Threat -> Response (pending threats have no partner turn yet)
+        threat_unhandled = self.threat_unhandled + len(self._pending_threats)
+        t_status = "fail" if threat_unhandled > 0 else "pass"
+        results.append(ConstraintResult("CTG_THREAT_01", "HARD", t_status, cfg[f"score_{t_status}"], []))
+
+        # 3. CTG_CIRC_01: Circular Reasoning
+        circ_idxs = self.circular
+        extra_circ = [i for i, ids in extra.items() if not ids.isdisjoint(M_CIRCULAR)]
+        if extra_circ:
+            circ_idxs = sorted(set(circ_idxs).union(extra_circ))
+        c_status = "fail" if circ_idxs else "pass"
+        results.append(ConstraintResult("CTG_CIRC_01", "HARD", c_status, cfg[f"score_{c_status}"], list(circ_idxs)))
+
+        # 4. CTG_COMMIT_02: Ledger & Contradiction
+        broken_hard, broken_soft = self.broken_hard, self.broken_soft
+        for i, ids in extra.items():
+            if i in self.contradicted or i in self._quoted or ids.isdisjoint(M_CONTRADICTION):
+                continue
+            if self.broken[i] == "hard":
+                broken_hard += 1
+            elif self.broken[i] == "soft":
+                broken_soft += 1
+        if broken_hard > 0:
+            results.append(ConstraintResult("CTG_COMMIT_02", "HARD", "fail", 0.0, [], {"broken_count": broken_hard}))
+        elif broken_soft > 0:
+            results.append(ConstraintResult("CTG_COMMIT_02", "SOFT", "warn", 0.6, [], {"broken_count": broken_soft}))
+        else:
+            results.append(ConstraintResult("CTG_COMMIT_02", "HARD", "pass", 1.0, []))
+
+        # 5. CTG_TURN_01: Turn-taking Asymmetry
+        a_status = "pass"
+        if M >= cfg["asymmetry_min_turns"]:
+            for r, count in self.role_counts.items():
+                if count / M > cfg["asymmetry_ratio"]:
+                    a_status = "warn"
                     break
-                elif entry["idx"] < i:
-                    broken_soft += 1
-                    break
-                
-    if broken_hard > 0:
-        results.append(ConstraintResult("CTG_COMMIT_02", "HARD", "fail", 0.0, [], {"broken_count": broken_hard}))
-    elif broken_soft > 0:
-        results.append(ConstraintResult("CTG_COMMIT_02", "SOFT", "warn", 0.6, [], {"broken_count": broken_soft}))
-    else:
-        results.append(ConstraintResult("CTG_COMMIT_02", "HARD", "pass", 1.0, []))
-
-    # 5. CTG_TURN_01: Turn-taking Asymmetry
-    a_status = "pass"
-    if M >= cfg["asymmetry_min_turns"]:
-        counts = {}
-        for i in range(M):
-            r = _role(messages, i)
-            counts[r] = counts.get(r, 0) + 1
-        for r, count in counts.items():
-            if count / M > cfg["asymmetry_ratio"]:
-                a_status = "warn"
-                break
-    results.append(ConstraintResult("CTG_TURN_01", "SOFT", a_status, cfg[f"score_{a_status}"], []))
-
-    # 6. CTG_EPIST_01: Absolutizers
-    abs_count = sum(1 for i in range(M) if _has(msg_markers, i, M_ABSOLUTIZER))
-    e_status = "fail" if abs_count >= 4 else "warn" if abs_count >= 2 else "pass"
-    results.append(ConstraintResult("CTG_EPIST_01", "SOFT", e_status, cfg[f"score_{e_status}"], []))
-
-    # 7. CTG_ATTR_01: Attribution Guard
-    results.append(ConstraintResult("CTG_ATTR_01", "HARD", "warn" if quoted_msgs else "pass", 
-                                   1.0, list(quoted_msgs), {"quoted_count": len(quoted_msgs)}, 
-                                   "Attribution guard applied to quoted segments."))
-
-    # Aggregate Health
-    total_w = sum(cfg["weight_hard"] if r.severity=="HARD" else cfg["weight_soft"] for r in results)
-    total_s = sum((cfg["weight_hard"] if r.severity=="HARD" else cfg["weight_soft"]) * r.score for r in results)
-    health = total_s / total_w if total_w > 0 else 1.0
-    grade = "green" if health >= cfg["grade_green"] else "yellow" if health >= cfg["grade_yellow"] else "red"
-
-    # Instability gate
-    instability = (grade == "red" or unresolved >= 3 or any(r.status == "fail" for r in results if r.severity == "HARD"))
-
-    return {
-        "version": "ctg-0.1",
-        "mode": "shadow",
-        "health": {"score": round(health, 3), "grade": grade},
-        "constraints": [r.__dict__ for r in results],
-        "summary": {
-            "unresolved_questions": unresolved,
-            "commitments_broken": broken_hard + broken_soft,
-            "absolutizer_count": abs_count,
-            "total_messages": M,
-            "quoted_messages": len(quoted_msgs)
-        },
-        "gates": {
-            "instability": instability,
-            "gaslighting_present": any(_has(msg_markers, i, M_GAS) for i in range(M)),
-            "attribution_guard_applied": bool(quoted_msgs)
-        },
-        "config_snapshot": {
-            "N": N,
-            "asymmetry_ratio": cfg["asymmetry_ratio"],
-            "grade_green": cfg["grade_green"]
+        results.append(ConstraintResult("CTG_TURN_01", "SOFT", a_status, cfg[f"score_{a_status}"], []))
+
+        # 6. CTG_EPIST_01: Absolutizers
+        abs_count = len(self.absolutized) + sum(
+            1 for i, ids in extra.items() if i not in self.absolutized and not ids.isdisjoint(M_ABSOLUTIZER)
+        )
+        e_status = "fail" if abs_count >= 4 else "warn" if abs_count >= 2 else "pass"
+        results.append(ConstraintResult("CTG_EPIST_01", "SOFT", e_status, cfg[f"score_{e_status}"], []))
+
+        # 7. CTG_ATTR_01: Attribution Guard
+        quoted_msgs = {i for i in self.quoted}  # Same set (and iteration order) as built message by message
+        results.append(ConstraintResult("CTG_ATTR_01", "HARD", "warn" if quoted_msgs else "pass",
+                                       1.0, list(quoted_msgs), {"quoted_count": len(quoted_msgs)},
+                                       "Attribution guard applied to quoted segments."))
+
+        # Aggregate Health
+        total_w = sum(cfg["weight_hard"] if r.severity=="HARD" else cfg["weight_soft"] for r in results)
+        total_s = sum((cfg["weight_hard"] if r.severity=="HARD" else cfg["weight_soft"]) * r.score for r in results)
+        health = total_s / total_w if total_w > 0 else 1.0
+        grade = "green" if health >= cfg["grade_green"] else "yellow" if health >= cfg["grade_yellow"] else "red"
+
+        # Instability gate
+        instability = (grade == "red" or unresolved >= 3 or any(r.status == "fail" for r in results if r.severity == "HARD"))
+
+        return {
+            "version": "ctg-0.1",
+            "mode": "shadow",
+            "health": {"score": round(health, 3), "grade": grade},
+            "constraints": [r.__dict__ for r in results],
+            "summary": {
+                "unresolved_questions": unresolved,
+                "commitments_broken": broken_hard + broken_soft,
+                "absolutizer_count": abs_count,
+                "total_messages": M,
+                "quoted_messages": len(quoted_msgs)
+            },
+            "gates": {
+                "instability": instability,
+                "gaslighting_present": self.gaslighting or any(not ids.isdisjoint(M_GAS) for ids in extra.values()),
+                "attribution_guard_applied": bool(quoted_msgs)
+            },
+            "config_snapshot": {
+                "N": self.window,
+                "asymmetry_ratio": cfg["asymmetry_ratio"],
+                "grade_green": cfg["grade_green"]
+            }
         }
-    }
+
+    def _rebuilt(self, extra: dict[int, set[str]]) -> TopologyTracker:
+        """A tracker fed the same messages with `extra` markers added to them."""
+        tracker = TopologyTracker(self.cfg)
+        for i, message in enumerate(self.messages):
+            tracker.add(message, self.markers[i] | extra.get(i, set()), self.lower[i])
+        return tracker
@@ -0,0 +1,135 @@
+"""
+Bounded worker pool for engine calls.
+
+The analysis endpoints are async, but the engine is synchronous and
+CPU-bound. Run on the event loop, one 2000-message conversation stalls
+every other request on that worker — /v1/health, the fly.io liveness
+check, included. EnginePool runs engine calls on a thread or process pool
+instead, rejects work beyond a bounded queue, and reports how long each
+call waited for a worker and how long it ran.
+
+With kind="process" only stateless engine calls (call_engine) are shipped
+to the worker processes, which inherit or load the registry themselves;
+work on in-memory state (sessions, streams) and plain I/O helpers always
+run on the thread pool (local=True).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+class PoolBusy(RuntimeError):
+    """The pool's queue is full; the caller should retry later."""
+
+
+@dataclass
+class PoolTiming:
+    queue_ms: float  # waiting for a free worker
+    run_ms: float    # running on the worker
+
+
+def call_engine(method: str, *args, **kwargs) -> Any:
+    """engine.<method>(*args, **kwargs) on the worker's engine (picklable for process pools)."""
+    from .engine import engine
+
+    return getattr(engine, method)(*args, **kwargs)
+
+
+def _load_engine() -> None:
+    """Process pool initializer: forked workers inherit a loaded engine, spawned ones load it."""
+    from .engine import engine
+
+    engine.ensure_loaded()
+
+
+def _timed(fn: Callable, args: tuple, kwargs: dict) -> tuple[float, float, Any]:
+    """(wall-clock start, run ms, result) of fn — wall clock so it compares across processes."""
+    started = time.time()
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return started, (time.perf_counter() - t0) * 1000, result
+
+
+class EnginePool:
+    """Runs blocking calls off the event loop on at most `workers` workers.
+
+    At most `queue_depth` calls wait for a worker; beyond that run() raises
+    PoolBusy. workers <= 0 runs every call inline on the event loop.
+    """
+
+    def __init__(self, workers: int, queue_depth: int, kind: str = "thread"):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown pool kind: {kind} (thread or process)")
+        self.kind = kind
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._threads: ThreadPoolExecutor | None = None
+        self._processes: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.pending = 0    # queued + running
+        self.completed = 0
+        self.rejected = 0
+
+    def _executor(self, local: bool) -> Executor:
+        with self._lock:
+            if self.kind == "process" and not local:
+                if self._processes is None:
+                    self._processes = ProcessPoolExecutor(self.workers, initializer=_load_engine)
+                return self._processes
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(self.workers, thread_name_prefix="engine")
+            return self._threads
+
+    async def run(self, fn: Callable, *args, local: bool = False, **kwargs) -> tuple[Any, PoolTiming]:
+        """(fn(*args, **kwargs), timing) from a worker; local=True keeps fn in this process."""
+        if self.workers <= 0:
+            started, run_ms, result = _timed(fn, args, kwargs)
+            return result, PoolTiming(0.0, round(run_ms, 2))
+
+        with self._lock:
+            if self.pending >= self.workers + self.queue_depth:
+                self.rejected += 1
+                raise PoolBusy(f"Engine busy: {self.pending} calls in flight, try again later")
+            self.pending += 1
+        try:
+            submitted = time.time()
+            future = self._executor(local).submit(_timed, fn, args, kwargs)
+        except BaseException:
+            self._done(None)
+            raise
+        # Counted off when the call ends, not the await: a cancelled caller leaves it running
+        future.add_done_callback(self._done)
+        started, run_ms, result = await asyncio.wrap_future(future)
+        queue_ms = max(0.0, (started - submitted) * 1000)
+        return result, PoolTiming(round(queue_ms, 2), round(run_ms, 2))
+
+    def _done(self, future: Future | None) -> None:
+        """A submitted call ended (None: it could not be submitted)."""
+        with self._lock:
+            self.pending -= 1
+            if future is not None and not future.cancelled() and future.exception() is None:
+                self.completed += 1
+
+    def shutdown(self) -> None:
+        """Stop the executors (running calls finish first); they restart on the next run()."""
+        with self._lock:
+            executors, self._threads, self._processes = (self._threads, self._processes), None, None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
@@ -1,10 +1,16 @@
 """Pytest configuration — ensure test environment settings."""
 
 import os
+import sys
+import dataclasses
 from dataclasses import dataclass
 import pytest
 import httpx
 
+sys.path.insert(0, ".")
+
+from api.engine import AnalysisContext, MarkerEngine
+
 # Disable auth for tests (production default is auth=enabled)
 os.environ.setdefault("LEANDEEP_REQUIRE_AUTH", "false")
 
@@ -44,3 +50,32 @@ def ensure_api_reachable(api_cfg: ApiConfig):
                 pytest.skip(f"LeanDeep API health endpoint error: {r.status_code}")
     except httpx.RequestError:
         pytest.skip(f"LeanDeep API not reachable at {health_url}")
+
+@pytest.fixture(scope="module")
+def engine() -> MarkerEngine:
+    """A loaded engine; pass context=AnalysisContext() to keep CLU thresholds fixed between calls."""
+    e = MarkerEngine()
+    e.load()
+    return e
+
+@pytest.fixture
+def fresh_regulator(monkeypatch):
+    """Give the API's engine a fresh shared regulator; call the fixture value again before each
+    request whose CLU results are compared, so earlier requests do not move their thresholds."""
+    import api.main as main
+
+    def reset() -> None:
+        monkeypatch.setattr(main.engine, "regulator", AnalysisContext())
+
+    reset()
+    return reset
+
+def plain(o):
+    """Analysis result as plain dicts / lists, without timings (for comparing results)."""
+    if dataclasses.is_dataclass(o):
+        return plain(dataclasses.asdict(o))
+    if isinstance(o, dict):
+        return {k: plain(v) for k, v in o.items() if k != "timing_ms"}
+    if isinstance(o, (list, tuple)):
+        return [plain(x) for x in o]
+    return o
@@ -0,0 +1,92 @@
+"""Tests for the message × marker activation matrix and CLU first-satisfied index."""
+import sys
+sys.path.insert(0, ".")
+
+from types import SimpleNamespace
+
+from api.activation import ActivationMatrix
+from api.engine import AnalysisContext
+
+
+MESSAGES = [
+    "Hallo, wie war dein Tag?",
+    "Du hörst mir nie zu! Immer geht es nur um dich.",
+    "Das stimmt doch gar nicht, du übertreibst mal wieder.",
+    "Ich fühle mich so allein, niemand versteht mich.",
+    "Es tut mir leid, ich wollte dich nicht verletzen.",
+    "Du bist ein Monster! Ich hasse dich!",
+    "Das hast du dir nur eingebildet, so war das nie.",
+    "Lass uns bitte in Ruhe darüber reden.",
+    "Ich verstehe, dass dich das verletzt hat.",
+    "Immer machst du das! Nie hörst du zu!!!",
+    "Ich kann nicht mehr, ich ziehe mich zurück.",
+    "ok",
+]
+
+
+def _det(mid):
+    return SimpleNamespace(marker_id=mid)
+
+
+def test_matrix_window_counts():
+    sems = [[_det("SEM_A")], [], [_det("SEM_A"), _det("SEM_B")], [], [_det("SEM_A")]]
+    atos = [[_det("ATO_X"), _det("ATO_X")], [], [], [], []]
+    matrix = ActivationMatrix(5, sems, atos)
+
+    assert matrix.columns == {"SEM_A": [0, 2, 4], "SEM_B": [2], "ATO_X": [0]}
+    assert matrix.active_rows == [0, 2, 4]
+    assert matrix.first("SEM_A") == 0 and matrix.last("SEM_A") == 4
+    assert matrix.count("SEM_A", 1, 4) == 2
+    assert matrix.fired_in("SEM_B", 2, 2) and not matrix.fired_in("SEM_B", 3, 4)
+    assert not matrix.any_fired_in(3, 3) and matrix.any_fired_in(3, 4)
+    assert "SEM_C" not in matrix and matrix.count("SEM_C", 0, 4) == 0
+
+
+def _per_message(engine):
+    atos = [engine.detect_ato(t, threshold=0.3) for t in MESSAGES]
+    sems = [engine.detect_sem(t, a, threshold=0.3) for t, a in zip(MESSAGES, atos)]
+    return sems, atos
+
+
+def _fresh(engine):
+    """Run CLU detection on a regulator of its own (same thresholds in every run)."""
+    return engine.analysis_context(AnalysisContext(), merge=False)
+
+
+def _clus(engine, sems, atos):
+    with _fresh(engine):
+        return {d.marker_id: d for d in engine.detect_clu(sems, 0.3, ato_detections_per_message=atos)}
+
+
+def test_first_satisfied_matches_prefix_evaluation(engine):
+    sems, atos = _per_message(engine)
+    full = _clus(engine, sems, atos)
+    assert full
+
+    prefixes = [_clus(engine, sems[:m + 1], atos[:m + 1]) for m in range(len(MESSAGES))]
+    for mid, d in full.items():
+        held = [m for m, clus in enumerate(prefixes) if mid in clus]
+        assert d.first_satisfied == held[0], mid
+        assert d.first_satisfied >= min(d.message_indices)
+    assert prefixes[-1].keys() == full.keys()
+
+
+def test_timeline_matches_prefix_runs(engine):
+    sems, atos = _per_message(engine)
+    with _fresh(engine):
+        intervals = engine.activation_timeline(sems, atos, threshold=0.3)
+    assert {i["layer"] for i in intervals} == {"CLU", "MEMA"}
+
+    for m in range(len(MESSAGES)):
+        with _fresh(engine):
+            clus = engine.detect_clu(sems[:m + 1], 0.3, ato_detections_per_message=atos[:m + 1])
+        flat_sem = [d for dets in sems[:m + 1] for d in dets]
+        flat_ato = [d for dets in atos[:m + 1] for d in dets]
+        memas = engine.detect_mema(clus, flat_sem, flat_ato, 0.3)
+        expected = {(d.layer, d.marker_id) for d in clus + memas}
+        on = {(i["layer"], i["marker_id"]) for i in intervals if i["start"] <= m <= i["end"]}
+        assert on == expected, m
+
+    with _fresh(engine):
+        clu_only = engine.activation_timeline(sems, atos, threshold=0.3, layers=["CLU"])
+    assert clu_only == [i for i in intervals if i["layer"] == "CLU"]
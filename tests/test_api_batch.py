@@ -0,0 +1,87 @@
+"""Tests for the /v1/analyze/batch NDJSON streaming endpoint."""
+import sys
+sys.path.insert(0, ".")
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api.main as main
+from api.main import app
+
+TEXTS = [
+    "Du hörst mir nie zu! Immer geht es nur um dich.",
+    "Ich fühle mich so allein, niemand versteht mich.",
+    "Es tut mir leid, ich wollte dich nicht verletzen.",
+    "ok",
+]
+
+
+@pytest.fixture(scope="module")
+def client():
+    # Runs the lifespan: the engine is loaded before the first batch fans out over the pool
+    with TestClient(app) as client:
+        yield client
+
+
+def _lines(resp):
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+def _single(client, text, **options):
+    return client.post("/v1/analyze", json={"text": text, **options}).json()["markers"]
+
+
+def test_batch_matches_single_analyses(client):
+    items = [{"id": f"mail-{i}", "text": t} for i, t in enumerate(TEXTS)]
+    lines = _lines(client.post("/v1/analyze/batch", json={"items": items, "threshold": 0.3}))
+    by_id = {line["id"]: line for line in lines}
+    assert sorted(by_id) == sorted(item["id"] for item in items)
+    for item in items:
+        assert by_id[item["id"]]["markers"] == _single(client, item["text"], threshold=0.3)
+        assert by_id[item["id"]]["meta"]["text_length"] == len(item["text"])
+
+
+def test_ndjson_upload_with_query_options(client):
+    body = "\n".join([
+        json.dumps({"text": TEXTS[0], "sender": "unknown"}),
+        "",
+        "not json",
+        json.dumps({"id": 7, "text": TEXTS[1]}),
+    ]) + "\n"
+    resp = client.post(
+        "/v1/analyze/batch?threshold=0.3&layers=ATO&evidence=none", content=body.encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    by_id = {line["id"]: line for line in _lines(resp)}
+    assert sorted(by_id, key=str) == [0, 1, 7]
+    assert "error" in by_id[1] and "markers" not in by_id[1]
+    expected = _single(client, TEXTS[0], threshold=0.3, layers=["ATO"], evidence="none")
+    assert by_id[0]["markers"] == expected and by_id[0]["meta"]["layers_scanned"] == ["ATO"]
+    assert all(m["matches"] == [] for m in by_id[7]["markers"])
+
+    bad = client.post("/v1/analyze/batch?threshold=2", content=b"", headers={"Content-Type": "application/x-ndjson"})
+    assert bad.status_code == 422
+
+
+def test_batch_keeps_in_flight_bounded(client, monkeypatch):
+    in_flight, peak = 0, 0
+    run = main.engine_pool.run
+
+    async def counting_run(*args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            return await run(*args, **kwargs)
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(main.engine_pool, "run", counting_run)
+    items = [{"text": TEXTS[i % len(TEXTS)]} for i in range(40)]
+    lines = _lines(client.post("/v1/analyze/batch", json={"items": items}))
+    assert sorted(line["id"] for line in lines) == list(range(40))
+    assert 1 <= peak <= max(1, main.engine_pool.workers)
@@ -0,0 +1,84 @@
+"""Tests for the progressive /v1/analyze/dynamics/stream NDJSON endpoint."""
+import sys
+sys.path.insert(0, ".")
+
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+import api.main as main
+from api.main import app
+from api.models import ConversationRequest
+
+client = TestClient(app)
+
+MESSAGES = [
+    {"role": "A", "text": "Du hörst mir nie zu! Immer geht es nur um dich."},
+    {"role": "B", "text": "Das stimmt nicht, ich höre dir doch zu."},
+    {"role": "A", "text": "Ich fühle mich so allein, niemand versteht mich."},
+    {"role": "B", "text": "Es tut mir leid, ich wollte dich nicht verletzen."},
+    {"role": "A", "text": "Immer sagst du das, aber es ändert sich nie etwas."},
+    {"role": "B", "text": "ok"},
+]
+
+FINAL_KEYS = (
+    "markers", "message_vad", "message_emotions", "ued_metrics", "state_indices",
+    "speaker_baselines", "temporal_patterns", "timeline", "topology",
+)
+
+
+def _frames(body):
+    resp = client.post("/v1/analyze/dynamics/stream", json=body)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+def test_message_frames_then_full_dynamics(fresh_regulator):
+    body = {"messages": MESSAGES, "threshold": 0.3, "timeline": True}
+    frames = _frames(body)
+    assert [f["type"] for f in frames] == ["message"] * len(MESSAGES) + ["dynamics"]
+    assert [f["index"] for f in frames[:-1]] == list(range(len(MESSAGES)))
+    assert all(m["layer"] in ("ATO", "SEM") for f in frames[:-1] for m in f["markers"])
+
+    final = frames[-1]
+    fresh_regulator()
+    plain = client.post("/v1/analyze/dynamics", json=body).json()
+    for key in FINAL_KEYS:
+        assert final[key] == plain[key], key
+    assert [f["vad"] for f in frames[:-1]] == final["message_vad"]
+    assert [f["emotion"] for f in frames[:-1]] == final["message_emotions"]
+    assert [f["speaker_delta"] for f in frames[:-1]] == final["speaker_baselines"]["per_message_delta"]
+
+
+def test_selection_applies_to_message_frames():
+    frames = _frames({"messages": MESSAGES, "threshold": 0.3})
+    selected = sorted({m["id"] for f in frames[:-1] for m in f["markers"] if m["layer"] == "SEM"})[:2]
+    assert selected
+
+    frames = _frames({"messages": MESSAGES, "threshold": 0.3, "markers": selected})
+    streamed = {m["id"] for f in frames[:-1] for m in f["markers"]}
+    assert streamed and streamed <= set(selected)
+    assert {m["id"] for m in frames[-1]["markers"]} <= set(selected)
+
+
+def test_closed_stream_stops_the_worker(monkeypatch):
+    sent = []
+    stream_message = main._stream_message
+    monkeypatch.setattr(main, "_stream_message", lambda *args: sent.append(1) or stream_message(*args))
+    messages = MESSAGES * 50
+    req = ConversationRequest(messages=messages)
+
+    async def read_first():
+        frames = main._dynamics_frames(
+            req, [m.copy() for m in messages], main._dynamics_options(req, None), None,
+        )
+        first = await anext(frames)
+        await frames.aclose()
+        while main.engine_pool.pending:
+            await asyncio.sleep(0.01)
+        return first
+
+    assert json.loads(asyncio.run(read_first()))["index"] == 0
+    assert len(sent) < len(messages)
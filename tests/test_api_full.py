@@ -0,0 +1,68 @@
+"""Tests for the composite /v1/analyze/full API endpoint."""
+import sys
+sys.path.insert(0, ".")
+
+import pytest
+from fastapi.testclient import TestClient
+from api.main import app
+
+client = TestClient(app)
+
+CONVERSATION = {
+    "messages": [
+        {"role": "A", "text": "Du bist immer so egoistisch! Typisch!"},
+        {"role": "B", "text": "Es tut mir leid, ich wollte das nicht."},
+        {"role": "A", "text": "Wegen dir bin ich so unglücklich!"},
+        {"role": "B", "text": "Ich verstehe dich, das ist nachvollziehbar."},
+    ],
+}
+
+
+def test_full_matches_separate_endpoints(fresh_regulator):
+    full = client.post("/v1/analyze/full", json=CONVERSATION)
+    assert full.status_code == 200
+    data = full.json()
+    assert data["sections"] == ["markers", "vad", "ued", "speaker_baselines", "topology", "interpret"]
+
+    fresh_regulator()
+    dynamics = client.post("/v1/analyze/dynamics", json=CONVERSATION).json()
+    for key in ("markers", "temporal_patterns", "message_vad", "message_emotions",
+                "state_indices", "ued_metrics", "speaker_baselines", "topology"):
+        assert data[key] == dynamics[key], key
+
+    fresh_regulator()
+    interpret = client.post("/v1/analyze/interpret", json=CONVERSATION).json()
+    for key in ("framings", "semiotic_map", "dominant_framing", "findings"):
+        assert data["interpretation"][key] == interpret[key], key
+    assert data["persona_session"] is None
+
+
+def test_full_returns_only_requested_sections():
+    resp = client.post("/v1/analyze/full", json={**CONVERSATION, "sections": ["ued", "interpret"]})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["sections"] == ["ued", "interpret"]
+    assert data["ued_metrics"] is not None and data["interpretation"] is not None
+    for key in ("markers", "message_vad", "state_indices", "speaker_baselines", "topology"):
+        assert data[key] is None, key
+
+
+@pytest.mark.parametrize("threshold", [0.3, 0.6])
+def test_full_counts_markers_whichever_sections(fresh_regulator, threshold):
+    body = {**CONVERSATION, "threshold": threshold}
+    markers = client.post("/v1/analyze/full", json={**body, "sections": ["markers"]}).json()
+    assert markers["meta"]["markers_detected"] == len(markers["markers"]) > 0
+    for sections in (["ued"], ["interpret"]):
+        fresh_regulator()
+        data = client.post("/v1/analyze/full", json={**body, "sections": sections}).json()
+        assert data["meta"]["markers_detected"] == len(markers["markers"]), sections
+
+
+def test_full_persona_section():
+    assert client.post("/v1/analyze/full", json={**CONVERSATION, "sections": ["persona"]}).status_code == 422
+
+    token = client.post("/v1/personas").json()["token"]
+    resp = client.post("/v1/analyze/full", json={**CONVERSATION, "sections": ["persona"], "persona_token": token})
+    assert resp.status_code == 200
+    assert resp.json()["persona_session"]["session_number"] == 1
+    client.delete(f"/v1/personas/{token}")
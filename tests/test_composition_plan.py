@@ -0,0 +1,134 @@
+"""Tests for the load-time SEM, CLU and MEMA composition plans."""
+import sys
+sys.path.insert(0, ".")
+
+import pytest
+
+from api.engine import AnalysisContext, _parse_activation_rule
+
+
+TEXTS = [
+    "Du bist ein Monster! Ich hasse dich!",
+    "Ich fühle mich so allein, niemand versteht mich.",
+    "Er hat gesagt, dass er wütend ist. Ich bin nicht traurig.",
+    "Immer machst du das! Nie hörst du zu!!!",
+    "ok",
+]
+
+
+def _sem(engine, text):
+    atos = engine.detect_ato(text, threshold=0.3)
+    return [(d.marker_id, d.confidence, len(d.matches)) for d in engine.detect_sem(text, atos, threshold=0.3)]
+
+
+def test_sem_index_matches_full_scan(engine):
+    indexed = [_sem(engine, t) for t in TEXTS]
+    saved = engine._sem_with_patterns
+    engine._sem_with_patterns = list(range(len(engine._sem_plan)))  # Evaluate every SEM
+    try:
+        full = [_sem(engine, t) for t in TEXTS]
+    finally:
+        engine._sem_with_patterns = saved
+    assert indexed == full
+    assert any(indexed)
+
+
+def test_sem_plan_parses_activation_rules(engine):
+    assert len(engine._sem_plan) == len(engine.sem_markers)
+    for plan in engine._sem_plan:
+        if not plan.n_composed:
+            assert plan.refs == ()
+            continue
+        assert plan.n_composed == len(plan.mdef.composed_of)
+        if plan.mode == "ALL":
+            assert plan.min_hits == plan.n_composed
+        for ref in plan.refs:
+            assert plan.mdef.id in [engine._sem_plan[i].mdef.id for i in engine._sem_by_ato[ref]]
+    assert _parse_activation_rule("AT_LEAST 2 IN 3 messages") == ("AT_LEAST", 2)
+
+
+def _brute_matches(ref, active_ids):
+    parts = ref.split("_")[1:]
+    return {sid for sid in active_ids if ref == sid or all(p.upper() in sid.upper() for p in parts)}
+
+
+def test_ref_table_matches_fuzzy_resolution(engine):
+    import random
+
+    rng = random.Random(7)
+    ids = sorted(engine.markers)
+    refs = list(engine._ref_targets) + ["SEM_ANGER_ESCALATION", "CLU_SEM", "SEM_", "NOUNDERSCORE"]
+    for _ in range(20):
+        active = set(rng.sample(ids, 60)) | {"SEM_HANDMADE_ANGER_TEST"}
+        for ref in refs:
+            expected = _brute_matches(ref, active)
+            assert engine._ref_matches(ref, active) == expected, ref
+            exact_or_fuzzy = ref in active or bool(ref.split("_")[1:] and expected)
+            assert engine._resolve_ref(ref, active) == exact_or_fuzzy, ref
+
+
+def test_mema_keyword_index_matches_substring_scan(engine):
+    for mid in engine.markers:
+        expected = tuple(
+            i for i, plan in enumerate(engine._mema_plan)
+            if any(kw in mid.upper() for kw in plan.keywords)
+        )
+        assert engine._mema_by_marker.get(mid, ()) == expected, mid
+
+
+def test_mema_absence_mask_covers_ids_and_tags(engine):
+    for plan in engine._mema_plan:
+        absence_sets = plan.mdef.absence_sets or plan.mdef.frame.get("absence_sets")
+        if not absence_sets:
+            assert plan.absence_mask is None
+            continue
+        breaking = set(engine._ids_of(plan.absence_mask)) | plan.absence_foreign
+        for sdef in absence_sets.values():
+            assert set(sdef.get("ids", [])) <= breaking
+            tags = {t.upper() for t in sdef.get("tags", [])}
+            tagged = {mid for mid, m in engine.markers.items() if {t.upper() for t in m.tags} & tags}
+            assert tagged <= breaking
+
+
+def test_interned_ids_round_trip(engine):
+    ids = ["SEM_ANGER", "ATO_ABSOLUTIZER", "NOT_A_MARKER"]
+    known = [mid for mid in ids if mid in engine.markers]
+    mask = engine._mask_of(ids)
+    assert sorted(engine._ids_of(mask)) == sorted(known)
+    for mid in known:
+        assert engine._marker_ids[engine.markers[mid].idx] == mid
+    active = engine._active(set(ids))
+    assert active.mask == mask and active.foreign == set(ids) - set(known)
+
+
+CONVERSATION = [{"role": "AB"[i % 2], "text": t} for i, t in enumerate(TEXTS * 3)]
+
+
+def test_ceilings_bound_confidence(engine):
+    sem_ceiling = {plan.mdef.id: plan.ceiling for plan in engine._sem_plan}
+    clu_ceiling = {plan.mdef.id: plan.ceiling for plan in engine._clu_plan}
+    result = engine.analyze_conversation(CONVERSATION, threshold=0.0)
+    for det in result["detections"]:
+        if det.layer == "SEM":
+            assert det.confidence <= round(sem_ceiling[det.marker_id], 3), det.marker_id
+        elif det.layer == "CLU":
+            assert det.confidence <= round(clu_ceiling[det.marker_id], 3), det.marker_id
+    assert any(p.ceiling < 0.5 for p in engine._sem_plan)
+
+
+@pytest.mark.parametrize("threshold", [0.3, 0.5, 0.8])
+def test_ceiling_pruning_is_exact(engine, threshold):
+    plans = engine._sem_plan + engine._clu_plan
+    pruned = engine.analyze_conversation(CONVERSATION, threshold=threshold, timeline=True, context=AnalysisContext())
+    saved = [plan.ceiling for plan in plans]
+    try:
+        for plan in plans:
+            plan.ceiling = 1.0  # Evaluate every marker
+        full = engine.analyze_conversation(
+            CONVERSATION, threshold=threshold, timeline=True, context=AnalysisContext(),
+        )
+    finally:
+        for plan, ceiling in zip(plans, saved):
+            plan.ceiling = ceiling
+    for key in ("detections", "timeline"):
+        assert [repr(x) for x in pruned[key]] == [repr(x) for x in full[key]], key
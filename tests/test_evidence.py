@@ -0,0 +1,56 @@
+"""Tests for the evidence modes of ATO scanning (all / first / none)."""
+import sys
+sys.path.insert(0, ".")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.engine import AnalysisContext
+from api.main import app
+
+client = TestClient(app)
+
+MESSAGES = [
+    {"role": "A", "text": "Du hörst mir nie zu! Immer geht es nur um dich. Nie! Immer!"},
+    {"role": "B", "text": "Bist du wirklich so traurig? Ich bin so traurig."},
+    {"role": "A", "text": "Ich fühle mich so allein, niemand versteht mich."},
+    {"role": "B", "text": "Es tut mir leid, ich wollte dich nicht verletzen."},
+    {"role": "A", "text": "You never listen to me. I always have to do everything myself!"},
+]
+
+
+def _scores(result):
+    return sorted((d.layer, d.marker_id, d.confidence, tuple(d.message_indices)) for d in result["detections"])
+
+
+@pytest.mark.parametrize("threshold", [0.3, 0.5])
+def test_modes_agree_on_markers_and_confidences(engine, threshold):
+    full = engine.analyze_conversation(MESSAGES, threshold=threshold, deduplicate=False, context=AnalysisContext())
+    for evidence in ("first", "none"):
+        result = engine.analyze_conversation(
+            MESSAGES, threshold=threshold, deduplicate=False, evidence=evidence, context=AnalysisContext(),
+        )
+        assert _scores(result) == _scores(full), evidence
+    assert any(d.layer == "SEM" for d in full["detections"])
+
+
+def test_first_keeps_one_match_per_pattern(engine):
+    text = MESSAGES[0]["text"]
+    full = {d.marker_id: d for d in engine.detect_ato(text, threshold=0.3)}
+    first = {d.marker_id: d for d in engine.detect_ato(text, threshold=0.3, evidence="first")}
+    none = engine.detect_ato(text, threshold=0.3, evidence="none")
+    assert set(first) == set(full) == {d.marker_id for d in none}
+    assert all(not d.matches for d in none)
+    for mid, det in first.items():
+        patterns = [m.pattern for m in det.matches]
+        assert len(patterns) == len(set(patterns)) == len({m.pattern for m in full[mid].matches})
+        assert all(m in full[mid].matches for m in det.matches)
+    assert sum(len(d.matches) for d in first.values()) < sum(len(d.matches) for d in full.values())
+
+
+def test_evidence_request_option():
+    resp = client.post("/v1/analyze", json={"text": MESSAGES[0]["text"], "evidence": "none"})
+    assert resp.status_code == 200
+    markers = resp.json()["markers"]
+    assert markers and all(m["matches"] == [] for m in markers)
+    assert client.post("/v1/analyze", json={"text": "Hallo", "evidence": "some"}).status_code == 422
@@ -0,0 +1,138 @@
+"""Tests for the ATO literal prefilter (api/prefilter.py)."""
+import sys
+sys.path.insert(0, ".")
+
+from api.prefilter import LiteralMatcher, fold_case, required_literals
+
+
+def test_required_literals_alternation():
+    lits = required_literals(r"(?i)\b(niemand|keiner|keine seele)\b")
+    assert lits == {"niemand", "keiner", "keine seele"}
+
+
+def test_required_literals_picks_longest_fragment():
+    lits = required_literals(r"(?i)\bman\s+zeigt\s+so\s+etwas\s+nicht\b")
+    assert lits == {"zeigt"}
+
+
+def test_required_literals_optional_part_is_not_required():
+    assert required_literals(r"(?i)\blet'?s\b") == {"let"}
+    assert required_literals(r"(\w*\.\.\.+|\w*…+)") == {"..", "…"}
+    # Purely structural or single ASCII char → no literal, always scanned
+    assert required_literals(r"[?]$") is None
+    assert required_literals(r"\b(\w{4,})\b.+\b\1\b") is None
+
+
+def test_required_literals_single_emoji():
+    assert required_literals("😏") == {"😏"}
+
+
+def test_fold_case_matches_ignorecase_equivalences():
+    assert fold_case("NICHT") == "nicht"
+    assert fold_case("İch") == "ich"
+    assert fold_case("Waſſer") == "wasser"
+
+
+def test_literal_matcher_reports_overlapping_literals():
+    matcher = LiteralMatcher(["du bist", "bist", "immer", "nie"])
+    found = matcher.find(fold_case("Du bist IMMER so"))
+    assert found == {"du bist", "bist", "immer"}
+    assert matcher.find("gar nichts") == set()
+    assert matcher.find("niemals") == {"nie"}
+
+
+def test_detect_ato_identical_with_and_without_prefilter():
+    from api.config import settings
+    from api.engine import MarkerEngine
+
+    texts = [
+        "Du bist immer so egoistisch!",
+        "Ich fühle mich so allein, niemand versteht mich.",
+        "ok",
+        "😏 na klar...",
+        "Call me at +49 170 706 123 9 [25.05.25, 23:48:28]",
+    ]
+
+    def scan(prefilter: bool):
+        original = settings.ato_prefilter
+        settings.ato_prefilter = prefilter
+        try:
+            eng = MarkerEngine()
+            eng.load()
+            return [
+                [(d.marker_id, d.confidence, [(m.pattern, m.start, m.end) for m in d.matches])
+                 for d in eng.detect_ato(t, threshold=0.3)]
+                for t in texts
+            ]
+        finally:
+            settings.ato_prefilter = original
+
+    assert scan(True) == scan(False)
+
+
+def test_pattern_shards_find_every_matching_pattern():
+    import re
+    from api.prefilter import PatternShards
+
+    raws = [r"(?i)\bnie\b", r"(?i)immer", r"\b(\w{4,})\b.+\b\1\b", r"(?s)a.b", r"(?i)\bdu\b", "xyz"]
+    entries = [(i, raw, re.compile(raw, re.IGNORECASE)) for i, raw in enumerate(raws)]
+    shards = PatternShards(entries, shard_size=2)
+    text = "Du bist NIE da, immer immer\nab"
+    expected = {i for i, _, compiled in entries if compiled.search(text)}
+    assert shards.matching(text) == expected
+    assert shards.matching(text, candidates={0, 5}) == {0}
+
+
+def test_detect_ato_identical_in_sharded_mode():
+    from api.config import settings
+    from api.engine import MarkerEngine
+
+    texts = ["Du bist immer so egoistisch!", "Ich fühle mich so allein.", "😏 na klar..."]
+
+    def scan(mode: str):
+        original = settings.ato_scan_mode
+        settings.ato_scan_mode = mode
+        try:
+            eng = MarkerEngine()
+            eng.load()
+            return [
+                [(d.marker_id, d.confidence, [(m.pattern, m.start, m.end) for m in d.matches])
+                 for d in eng.detect_ato(t, threshold=0.3)]
+                for t in texts
+            ]
+        finally:
+            settings.ato_scan_mode = original
+
+    assert scan("sharded") == scan("loop")
+
+
+def test_language_partition_skips_other_language_markers():
+    from api.config import settings
+    from api.engine import MarkerEngine
+
+    eng = MarkerEngine()
+    eng.load()
+    # German message with an English phrase matched only by English-exclusive ATOs
+    text = "Ich hab dir gesagt, you should stop, und das ist nicht okay für mich."
+
+    def ids(lang=None, prefilter=True):
+        original = settings.ato_prefilter
+        settings.ato_prefilter = prefilter
+        try:
+            eng.load()  # Also clears the cached scans
+            return {d.marker_id for d in eng.detect_ato(text, threshold=0.3, lang=lang)}
+        finally:
+            settings.ato_prefilter = original
+
+    guessed, bilingual = ids(), ids("bilingual")
+    assert "ATO_CONTROL" in bilingual and "ATO_CONTROL" not in guessed
+    assert guessed == ids("de") == ids(prefilter=False)
+    skips = eng._language_partition().ato_skip
+    assert skips["de"] and skips["de"].isdisjoint(skips["en"])
+
+    original = settings.language_partition
+    settings.language_partition = False
+    try:
+        assert ids() == bilingual
+    finally:
+        settings.language_partition = original
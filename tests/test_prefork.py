@@ -0,0 +1,59 @@
+"""Tests for the pre-fork server (api/prefork.py) and per-worker stats (api/runtime.py)."""
+import sys
+sys.path.insert(0, ".")
+
+import gc
+import json
+import signal
+import socket
+import subprocess
+import time
+import urllib.request
+
+from api.runtime import GCPauseStats, process_stats
+
+
+def test_gc_pause_stats():
+    stats = GCPauseStats()
+    stats.install()
+    try:
+        gc.collect()
+    finally:
+        gc.callbacks.remove(stats._callback)
+    assert stats.collections[2] >= 1 and stats.stats()["pause_total_ms"] >= 0
+    stats.reset()
+    assert stats.stats()["collections"] == [0, 0, 0]
+
+    process = process_stats()
+    assert process["worker"] is None
+    assert process["memory_kb"].get("rss", process["memory_kb"].get("max_rss")) > 0
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_prefork_workers_share_frozen_registry():
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "api.prefork", "--workers", "2", "--port", str(port), "--log-level", "warning"],
+    )
+    try:
+        seen = {}
+        deadline = time.monotonic() + 60
+        while len(seen) < 2 and time.monotonic() < deadline:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/v1/health", timeout=5) as resp:
+                    health = json.load(resp)
+                seen[health["process"]["worker"]] = health
+            except OSError:
+                time.sleep(0.2)
+        assert set(seen) == {0, 1}
+        for health in seen.values():
+            assert health["markers_loaded"] > 0
+            assert health["process"]["gc"]["frozen_objects"] > 0
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=30) == 0
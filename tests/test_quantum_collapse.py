@@ -43,3 +43,49 @@ def test_ewma_precision_regulator(engine):
     
     assert engine.ewma_precision < 0.5
     assert engine.dynamic_threshold_modifier > 1.0
+
+
+ESCALATION = [
+    {"role": "A", "text": "Du hörst mir nie zu! Immer geht es nur um dich."},
+    {"role": "B", "text": "Das stimmt doch gar nicht, du übertreibst mal wieder."},
+    {"role": "A", "text": "Du bist ein Monster! Ich hasse dich!"},
+    {"role": "B", "text": "Immer machst du das! Nie hörst du zu!!!"},
+]
+
+
+def test_regulator_context_isolation(engine):
+    from api.engine import AnalysisContext
+
+    tenant = AnalysisContext()
+    engine.analyze_conversation(ESCALATION, threshold=0.3, context=tenant)
+    tracked = tenant.confirmed_count + tenant.retracted_count
+    assert tracked > 0 and tenant.updates is None
+    assert engine.confirmed_count + engine.retracted_count == 0  # Shared regulator untouched
+
+    with engine.analysis_context() as ctx:
+        engine.dynamic_threshold_modifier = 1.25
+        assert ctx.dynamic_threshold_modifier == 1.25 and engine.regulator.dynamic_threshold_modifier == 1.0
+    assert engine.dynamic_threshold_modifier == 1.0
+
+
+def test_concurrent_analyses_merge_atomically(engine, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from api.engine import AnalysisContext
+
+    merged: list[list[bool]] = []
+    merge_context = engine.merge_context
+    monkeypatch.setattr(
+        engine, "merge_context", lambda ctx, base=None: merged.append(list(ctx.updates)) or merge_context(ctx, base),
+    )
+    tenant = AnalysisContext()
+    engine.analyze_conversation(ESCALATION, threshold=0.3, context=tenant)
+    assert tenant.confirmed_count + tenant.retracted_count > 0
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: engine.analyze_conversation(ESCALATION, threshold=0.3), range(16)))
+    # No update lost between threads: the shared regulator holds every run's CLUs
+    shared = merged[1:]
+    assert len(shared) == 16
+    assert engine.confirmed_count == sum(u.count(True) for u in shared)
+    assert engine.retracted_count == sum(u.count(False) for u in shared)
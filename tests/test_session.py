@@ -0,0 +1,270 @@
+"""Tests for incremental conversation sessions (api/session.py, /v1/sessions)."""
+import sys
+sys.path.insert(0, ".")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.engine import AnalysisContext, Detection, MarkerEngine
+import api.main as main
+from api.main import app
+from api.session import OUTPUTS, ConversationSession, SessionStore, pipeline_stages
+from api.topology import TopologyTracker, compute_topology_report
+from api.workers import PoolBusy
+from conftest import plain
+
+client = TestClient(app)
+
+MESSAGES = [
+    {"role": "A", "text": "Hallo, wie war dein Tag?"},
+    {"role": "B", "text": "Du hörst mir nie zu! Immer geht es nur um dich."},
+    {"role": "A", "text": "Das stimmt doch gar nicht, du übertreibst mal wieder."},
+    {"role": "B", "text": "Ich fühle mich so allein, niemand versteht mich."},
+    {"role": "A", "text": "."},
+    {"role": "B", "text": "Es tut mir leid, ich wollte dich nicht verletzen."},
+    {"role": "A", "text": "Du bist ein Monster! Ich hasse dich!"},
+    {"role": "B", "text": "Lass uns bitte in Ruhe darüber reden."},
+    {"role": "A", "text": "Immer machst du das! Nie hörst du zu!!!"},
+]
+
+
+@pytest.mark.parametrize("deduplicate", [True, False])
+def test_append_matches_full_analysis(engine, deduplicate):
+    warm_start = {"A": {"valence": -0.2, "arousal": 0.4, "dominance": 0.1}}
+    session = ConversationSession(
+        engine, threshold=0.3, warm_start=warm_start, deduplicate=deduplicate, timeline=True,
+        context=AnalysisContext(),
+    )
+    for n, msg in enumerate(MESSAGES, 1):
+        incremental = session.append(msg)
+        full = engine.analyze_conversation(
+            MESSAGES[:n], threshold=0.3, warm_start=warm_start, deduplicate=deduplicate, timeline=True,
+            context=AnalysisContext(),
+        )
+        assert plain(incremental) == plain(full), n
+    assert len(session) == len(MESSAGES)
+    assert incremental["ued_metrics"] is not None
+
+
+def test_session_moves_the_regulator_once(engine):
+    messages = MESSAGES * 4
+    one_shot = AnalysisContext()
+    full = engine.analyze_conversation(messages, threshold=0.3, context=one_shot)
+    assert one_shot.confirmed_count + one_shot.retracted_count > 0
+
+    base = AnalysisContext()
+    session = ConversationSession(engine, threshold=0.3, context=base)
+    for msg in messages:
+        session.append(msg)
+        session.overview()
+    assert base.confirmed_count + base.retracted_count == 0  # Until the session is closed
+    assert plain(session.result()) == plain(full)
+    session.close()
+    session.close()
+    assert base == one_shot
+
+
+def test_long_session_matches_full_analysis(engine):
+    # Spans, markers and CLU scans recur over many appends
+    messages = MESSAGES * 6
+    session = ConversationSession(engine, threshold=0.3, context=AnalysisContext())
+    for msg in messages:
+        session.append(msg)
+    full = engine.analyze_conversation(messages, threshold=0.3, context=AnalysisContext())
+    assert plain(session.result()) == plain(full)
+    assert plain(session.overview()["topology"]) == plain(full["topology"])
+
+
+def _det(marker_id, *indices):
+    return Detection(marker_id, marker_id.split("_")[0], 1.0, "", [], message_indices=list(indices))
+
+
+@pytest.mark.parametrize("late", [
+    [],
+    [_det("CLU_SELF_CONTRADICTION", 1, 4), _det("CLU_CIRCULAR_REASONING", 2, 5), _det("MEMA_GASLIGHTER")],
+    [_det("CLU_X", 0, 3), _det("ATO_ACK", 1)],  # Touches the adjacency checks
+])
+def test_topology_tracker_matches_full_report(late):
+    messages = [
+        {"role": "A", "text": "Wirst du das machen?"},
+        {"role": "B", "text": "Ich werde das machen, versprochen."},
+        {"role": "A", "text": "x"},
+        {"role": "A", "text": "Das ist immer so."},
+        {"role": "B", "text": "Ich mache das nicht."},
+        {"role": "A", "text": "Wenn du gehst, dann ..."},
+    ]
+    detections = [
+        _det("ATO_QUESTION", 0), _det("ATO_COMMITMENT_PHRASE", 1), _det("ATO_ABSOLUTIZER", 3),
+        _det("ATO_NEGATION", 4), _det("ATO_THREAT_LANGUAGE", 5),
+    ]
+    tracker = TopologyTracker()
+    for i, msg in enumerate(messages):
+        tracker.add(msg, {d.marker_id for d in detections if i in d.message_indices})
+        report = tracker.report(late)
+        assert report == compute_topology_report(messages[:i + 1], detections + late), i
+
+
+@pytest.mark.parametrize("layers,outputs", [
+    (["ATO"], {"detections"}),
+    (["ATO", "SEM", "CLU", "MEMA"], {"detections", "temporal_patterns", "topology"}),
+    (["SEM", "CLU"], {"topology", "ued_metrics"}),
+    (["ATO", "SEM"], {"message_emotions"}),
+    (["ATO", "SEM"], {"message_vad", "state_indices", "speaker_baselines"}),
+])
+def test_requested_outputs_match_full_result(engine, layers, outputs):
+    full = plain(engine.analyze_conversation(MESSAGES, layers=layers, threshold=0.3, context=AnalysisContext()))
+    partial = plain(engine.analyze_conversation(
+        MESSAGES, layers=layers, threshold=0.3, outputs=outputs, context=AnalysisContext(),
+    ))
+    assert set(partial) - {"shadow_mode"} == outputs | {"detections"}
+    for key in outputs:
+        assert partial[key] == full[key], key
+    if "detections" not in outputs:
+        assert partial["detections"] == []
+
+
+@pytest.mark.parametrize("outputs", [None, {"detections"}, {"message_emotions"}, {"message_vad"}])
+def test_message_updates_with_requested_outputs(engine, outputs):
+    updates = []
+    result = engine.analyze_conversation(
+        MESSAGES, threshold=0.3, outputs=outputs, on_message=updates.append, context=AnalysisContext(),
+    )
+    assert [u["index"] for u in updates] == list(range(len(MESSAGES)))
+    # Parts whose stage was skipped are None
+    assert [u["vad"] for u in updates] == result.get("message_vad", [None] * len(MESSAGES))
+    assert [u["emotion"] for u in updates] == result.get("message_emotions", [None] * len(MESSAGES))
+    if outputs is None or "detections" in outputs:
+        assert any(u["detections"] for u in updates)
+
+
+def test_pipeline_stages():
+    all_layers = ["ATO", "SEM", "CLU", "MEMA"]
+    assert pipeline_stages(["ATO"], {"detections"}) == {"ATO"}
+    assert pipeline_stages(all_layers, {"message_emotions"}) == {"PROSODY"}
+    assert pipeline_stages(["ATO"], {"ued_metrics"}) == {"ATO", "SEM", "VAD"}
+    assert pipeline_stages(["MEMA"], {"topology"}) == {"ATO", "SEM", "MEMA", "TOPOLOGY"}
+    assert pipeline_stages(["ATO", "CLU"], {"message_vad"}, timeline=True) == {"ATO", "SEM", "CLU", "VAD"}
+    assert pipeline_stages(all_layers) == set(all_layers) | {"VAD", "PROSODY", "TOPOLOGY"}
+    assert len(OUTPUTS) == 8
+    with pytest.raises(ValueError):
+        pipeline_stages(all_layers, {"markers"})
+
+
+def test_skipped_stages_do_not_run(engine):
+    calls = []
+    engine.detect_ato = lambda *a, **kw: calls.append("ato") or MarkerEngine.detect_ato(engine, *a, **kw)
+    try:
+        result = engine.analyze_conversation(MESSAGES, outputs={"message_emotions"})
+    finally:
+        del engine.detect_ato
+    assert not calls
+    assert len(result["message_emotions"]) == len(MESSAGES) and result["detections"] == []
+
+
+def test_session_store_evicts_and_expires(engine):
+    store = SessionStore(max_sessions=2, ttl_seconds=60)
+    first, _ = store.create(ConversationSession(engine))
+    second, _ = store.create(ConversationSession(engine))
+    store.get(first)  # Now most recently used
+    third, _ = store.create(ConversationSession(engine))
+    assert store.get(second) is None
+    assert store.get(first) is not None and store.get(third) is not None
+
+    store.ttl_seconds = -1
+    assert store.get(first) is None and len(store) == 0
+    assert not store.delete(third)
+
+
+def test_session_endpoints():
+    created = client.post("/v1/sessions", json={"threshold": 0.3})
+    assert created.status_code == 200
+    session_id = created.json()["session_id"]
+
+    for i in range(3):
+        resp = client.post(f"/v1/sessions/{session_id}/messages", json={"messages": [MESSAGES[i]]})
+        assert resp.status_code == 200
+    full = client.post("/v1/analyze/conversation", json={"messages": MESSAGES[:3], "threshold": 0.3})
+    assert resp.json()["markers"] == full.json()["markers"]
+    assert resp.json()["meta"]["text_length"] == full.json()["meta"]["text_length"]
+
+    assert client.delete(f"/v1/sessions/{session_id}").status_code == 200
+    missing = client.post(f"/v1/sessions/{session_id}/messages", json={"messages": [MESSAGES[3]]})
+    assert missing.status_code == 404
+
+
+def test_stream_pushes_message_and_conversation_updates():
+    regulator = main.engine.regulator
+    tracked = (regulator.confirmed_count, regulator.retracted_count)
+    with client.websocket_connect("/v1/stream/conversation?threshold=0.3") as ws:
+        hello = ws.receive_json()
+        assert hello["type"] == "session" and hello["messages"] == 0
+
+        ws.send_json(MESSAGES[1])
+        update = ws.receive_json()
+        assert update["type"] == "message" and update["index"] == 0 and update["role"] == "B"
+        assert update["markers"] and {m["layer"] for m in update["markers"]} <= {"ATO", "SEM"}
+        assert set(update["vad"]) == {"valence", "arousal", "dominance"}
+        conversation = ws.receive_json()
+        assert conversation["type"] == "conversation" and conversation["messages"] == 1
+        assert {m["layer"] for m in conversation["markers"]} <= {"CLU", "MEMA"}
+        assert conversation["topology"]["health"]
+
+        # Nothing new to report: no conversation update
+        for index in (1, 2):
+            ws.send_json({"role": "A", "text": "."})
+            assert ws.receive_json()["index"] == index
+
+        ws.send_text("not json")
+        assert ws.receive_json()["type"] == "error"
+
+    # The stream's session stays resumable until it is evicted
+    session_id = hello["session_id"]
+    with client.websocket_connect(f"/v1/stream/conversation?session_id={session_id}") as ws:
+        assert ws.receive_json()["messages"] == 3
+        ws.send_json(MESSAGES[2])
+        assert ws.receive_json()["index"] == 3
+    # The session's CLU tracking stays off the shared regulator while it is open
+    assert (regulator.confirmed_count, regulator.retracted_count) == tracked
+
+
+def test_stream_reports_a_full_pool_and_stays_open(monkeypatch):
+    run = main.engine_pool.run
+    busy = []  # Calls to reject: "add" and / or "overview"
+
+    async def run_or_busy(fn, *args, **kwargs):
+        step = "add" if fn is main._stream_add else "overview"
+        if step in busy:
+            busy.remove(step)
+            raise PoolBusy("busy")
+        return await run(fn, *args, **kwargs)
+
+    monkeypatch.setattr(main.engine_pool, "run", run_or_busy)
+    with client.websocket_connect("/v1/stream/conversation?threshold=0.3") as ws:
+        session_id = ws.receive_json()["session_id"]
+        busy.append("add")
+        ws.send_json(MESSAGES[1])
+        assert ws.receive_json() == {"type": "error", "detail": "busy", "retry_after": 1}
+        assert len(main.session_store.get(session_id)) == 0  # Not added: send it again
+
+        busy.append("overview")
+        ws.send_json(MESSAGES[1])
+        assert ws.receive_json()["index"] == 0
+        assert ws.receive_json()["detail"] == "busy"  # Added; only the conversation update was skipped
+
+        ws.send_json(MESSAGES[3])
+        assert ws.receive_json()["index"] == 1
+        assert ws.receive_json()["type"] == "conversation"
+
+
+def test_session_store_memory_cap(engine):
+    store = SessionStore(max_sessions=10, ttl_seconds=60, max_messages=3)
+    first, _ = store.create(ConversationSession(engine))
+    second, _ = store.create(ConversationSession(engine))
+    for msg in MESSAGES[:2]:
+        store.get(first).add(msg)
+    store.touch(first)
+    assert store.get(second) is not None  # 2 messages held: under the cap
+    store.get(second).add(MESSAGES[2])
+    store.get(second).add(MESSAGES[3])
+    store.touch(second)
+    assert store.get(first) is None and store.get(second) is not None
@@ -0,0 +1,88 @@
+"""Tests for the binary registry snapshot (api/snapshot.py)."""
+import sys
+sys.path.insert(0, ".")
+
+import shutil
+
+import pytest
+
+from api.config import settings
+from api.engine import MarkerEngine
+from api.snapshot import SnapshotError, file_sha256, read_snapshot, snapshot_path_for, write_snapshot
+
+
+@pytest.fixture
+def registry_copy(tmp_path):
+    """Registry copied to a temp dir with a freshly built snapshot next to it."""
+    registry = tmp_path / "marker_registry.json"
+    shutil.copy(settings.registry_path, registry)
+    eng = MarkerEngine()
+    eng.load(str(registry), use_snapshot=False)
+    write_snapshot(snapshot_path_for(registry), eng.snapshot_payload(), file_sha256(registry))
+    return registry
+
+
+def _scan(eng: MarkerEngine, texts: list[str]):
+    return [
+        [(d.marker_id, d.confidence, len(d.matches)) for d in eng.analyze_text(t, threshold=0.3)["detections"]]
+        for t in texts
+    ]
+
+
+def test_snapshot_load_matches_json(registry_copy):
+    from_json = MarkerEngine()
+    from_json.load(str(registry_copy), use_snapshot=False)
+    from_snap = MarkerEngine()
+    from_snap.load(str(registry_copy), use_snapshot=True)
+
+    assert from_json.load_source == "json"
+    assert from_snap.load_source == "snapshot"
+    assert from_snap.markers.keys() == from_json.markers.keys()
+    m = next(iter(from_json.markers))
+    assert from_snap.markers[m].examples == from_json.markers[m].examples
+
+    texts = ["Du bist immer so egoistisch!", "Ich fühle mich so allein, niemand versteht mich.", "ok"]
+    assert _scan(from_snap, texts) == _scan(from_json, texts)
+
+
+def test_snapshot_compiles_regexes_lazily(registry_copy):
+    eng = MarkerEngine()
+    eng.load(str(registry_copy))
+    patterns = [p for m in eng.markers.values() for p in m.patterns]
+    assert all(p._compiled is None for p in patterns)
+    assert "total" in eng.load_timings
+
+    eng.detect_ato("Du bist immer so egoistisch!")
+    compiled = sum(1 for p in patterns if p._compiled is not None)
+    assert 0 < compiled < len(patterns)
+
+
+def test_stale_or_corrupt_snapshot_falls_back_to_json(registry_copy):
+    snap = snapshot_path_for(registry_copy)
+
+    registry_copy.write_bytes(registry_copy.read_bytes() + b"\n")
+    with pytest.raises(SnapshotError, match="stale"):
+        read_snapshot(snap, registry_copy)
+    eng = MarkerEngine()
+    eng.load(str(registry_copy))
+    assert eng.load_source == "json"
+    assert "stale" in eng.snapshot_status
+
+    data = bytearray(snap.read_bytes())
+    data[-10] ^= 0xFF
+    snap.write_bytes(bytes(data))
+    with pytest.raises(SnapshotError, match="hash"):
+        read_snapshot(snap)
+
+
+def test_snapshot_from_other_prefilter_code_falls_back(registry_copy):
+    eng = MarkerEngine()
+    eng.load(str(registry_copy), use_snapshot=False)
+    payload = eng.snapshot_payload()
+    payload["prefilter_version"] = "0" * 16
+    write_snapshot(snapshot_path_for(registry_copy), payload, file_sha256(registry_copy))
+
+    eng = MarkerEngine()
+    eng.load(str(registry_copy), use_snapshot=True)
+    assert eng.load_source == "json"
+    assert "prefilter" in eng.snapshot_status
@@ -0,0 +1,106 @@
+"""Tests for marker/family subset execution (MarkerEngine.subset)."""
+import sys
+sys.path.insert(0, ".")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.engine import AnalysisContext
+from api.main import app
+from conftest import plain
+
+client = TestClient(app)
+
+MESSAGES = [
+    {"role": "A", "text": "Du hörst mir nie zu! Immer geht es nur um dich."},
+    {"role": "B", "text": "Das stimmt doch gar nicht, du übertreibst mal wieder."},
+    {"role": "A", "text": "Du bist ein Monster! Ich hasse dich!"},
+    {"role": "B", "text": "Es tut mir leid, ich wollte dich nicht verletzen."},
+    {"role": "A", "text": "Immer machst du das! Nie hörst du zu!!!"},
+]
+
+
+def test_closure_contains_composition(engine):
+    sem = next(p for p in engine._sem_plan if p.refs and set(p.refs) <= engine.markers.keys())
+    closure = engine.dependency_closure([sem.mdef.id])
+    assert sem.mdef.id in closure and set(sem.refs) <= closure
+
+    clu = engine.markers["CLU_CONFLICT_ESCALATION"]
+    closure = engine.dependency_closure([clu.id])
+    refs = [c for c in clu.composed_of if isinstance(c, str) and c in engine.markers]
+    assert refs and set(refs) <= closure
+    assert all(engine.markers[mid].layer in ("ATO", "SEM", "CLU") for mid in closure)
+
+
+def test_subset_output_and_cache(engine):
+    full = engine.analyze_conversation(MESSAGES, threshold=0.3, context=AnalysisContext())
+    selected = sorted({d.marker_id for d in full["detections"] if d.layer == "SEM"})[:2]
+    assert selected
+
+    result = engine.analyze_conversation(MESSAGES, threshold=0.3, markers=selected, context=AnalysisContext())
+    assert {d.marker_id for d in result["detections"]} <= set(selected)
+    assert {tp["marker_id"] for tp in result["temporal_patterns"]} <= set(selected)
+
+    sub, ids = engine.subset(selected)
+    assert ids == frozenset(selected) and len(sub.markers) < len(engine.markers)
+    assert engine.subset(list(reversed(selected)))[0] is sub
+
+
+def test_selecting_everything_matches_full_run(engine):
+    everything = list(engine.markers)
+    for deduplicate in (True, False):
+        full = engine.analyze_conversation(
+            MESSAGES, threshold=0.3, deduplicate=deduplicate, context=AnalysisContext(),
+        )
+        selection = engine.analyze_conversation(
+            MESSAGES, threshold=0.3, deduplicate=deduplicate, markers=everything, context=AnalysisContext(),
+        )
+        assert plain(selection) == plain(full)
+    text = MESSAGES[2]["text"]
+    assert plain(engine.analyze_text(text, threshold=0.3)) == plain(
+        engine.analyze_text(text, threshold=0.3, markers=everything)
+    )
+
+
+def test_parent_engine_untouched(engine):
+    before = [(m.idx, [p.slot for p in m.patterns]) for m in engine.markers.values()]
+    engine.subset(["CLU_CONFLICT_ESCALATION"])
+    assert [(m.idx, [p.slot for p in m.patterns]) for m in engine.markers.values()] == before
+
+
+def test_selection_validates_without_building(engine):
+    entries = len(engine.subset_cache)
+    assert engine.selection(["SEM_ACCUSATION_MARKER"], ["no_such_family"]) == {"SEM_ACCUSATION_MARKER"}
+    assert len(engine.subset_cache) == entries
+
+
+def test_selected_runs_move_the_engine_regulator(engine):
+    full = engine.analyze_conversation(MESSAGES, threshold=0.3, context=AnalysisContext())
+    clus = sorted({d.marker_id for d in full["detections"] if d.layer == "CLU"})
+    assert clus
+
+    before = engine.regulator.confirmed_count + engine.regulator.retracted_count
+    engine.analyze_conversation(MESSAGES, threshold=0.3, markers=clus)
+    assert engine.regulator.confirmed_count + engine.regulator.retracted_count > before
+    sub, _ = engine.subset(clus)
+    assert sub.regulator.confirmed_count + sub.regulator.retracted_count == 0
+
+
+def test_invalid_selection(engine):
+    with pytest.raises(ValueError):
+        engine.subset(["ATO_DOES_NOT_EXIST"])
+    with pytest.raises(ValueError):
+        engine.subset(families=["NO_SUCH_FAMILY"])
+
+    resp = client.post("/v1/analyze", json={"text": "Hallo", "markers": ["ATO_DOES_NOT_EXIST"]})
+    assert resp.status_code == 422
+
+
+def test_endpoint_selection():
+    resp = client.post(
+        "/v1/analyze/conversation",
+        json={"messages": MESSAGES, "layers": ["ATO", "SEM"], "markers": ["SEM_ACCUSATION_MARKER"]},
+    )
+    assert resp.status_code == 200
+    assert {m["id"] for m in resp.json()["markers"]} <= {"SEM_ACCUSATION_MARKER"}
+    assert client.get("/v1/health").json()["analysis_cache"]["subsets"]["entries"] >= 1
@@ -0,0 +1,113 @@
+"""Tests for the content-addressed per-message analysis cache (api/textcache.py)."""
+import sys
+sys.path.insert(0, ".")
+
+import pytest
+
+from api.engine import AnalysisContext, MarkerEngine
+from api.textcache import TextCache
+from conftest import plain
+
+MESSAGES = [
+    {"role": "A", "text": "Du hörst mir nie zu! Immer geht es nur um dich."},
+    {"role": "B", "text": "ok"},
+    {"role": "A", "text": "Bist du wirklich so traurig?"},
+    {"role": "B", "text": "Ich fühle mich so allein, niemand versteht mich."},
+    {"role": "A", "text": "Du hörst mir nie zu! Immer geht es nur um dich."},
+    {"role": "B", "text": "ok"},
+    {"role": "A", "text": "Es tut mir leid, ich wollte dich nicht verletzen."},
+    {"role": "B", "text": "Du hörst mir nie zu! Immer geht es nur um dich."},
+]
+
+
+def _engine(max_entries):
+    e = MarkerEngine()
+    e.text_cache = TextCache(max_entries, 2000)
+    e.conversation_cache = TextCache(max_entries)
+    e.load()
+    return e
+
+
+@pytest.fixture(scope="module")
+def engines():
+    return _engine(10_000), _engine(0)
+
+
+@pytest.mark.parametrize("threshold", [0.3, 0.5, 0.8])
+def test_cached_results_match_uncached(engines, threshold):
+    cached, uncached = engines
+    for _ in range(2):  # Second round is served from the cache
+        assert plain(cached.analyze_conversation(MESSAGES, threshold=threshold, context=AnalysisContext())) == plain(
+            uncached.analyze_conversation(MESSAGES, threshold=threshold, context=AnalysisContext())
+        )
+        for msg in MESSAGES:
+            assert plain(cached.analyze_text(msg["text"], threshold=threshold)) == plain(
+                uncached.analyze_text(msg["text"], threshold=threshold)
+            )
+    assert cached.text_cache.hits > 0
+    assert uncached.text_cache.stats()["entries"] == 0
+
+
+def test_cached_detections_are_not_shared(engines):
+    cached, _ = engines
+    first = cached.detect_ato(MESSAGES[0]["text"], threshold=0.3)
+    first[0].confidence = 0.0
+    first[0].matches.clear()
+    second = cached.detect_ato(MESSAGES[0]["text"], threshold=0.3)
+    assert second[0].confidence > 0 and second[0].matches
+
+
+def test_conversation_scans_reused_across_thresholds(engines):
+    cached, uncached = engines
+    long_text = "Du hörst mir nie zu, immer geht es nur um dich. " * 60  # Bypasses the text cache
+    messages = MESSAGES + [{"role": "A", "text": long_text}]
+    scans = []
+    cached._scan_ato = lambda prepared, *args: scans.append(prepared.raw) or type(cached)._scan_ato(cached, prepared, *args)
+    try:
+        for threshold in (0.3, 0.5):
+            with_cache = cached.analyze_conversation(messages, threshold=threshold, context=AnalysisContext())
+            without = uncached.analyze_conversation(messages, threshold=threshold, context=AnalysisContext())
+            assert plain(with_cache) == plain(without)
+    finally:
+        del cached._scan_ato
+    assert scans.count(long_text) == 1
+    assert cached.prepare_conversation(messages)[-1] is cached.prepare_conversation(messages)[-1]
+    assert cached.conversation_cache.hits >= 2
+
+
+def test_lru_eviction_and_bypass():
+    cache = TextCache(max_entries=2, max_text_length=5)
+    for key in ("a", "b", "a", "c"):
+        cache.get_or_compute(key, lambda: key.upper(), key)
+    assert cache.stats() == {
+        "entries": 2, "max_entries": 2, "chars": 2, "max_chars": 0, "hits": 1, "misses": 3, "evictions": 1,
+    }
+    assert cache.get_or_compute("a", lambda: "fresh", "a") == "A"     # Recently used: kept
+    assert cache.get_or_compute("b", lambda: "fresh", "b") == "fresh"  # Least recently used: evicted
+    assert cache.get_or_compute("long", lambda: "x", "toolong") == "x"
+    assert "long" not in cache._entries
+
+
+def test_char_budget_eviction():
+    cache = TextCache(max_entries=100, max_chars=10)
+    for text in ("aaaa", "bbbb", "cccc"):
+        cache.get_or_compute(text, lambda: text.upper(), text)
+    assert list(cache._entries) == ["bbbb", "cccc"]  # 12 chars > 10: oldest evicted
+    assert cache.stats()["chars"] == 8
+    assert cache.evictions == 1
+
+    assert cache.get_or_compute("conv", lambda: "x", size=25) == "x"  # Larger than the budget: bypassed
+    assert list(cache._entries) == ["bbbb", "cccc"]
+    cache.clear()
+    assert cache.chars == 0
+
+
+def test_reload_invalidates(engines):
+    cached, _ = engines
+    cached.detect_ato(MESSAGES[0]["text"])
+    cached.prepare_conversation(MESSAGES)
+    assert len(cached.text_cache) > 0 and len(cached.conversation_cache) > 0
+    sha = cached.registry_sha
+    cached.load()
+    assert len(cached.text_cache) == 0 and len(cached.conversation_cache) == 0
+    assert cached.registry_sha == sha
@@ -0,0 +1,58 @@
+"""Tests for the shared per-message PreparedText (api/textprep.py)."""
+import sys
+sys.path.insert(0, ".")
+
+from api.textprep import EMAIL_RE, META_RE, PHONE_RE, URL_RE, PreparedText, guess_language, strip_technical_noise
+
+
+def _sequential_strip(text: str) -> str:
+    for pattern in (URL_RE, EMAIL_RE, PHONE_RE, META_RE):
+        text = pattern.sub(lambda m: " " * len(m.group()), text)
+    return text
+
+
+def test_strip_matches_sequential_passes():
+    samples = [
+        "Ich bin so wütend!",
+        "foo.bar@www.example.com schreib mir",
+        "Call me at +49 170 706 123 9 [25.05.25, 23:48:28]",
+        "<Anhang: foto.jpg> schau mal https://x.de/a?b=c",
+        "25.05.25, 23:48 - Anna: hallo",
+    ]
+    for s in samples:
+        stripped = strip_technical_noise(s)
+        assert stripped == _sequential_strip(s)
+        assert len(stripped) == len(s)
+
+
+def test_in_question_matches_find_logic():
+    text = "Bist du traurig? Ich weiß es nicht. Oder doch? Ja"
+    prepared = PreparedText(text)
+    for pos in range(len(text)):
+        end_of_sent = text.find(".", pos)
+        q_mark = text.find("?", pos)
+        expected = q_mark != -1 and (end_of_sent == -1 or q_mark < end_of_sent)
+        assert prepared.in_question(pos) == expected
+
+
+def test_prepared_views_are_computed_once():
+    prepared = PreparedText("Du bist IMMER so! Warum?")
+    assert prepared.folded == "du bist immer so! warum?"
+    assert prepared.words == ["Du", "bist", "IMMER", "so", "Warum"]
+    assert prepared.sentences == ["Du bist IMMER so!", "Warum?"]
+    assert prepared.sentences is prepared.sentences
+    assert PreparedText.of(prepared) is prepared
+
+
+def test_prosody_same_for_str_and_prepared():
+    from api.prosody import extract_prosody
+
+    text = "Ich kann nicht mehr!!! Warum tust du das?... Hör auf."
+    assert extract_prosody(text) == extract_prosody(PreparedText(text))
+
+
+def test_guess_language():
+    assert PreparedText("Du hörst mir nie zu! Immer geht es nur um dich.").language == "de"
+    assert PreparedText("You never listen to me, it is always about you.").language == "en"
+    assert PreparedText("ok").language is None  # Too little to tell
+    assert guess_language(["ich", "you", "the", "und"]) is None  # Mixed
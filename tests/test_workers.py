@@ -0,0 +1,99 @@
+"""Tests for the bounded engine worker pool (api/workers.py)."""
+import sys
+sys.path.insert(0, ".")
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.workers import EnginePool, PoolBusy
+
+client = TestClient(app)
+
+
+def test_pool_bounds_queue_and_reports_timing():
+    pool = EnginePool(workers=1, queue_depth=1)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run(release.wait))
+        second = asyncio.ensure_future(pool.run(time.sleep, 0.01))
+        await asyncio.sleep(0.05)
+        assert pool.pending == 2
+        with pytest.raises(PoolBusy):
+            await pool.run(time.sleep, 0)  # One running, one queued: full
+        loop_free = time.perf_counter()
+        await asyncio.sleep(0)  # The event loop is not blocked meanwhile
+        assert time.perf_counter() - loop_free < 0.05
+        release.set()
+        return await first, await second
+
+    (_, first), (_, second) = asyncio.run(scenario())
+    pool.shutdown()
+    assert first.run_ms >= 40 and second.queue_ms >= 40
+    assert pool.stats() == {
+        "kind": "thread", "workers": 1, "queue_depth": 1, "pending": 0, "completed": 2, "rejected": 1,
+    }
+
+
+def test_cancelled_caller_keeps_call_in_flight():
+    pool = EnginePool(workers=1, queue_depth=0)
+    release = threading.Event()
+
+    async def scenario():
+        caller = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        caller.cancel()
+        await asyncio.sleep(0.05)
+        assert pool.pending == 1  # Still running on the worker
+        with pytest.raises(PoolBusy):
+            await pool.run(time.sleep, 0)
+        release.set()
+        while pool.pending:
+            await asyncio.sleep(0.01)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        pool.shutdown()
+    assert pool.stats()["completed"] == 1
+
+
+def test_concurrent_first_calls_load_once(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from api.engine import AnalysisContext, MarkerEngine
+
+    builds = []
+    build = MarkerEngine._build
+    monkeypatch.setattr(MarkerEngine, "_build", lambda self, *args: builds.append(1) or build(self, *args))
+    eng = MarkerEngine()
+    messages = [{"role": "A", "text": "Du hörst mir nie zu! Immer geht es nur um dich."}] * 3
+    start = threading.Barrier(8)
+
+    def first_call(_):
+        start.wait()
+        result = eng.analyze_conversation(messages, threshold=0.3, context=AnalysisContext())
+        return sorted((d.marker_id, d.confidence) for d in result["detections"])
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(first_call, range(8)))
+    assert len(builds) == 1
+    assert results[0] and all(r == results[0] for r in results)
+
+
+def test_inline_pool():
+    result, timing = asyncio.run(EnginePool(workers=0, queue_depth=0).run(sum, [1, 2]))
+    assert result == 3 and timing.queue_ms == 0.0
+
+
+def test_meta_reports_queue_and_run_time():
+    resp = client.post("/v1/analyze", json={"text": "Du hörst mir nie zu!"})
+    meta = resp.json()["meta"]
+    assert meta["queue_ms"] >= 0 and meta["run_ms"] > 0
+    assert client.get("/v1/health").json()["engine_pool"]["completed"] >= 1
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Build the binary registry snapshot used for fast engine cold start.
+
+Loads marker_registry.json through MarkerEngine (JSON path), validates every
+regex, precomputes the ATO prefilter literals and writes the result next to
+the registry as marker_registry.snapshot (see api/snapshot.py for the format).
+
+Run after tools/normalize_schema.py, and in the Docker build. The engine
+ignores a snapshot whose source registry hash no longer matches, so a stale
+snapshot is never used.
+
+Usage:
+    python3 tools/build_snapshot.py [--registry PATH] [--out PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Allow importing from project root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.config import settings
+from api.engine import MarkerEngine
+from api.snapshot import file_sha256, read_snapshot, snapshot_path_for, write_snapshot
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the binary marker registry snapshot.")
+    parser.add_argument("--registry", default=settings.registry_path, help="Source marker_registry.json")
+    parser.add_argument("--out", default=None, help="Output path (default: next to the registry)")
+    args = parser.parse_args()
+
+    registry = Path(args.registry)
+    out = Path(args.out) if args.out else snapshot_path_for(registry)
+
+    t0 = time.perf_counter()
+    engine = MarkerEngine()
+    engine.load(str(registry), use_snapshot=False)
+    payload = engine.snapshot_payload()
+    size = write_snapshot(out, payload, file_sha256(registry))
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    # Round-trip check: the written file must load back through the engine
+    read_snapshot(out, registry)
+    check = MarkerEngine()
+    check.load(str(registry), use_snapshot=True)
+    if check.load_source != "snapshot" or len(check.markers) != len(engine.markers):
+        sys.exit(f"Snapshot round-trip failed: {check.snapshot_status}")
+
+    invalid = sum(1 for m in engine.markers.values() for p in m.patterns if not p.is_valid)
+    print(f"Wrote {out} ({size / 1024:.0f} KB, {len(engine.markers)} markers, "
+          f"{invalid} invalid patterns) in {build_ms:.0f} ms")
+    print(f"Load: json {engine.load_timings['total']:.1f} ms → snapshot {check.load_timings['total']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()